@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Approximate Nearest-Neighbour Index (IVF)
+
+Inverted-file index over a ``VectorIndex``: documents are clustered with
+spherical k-means, each cluster keeps a sorted list of its rows, and a query
+only scores the rows in its ``n_probe`` closest clusters. ``n_lists`` and
+``n_probe`` trade recall for latency, and ``measure_recall`` compares the
+approximate results against an exact brute-force scan, which gives a local
+reference point for choosing Pinecone pod/index settings.
+
+Usage:
+    from ann_index import IVFIndex
+
+    ann = IVFIndex(index, n_lists=256, n_probe=8)
+    results = ann.search(query_embedding, threshold=0.1, limit=5)
+    report = ann.measure_recall(query_embeddings, k=10, n_probes=[1, 4, 16])
+
+Requirements:
+    pip install numpy
+"""
+
+import math
+import time
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from vector_index import VectorIndex, normalize_rows, top_k_indices, format_result
+
+
+def assign_clusters(matrix: np.ndarray, centroids: np.ndarray, chunk_size: int = 16384) -> np.ndarray:
+    """Return the index of the most similar centroid for every row."""
+    labels = np.empty(matrix.shape[0], dtype=np.int64)
+    for start in range(0, matrix.shape[0], chunk_size):
+        chunk = matrix[start:start + chunk_size]
+        labels[start:start + chunk.shape[0]] = np.argmax(chunk @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(matrix: np.ndarray, n_clusters: int, n_iter: int = 10,
+                     seed: int = 0) -> np.ndarray:
+    """Cluster unit-length rows by cosine similarity and return unit-length centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = matrix[rng.choice(matrix.shape[0], n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        labels = assign_clusters(matrix, centroids)
+        counts = np.bincount(labels, minlength=n_clusters)
+
+        order = np.argsort(labels, kind="stable")
+        occupied = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[occupied]
+        centroids[occupied] = np.add.reduceat(matrix[order], starts, axis=0)
+
+        # Re-seed empty clusters from random rows so every list stays usable
+        empty = np.flatnonzero(counts == 0)
+        if empty.size:
+            centroids[empty] = matrix[rng.choice(matrix.shape[0], empty.size, replace=False)]
+
+        normalize_rows(centroids)
+
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file approximate index with k-means centroids and tunable probing."""
+
+    def __init__(self, index: VectorIndex, n_lists: Optional[int] = None, n_probe: int = 8,
+                 n_iter: int = 10, train_size: int = 100000, seed: int = 0):
+        self.index = index
+        self.n_probe = n_probe
+
+        # A common rule of thumb is about sqrt(N) lists
+        n_lists = n_lists or max(1, int(math.sqrt(len(index))))
+        self.n_lists = max(1, min(n_lists, len(index)))
+
+        rng = np.random.default_rng(seed)
+        if len(index) > train_size:
+            sample = index.matrix[np.sort(rng.choice(len(index), train_size, replace=False))]
+        else:
+            sample = np.asarray(index.matrix)
+
+        started = time.perf_counter()
+        self.centroids = spherical_kmeans(sample, self.n_lists, n_iter, seed) if len(index) else \
+            np.zeros((0, index.dimension), dtype=np.float32)
+
+        labels = assign_clusters(index.matrix, self.centroids) if len(index) else np.zeros(0, dtype=np.int64)
+        self.list_rows = np.argsort(labels, kind="stable")
+        self.list_offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=self.n_lists))])
+        self.build_seconds = time.perf_counter() - started
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def list_sizes(self) -> np.ndarray:
+        """Number of documents in each inverted list."""
+        return np.diff(self.list_offsets)
+
+    def candidate_rows(self, query: np.ndarray, n_probe: int) -> np.ndarray:
+        """Rows stored in the ``n_probe`` lists whose centroids are closest to the query."""
+        probes = top_k_indices(self.centroids @ query, min(n_probe, self.n_lists))
+        return np.concatenate(
+            [self.list_rows[self.list_offsets[p]:self.list_offsets[p + 1]] for p in probes]
+        ) if probes.size else np.empty(0, dtype=np.int64)
+
+    def top_k(self, query: np.ndarray, k: int, n_probe: Optional[int] = None) -> np.ndarray:
+        """Return the approximate top k rows for a normalized query, best first."""
+        rows = self.candidate_rows(query, n_probe or self.n_probe)
+        scores = self.index.matrix[rows] @ query
+        return rows[top_k_indices(scores, k)]
+
+    def search(self, query_embedding: Sequence[float], threshold: float = 0.1, limit: int = 5,
+               n_probe: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Approximate cosine similarity search in the same result shape as VectorIndex."""
+        if not len(self) or not len(query_embedding):
+            return []
+
+        query = self.index.prepare_query(query_embedding)
+        if query is None:
+            return []
+
+        rows = self.top_k(query, limit, n_probe)
+        scores = np.clip(self.index.matrix[rows] @ query, -1.0, 1.0)
+        return [
+            format_result(self.index.ids[row], self.index.texts[row], float(score), threshold)
+            for row, score in zip(rows, scores)
+        ]
+
+    def search_batch(self, query_embeddings: Sequence[Sequence[float]], threshold: float = 0.1,
+                     limit: int = 5, n_probe: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """Approximate search for many queries."""
+        return [self.search(query, threshold, limit, n_probe) for query in query_embeddings]
+
+    def measure_recall(self, query_embeddings: Sequence[Sequence[float]], k: int = 10,
+                       n_probes: Sequence[int] = (1, 2, 4, 8, 16, 32)) -> List[Dict[str, Any]]:
+        """Measure recall@k and mean latency against exact search for several probe counts."""
+        queries = self.index.prepare_queries(query_embeddings)
+
+        started = time.perf_counter()
+        exact = [set(top_k_indices(self.index.matrix @ query, k).tolist()) for query in queries]
+        exact_ms = (time.perf_counter() - started) * 1000 / max(len(queries), 1)
+
+        report = []
+        for n_probe in n_probes:
+            if n_probe > self.n_lists:
+                continue
+            started = time.perf_counter()
+            approximate = [self.top_k(query, k, n_probe) for query in queries]
+            elapsed_ms = (time.perf_counter() - started) * 1000 / max(len(queries), 1)
+
+            scanned = sum(self.candidate_rows(query, n_probe).shape[0] for query in queries)
+            hits = sum(len(expected & set(found.tolist())) for expected, found in zip(exact, approximate))
+            expected_total = sum(len(expected) for expected in exact)
+            report.append({
+                "n_probe": n_probe,
+                "recall": hits / expected_total if expected_total else 1.0,
+                "latency_ms": elapsed_ms,
+                "exact_latency_ms": exact_ms,
+                "speedup": exact_ms / elapsed_ms if elapsed_ms else float("inf"),
+                "scanned_fraction": scanned / (len(queries) * len(self)) if len(queries) and len(self) else 0.0
+            })
+        return report
@@ -0,0 +1,333 @@
+"""
+Bulk Fixture Loader
+
+Seeds the API with synthetic profiles, projects and documents for
+performance testing. Profiles are created first, and projects and documents
+reference them. All requests go through one pooled keep-alive client,
+`--concurrency` at a time. Failed requests are retried with exponential
+backoff and jitter, and Retry-After is honoured. Creates are only retried
+when the server cannot have stored the row (429/503, or the connection was
+never made), so a retry never inserts a duplicate. Progress and throughput are
+printed as rows are created.
+
+Text lengths follow log-normal distributions (short blurbs, longer bios
+and descriptions, documents from a sentence to several paragraphs), so
+embedding and storage costs resemble real data, clipped to the column
+limits in docs/schema.sql. Generation is seeded and repeatable.
+
+The API has no batch create endpoints, so every row is its own POST. The
+created ids are written to a manifest that `--cleanup` uses to delete them
+again.
+
+Usage:
+    python src/scripts/seed_fixtures.py --profiles 1000 --projects-per-profile 3 --documents 100000
+    python src/scripts/seed_fixtures.py --url http://localhost:3001 --documents 5000 --concurrency 64
+    python src/scripts/seed_fixtures.py --cleanup fixtures_manifest.json
+
+Requirements:
+    pip install httpx
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+import httpx
+
+API_URL = "http://localhost:3000"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# A POST that failed with anything else may already have been committed
+CREATE_RETRY_STATUSES = {429, 503}
+# Errors raised before the request reached the server
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Column limits from docs/schema.sql
+BLURB_MAX = 40
+BIO_MAX = 700
+TITLE_MAX = 40
+SKILLS_MAX = 3
+TAGS_MAX = 5
+
+FIRST_NAMES = ["Ada", "Alan", "Grace", "Linus", "Margaret", "Dennis", "Barbara", "Ken", "Radia", "Guido",
+               "Frances", "Tim", "Hedy", "Brendan", "Katherine", "Yukihiro", "Anita", "Bjarne", "Sophie", "James"]
+LAST_NAMES = ["Lovelace", "Turing", "Hopper", "Torvalds", "Hamilton", "Ritchie", "Liskov", "Thompson", "Perlman",
+              "van Rossum", "Allen", "Berners-Lee", "Lamarr", "Eich", "Johnson", "Matsumoto", "Borg", "Stroustrup",
+              "Wilson", "Gosling"]
+TECHS = ["JavaScript", "TypeScript", "React", "Node.js", "Python", "Django", "FastAPI", "PostgreSQL", "Supabase",
+         "Docker", "Kubernetes", "AWS", "Go", "Rust", "Swift", "Kotlin", "TensorFlow", "PyTorch", "OpenAI", "Pinecone",
+         "Next.js", "Vue", "GraphQL", "Redis", "Figma"]
+KEYWORDS = ["web", "mobile", "ai", "search", "analytics", "realtime", "portfolio", "chatbot", "vision", "audio",
+            "education", "health", "finance", "devtools", "automation", "games", "social", "maps", "security", "data"]
+ROLES = ["full stack developer", "frontend engineer", "backend engineer", "data scientist", "ML engineer",
+         "DevOps engineer", "mobile developer", "UX designer", "product engineer", "platform engineer"]
+SENTENCES = [
+    "Built {product} with {tech} and {tech2}, serving thousands of users every day.",
+    "Led the migration of a legacy {product} to {tech}, cutting response times in half.",
+    "Designed the data model and APIs for a {keyword} platform on {tech}.",
+    "Shipped a {keyword} feature end to end, from prototype in {tech2} to production.",
+    "Enjoys mentoring, writing documentation and pairing on hard {keyword} problems.",
+    "Automated deployment of the {product} with {tech} pipelines and infrastructure as code.",
+    "Experimented with {tech} embeddings to make {keyword} search feel instant.",
+    "Trained and evaluated models in {tech2} for a {keyword} recommendation system.",
+    "Ran user research sessions and turned the findings into a redesigned {product}.",
+    "Profiled and optimised the {product}, removing the slowest database queries.",
+]
+PRODUCTS = ["dashboard", "mobile app", "API", "marketplace", "chat assistant", "design system", "data pipeline",
+            "browser extension", "CLI", "video platform"]
+
+
+def lognormal_count(rng, median, sigma, low, high):
+    """A log-normally distributed count, clipped to [low, high]."""
+    return max(low, min(high, round(rng.lognormvariate(0, sigma) * median)))
+
+
+def clip(text, limit):
+    """Cut ``text`` to at most ``limit`` characters, at a word boundary when there is one."""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit + 1].rsplit(" ", 1)[0]
+    return (cut if 0 < len(cut) <= limit else text[:limit]).rstrip(" ,.")
+
+
+def paragraph(rng, sentences):
+    """Fill ``sentences`` random sentence templates with technologies, products and keywords."""
+    return " ".join(
+        rng.choice(SENTENCES).format(product=rng.choice(PRODUCTS), tech=rng.choice(TECHS),
+                                     tech2=rng.choice(TECHS), keyword=rng.choice(KEYWORDS))
+        for _ in range(sentences)
+    )
+
+
+def generate_profile(rng, n):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {n}"
+    role = rng.choice(ROLES)
+    return {
+        "name": name,
+        "blurb": clip(f"{role.capitalize()} into {rng.choice(KEYWORDS)}", BLURB_MAX),
+        "bio": clip(paragraph(rng, lognormal_count(rng, 5, 0.6, 1, 30)), BIO_MAX),
+        "skills": rng.sample(TECHS, rng.randint(1, SKILLS_MAX)),
+        "github_url": f"https://github.com/fixture-user-{n}",
+        "linkedin_url": f"https://linkedin.com/in/fixture-user-{n}"
+    }
+
+
+def generate_project(rng, n, profile_id):
+    keyword = rng.choice(KEYWORDS)
+    return {
+        "title": clip(f"{keyword.capitalize()} {rng.choice(PRODUCTS)} {n}", TITLE_MAX),
+        "description": paragraph(rng, lognormal_count(rng, 4, 0.7, 1, 25)),
+        "techs": rng.sample(TECHS, rng.randint(1, TAGS_MAX)),
+        "keywords": [keyword] + rng.sample([k for k in KEYWORDS if k != keyword], rng.randint(0, TAGS_MAX - 1)),
+        "github_url": f"https://github.com/fixture-user/project-{n}",
+        "deploy_url": f"https://project-{n}.example.com",
+        "profile_id": profile_id
+    }
+
+
+def generate_document(rng, n, profile_id):
+    content_type = rng.choice(["profile", "project"])
+    return {
+        "text": paragraph(rng, lognormal_count(rng, 3, 0.9, 1, 60)),
+        "userId": profile_id,
+        "metadata": {"source": "fixture", "type": content_type, "fixture": n}
+    }
+
+
+class Progress:
+    """Counts created and failed rows per kind and prints throughput periodically."""
+
+    def __init__(self, total, interval=2.0):
+        self.total = total
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.created = {}
+        self.failed = {}
+        self.retries = 0
+
+    @property
+    def done(self):
+        return sum(self.created.values()) + sum(self.failed.values())
+
+    def record(self, kind, ok):
+        counts = self.created if ok else self.failed
+        counts[kind] = counts.get(kind, 0) + 1
+        now = time.perf_counter()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        eta = (self.total - self.done) / rate if rate else float("inf")
+        print(f"ℹ {self.done}/{self.total} rows ({self.done / max(self.total, 1) * 100:.1f}%), "
+              f"{rate:.1f} rows/s, {sum(self.failed.values())} failed, {self.retries} retries, "
+              f"ETA {eta:.0f}s")
+
+
+class FixtureLoader:
+    """Creates rows through the API with bounded concurrency and retry/backoff."""
+
+    def __init__(self, client, concurrency, progress, max_retries=5, backoff=0.5, max_backoff=30.0, seed=0):
+        self.client = client
+        self.concurrency = concurrency
+        self.progress = progress
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.random = random.Random(seed)
+
+    def retry_delay(self, attempt, response=None):
+        """Exponential backoff with full jitter, or the server's Retry-After when it sends one."""
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return float(response.headers["Retry-After"])
+        return self.random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def request(self, method, path, body=None):
+        """Send one request, retrying connection errors and retryable statuses.
+
+        POSTs are not idempotent, so they are only retried when the row cannot
+        have been created.
+        """
+        create = method == "POST"
+        statuses = CREATE_RETRY_STATUSES if create else RETRY_STATUSES
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = await self.client.request(method, path, json=body)
+                if response.status_code not in statuses:
+                    return response
+            except httpx.TransportError as e:
+                if create and not isinstance(e, UNSENT_ERRORS):
+                    return None
+            if attempt == self.max_retries:
+                return response
+            self.progress.retries += 1
+            await asyncio.sleep(self.retry_delay(attempt, response))
+
+    async def create_all(self, kind, path, rows, id_of):
+        """POST every row with ``concurrency`` workers and return the created ids in row order."""
+        rows = iter(enumerate(rows))
+        ids = {}
+
+        async def worker():
+            for n, row in rows:
+                response = await self.request("POST", path, row)
+                ok = response is not None and response.status_code == 201
+                if ok:
+                    ids[n] = id_of(response.json())
+                self.progress.record(kind, ok)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return [ids[n] for n in sorted(ids)]
+
+    async def delete_all(self, path, ids):
+        """DELETE every id with ``concurrency`` workers; returns how many succeeded."""
+        ids = iter(ids)
+        deleted = [0]
+
+        async def worker():
+            for doc_id in ids:
+                response = await self.request("DELETE", f"{path}/{doc_id}")
+                if response is not None and response.status_code == 200:
+                    deleted[0] += 1
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return deleted[0]
+
+
+def record_id(body):
+    return (body.get("data") or {}).get("id")
+
+
+def document_id(body):
+    return body.get("documentId")
+
+
+async def seed(url, profiles, projects_per_profile, documents, concurrency, seed_value, manifest_path,
+               timeout=60.0, max_retries=5):
+    rng = random.Random(seed_value)
+    total = profiles + profiles * projects_per_profile + documents
+    progress = Progress(total)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        loader = FixtureLoader(client, concurrency, progress, max_retries=max_retries, seed=seed_value)
+
+        # Generators keep memory flat: rows are built as workers pull them
+        profile_ids = await loader.create_all(
+            "profiles", "/api/profiles", (generate_profile(rng, n) for n in range(profiles)), record_id
+        )
+        if not profile_ids:
+            print("✗ No profiles were created, so projects and documents cannot be seeded")
+            return None
+
+        project_rows = (
+            generate_project(rng, n, profile_ids[n % len(profile_ids)])
+            for n in range(len(profile_ids) * projects_per_profile)
+        )
+        project_ids = await loader.create_all("projects", "/api/projects", project_rows, record_id)
+
+        document_rows = (generate_document(rng, n, rng.choice(profile_ids)) for n in range(documents))
+        document_ids = await loader.create_all("documents", "/api/documents", document_rows, document_id)
+
+    progress.report()
+    manifest = {"url": url, "profiles": profile_ids, "projects": project_ids, "documents": document_ids}
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+
+    elapsed = time.perf_counter() - progress.started
+    print(f"✓ Created {len(profile_ids)} profiles, {len(project_ids)} projects and {len(document_ids)} documents "
+          f"in {elapsed:.1f}s ({progress.done / elapsed if elapsed else 0:.1f} rows/s)")
+    if progress.failed:
+        print(f"⚠ Failed after retries: {progress.failed}")
+    print(f"ℹ Wrote created ids to {manifest_path}")
+    return manifest
+
+
+async def cleanup(manifest_path, concurrency, timeout=60.0):
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    total = sum(len(manifest.get(kind, [])) for kind in ("documents", "projects", "profiles"))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=manifest["url"], limits=limits, timeout=timeout) as client:
+        loader = FixtureLoader(client, concurrency, Progress(total))
+        # Children first, so projects never outlive their profiles
+        for kind in ("documents", "projects", "profiles"):
+            deleted = await loader.delete_all(f"/api/{kind}", manifest.get(kind, []))
+            print(f"✓ Deleted {deleted}/{len(manifest.get(kind, []))} {kind}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the API with synthetic profiles, projects and documents")
+    parser.add_argument("--url", default=API_URL, help="API base URL")
+    parser.add_argument("--profiles", type=int, default=100, help="number of profiles to create")
+    parser.add_argument("--projects-per-profile", type=int, default=2, help="projects created for each profile")
+    parser.add_argument("--documents", type=int, default=1000, help="number of documents to create")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight at once")
+    parser.add_argument("--max-retries", type=int, default=5, help="retries per request before giving up")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the generated data")
+    parser.add_argument("--manifest", default="fixtures_manifest.json", help="where to write the created ids")
+    parser.add_argument("--cleanup", metavar="MANIFEST", help="delete everything listed in a manifest and exit")
+    args = parser.parse_args(argv)
+
+    if args.cleanup:
+        asyncio.run(cleanup(args.cleanup, args.concurrency, args.timeout))
+        return 0
+
+    print(f"ℹ Seeding {args.url}: {args.profiles} profiles, {args.projects_per_profile} projects each, "
+          f"{args.documents} documents, concurrency {args.concurrency}")
+    manifest = asyncio.run(seed(args.url, args.profiles, args.projects_per_profile, args.documents,
+                                args.concurrency, args.seed, args.manifest, args.timeout, args.max_retries))
+    return 0 if manifest else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Mock Documents API
+
+A local stand-in for the Node API's document, profile and project endpoints,
+so the load generator and fixture loader can be exercised without Supabase,
+Pinecone or OpenAI. It keeps everything in memory, speaks HTTP/1.1 with
+keep-alive, and can add an artificial latency to every request and fail a
+fraction of them with 503 to exercise client retries.
+
+It also answers OpenAI-style embeddings requests with deterministic unit
+vectors derived from each input's hash, so an OpenAI client pointed at it
+(``base_url=http://127.0.0.1:3001/v1``) can run the embedding pipeline offline.
+
+Endpoints:
+    GET    /health
+    POST   /api/documents
+    GET    /api/documents/search?query=...&limit=5
+    DELETE /api/documents/:id
+    POST   /api/profiles, /api/projects
+    DELETE /api/profiles/:id, /api/projects/:id
+    POST   /v1/embeddings
+
+Usage:
+    python tests/mock_server.py --port 3001 --latency-ms 20 --jitter-ms 10 --error-rate 0.01
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+DEFAULT_EMBEDDING_DIMENSION = 1536
+
+
+def mock_embedding(text, dimension):
+    """A deterministic unit vector for ``text``: equal texts always embed identically."""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimension)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class MockDocumentsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def simulate_latency(self):
+        latency = self.server.latency_ms + random.uniform(0, self.server.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def inject_error(self):
+        """Answer 503 for a random ``error_rate`` fraction of requests."""
+        if random.random() < self.server.error_rate:
+            self.send_json(503, {"error": "Injected failure"})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.simulate_latency()
+
+        if url.path == "/health":
+            self.send_json(200, {"status": "healthy", "service": "mock-documents-api"})
+        elif self.inject_error():
+            return
+        elif url.path == "/api/documents/search":
+            params = parse_qs(url.query)
+            query = params.get("query", [""])[0]
+            if not query:
+                self.send_json(400, {"error": "Search query is required"})
+                return
+            limit = int(params.get("limit", ["5"])[0])
+            words = set(query.lower().split())
+            with self.server.lock:
+                scored = [
+                    (len(words & set(text.lower().split())) / max(len(words), 1), doc_id, text)
+                    for doc_id, text in self.server.documents.items()
+                ]
+            scored.sort(reverse=True)
+            results = [{"id": doc_id, "score": score, "text": text} for score, doc_id, text in scored[:limit]]
+            self.send_json(200, {"success": True, "count": len(results), "results": results})
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self.simulate_latency()
+
+        path = urlparse(self.path).path
+        if self.inject_error():
+            return
+        if path == "/v1/embeddings":
+            self.create_embeddings(body)
+        elif path in ("/api/profiles", "/api/projects"):
+            self.create_record(path.rsplit("/", 1)[-1], body)
+        elif path != "/api/documents":
+            self.send_json(404, {"error": "Not found"})
+        elif not body.get("text"):
+            self.send_json(400, {"error": "Document text is required"})
+        elif not body.get("userId"):
+            self.send_json(400, {"error": "User ID is required"})
+        else:
+            doc_id = str(uuid.uuid4())
+            with self.server.lock:
+                self.server.documents[doc_id] = body["text"]
+            self.send_json(201, {"success": True, "documentId": doc_id, "message": "Document stored successfully"})
+
+    def create_embeddings(self, body):
+        inputs = body.get("input")
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        if not inputs or not all(isinstance(text, str) for text in inputs):
+            self.send_json(400, {"error": {"message": "'input' must be a string or a list of strings"}})
+            return
+        dimension = int(body.get("dimensions") or self.server.embedding_dimension)
+        data = [{"object": "embedding", "index": i, "embedding": mock_embedding(text, dimension)}
+                for i, text in enumerate(inputs)]
+        tokens = sum(len(text.split()) for text in inputs)
+        self.send_json(200, {"object": "list", "data": data, "model": body.get("model", "mock"),
+                             "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+    def create_record(self, collection, body):
+        required = ("name", "blurb", "bio") if collection == "profiles" else ("title", "description", "profile_id")
+        if any(not body.get(field) for field in required):
+            self.send_json(400, {"success": False, "message": "Missing required fields"})
+            return
+        record = dict(body, id=str(uuid.uuid4()))
+        with self.server.lock:
+            self.server.records[collection][record["id"]] = record
+        self.send_json(201, {"success": True, "data": record, "message": "Created successfully"})
+
+    def do_DELETE(self):
+        path = urlparse(self.path).path
+        self.simulate_latency()
+        if self.inject_error():
+            return
+
+        collection = path.split("/")[2] if path.count("/") == 3 else None
+        if collection in ("profiles", "projects"):
+            with self.server.lock:
+                found = self.server.records[collection].pop(path.rsplit("/", 1)[-1], None)
+            self.send_json(200 if found else 404, {"success": found is not None})
+            return
+        if not path.startswith("/api/documents/"):
+            self.send_json(404, {"error": "Not found"})
+            return
+        doc_id = path.rsplit("/", 1)[-1]
+        with self.server.lock:
+            self.server.documents.pop(doc_id, None)
+        self.send_json(200, {"success": True, "message": f"Document {doc_id} deleted successfully"})
+
+
+def start_mock_server(port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                      embedding_dimension=DEFAULT_EMBEDDING_DIMENSION):
+    """Start the mock API on a background thread and return (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockDocumentsHandler)
+    server.daemon_threads = True
+    server.documents = {}
+    server.records = {"profiles": {}, "projects": {}}
+    server.lock = threading.Lock()
+    server.latency_ms = latency_ms
+    server.jitter_ms = jitter_ms
+    server.error_rate = error_rate
+    server.embedding_dimension = embedding_dimension
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock documents API for load testing and fixture loading")
+    parser.add_argument("--port", type=int, default=3001)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fixed latency added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform random latency added on top")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--embedding-dimension", type=int, default=DEFAULT_EMBEDDING_DIMENSION,
+                        help="length of the vectors returned by /v1/embeddings")
+    args = parser.parse_args()
+
+    server, url = start_mock_server(args.port, args.latency_ms, args.jitter_ms, args.error_rate,
+                                    args.embedding_dimension)
+    print(f"ℹ Mock documents API listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
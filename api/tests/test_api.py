@@ -1,7 +1,38 @@
-import requests
-import time
+"""
+Semantic Search API Load Test
+
+Drives the documents API (POST /api/documents, GET /api/documents/search,
+DELETE /api/documents/:id) from an asyncio client that reuses a pool of
+keep-alive connections, and reports throughput and p50/p95/p99 latency per
+operation.
+
+Two load models are supported:
+    closed - ``--concurrency`` virtual users each send their next request as
+             soon as the previous one completes (optionally capped by --rate)
+    open   - requests arrive at ``--rate`` per second regardless of how fast
+             the server answers; latency is measured from the scheduled start,
+             so queueing delay is included instead of hidden
+
+Usage:
+    python tests/test_api.py                                  # closed loop, 4 users, 30 s
+    python tests/test_api.py --mode open --rate 50 --duration 60
+    python tests/test_api.py --mix create=1,search=8,delete=1 --concurrency 16
+    python tests/test_api.py --mock --mock-latency-ms 20      # against a local mock server
+    python tests/test_api.py --json results.json
+
+Requirements:
+    pip install httpx
+"""
+
+import argparse
+import asyncio
 import json
+import math
+import random
 import sys
+import time
+
+import httpx
 
 # API URL
 API_URL = "http://localhost:3000"
@@ -27,139 +58,329 @@ test_queries = [
 # Test user IDs
 test_user_ids = [f"test_user_{i+1}" for i in range(5)]
 
-# Document IDs created during the test
-doc_ids = []
+OPERATIONS = ("create", "search", "delete")
+DEFAULT_MIX = "create=1,search=8,delete=1"
+
+# Latency histogram bucket upper bounds in milliseconds
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
 
 def print_header(title):
     print("\n" + "=" * 80)
     print(title.center(80))
     print("=" * 80)
 
-def check_api_health():
-    print_header("SEMANTIC SEARCH API TEST")
-    print("ℹ Testing API at:", API_URL)
-    
+
+def parse_mix(expression):
+    """Parse 'create=1,search=8,delete=1' into normalized operation weights."""
+    weights = {}
+    for part in expression.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}', expected one of {', '.join(OPERATIONS)}")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Operation mix must have a positive total weight")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_histogram(latencies_ms):
+    """Count latencies into HISTOGRAM_BUCKETS_MS, with a final overflow bucket."""
+    counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+    for latency in latencies_ms:
+        for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if latency <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f"<={bound}ms" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+    return dict(zip(labels, counts))
+
+
+class LoadStats:
+    """Per-operation latencies, status codes and errors for one run."""
+
+    def __init__(self):
+        self.latencies = {op: [] for op in OPERATIONS}
+        self.statuses = {op: {} for op in OPERATIONS}
+        self.errors = {op: 0 for op in OPERATIONS}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, op, latency_ms, status=None, error=False):
+        self.latencies[op].append(latency_ms)
+        if status is not None:
+            self.statuses[op][status] = self.statuses[op].get(status, 0) + 1
+        if error:
+            self.errors[op] += 1
+
+    def summary(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        operations = {}
+        for op in OPERATIONS:
+            values = sorted(self.latencies[op])
+            if not values:
+                continue
+            operations[op] = {
+                "requests": len(values),
+                "errors": self.errors[op],
+                "throughput_rps": len(values) / elapsed if elapsed else 0.0,
+                "mean_ms": sum(values) / len(values),
+                "p50_ms": percentile(values, 0.50),
+                "p95_ms": percentile(values, 0.95),
+                "p99_ms": percentile(values, 0.99),
+                "max_ms": values[-1],
+                "statuses": {str(code): count for code, count in sorted(self.statuses[op].items())},
+                "histogram": latency_histogram(values)
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            "elapsed_s": elapsed,
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": total / elapsed if elapsed else 0.0,
+            "operations": operations
+        }
+
+
+class LoadGenerator:
+    """Issues a weighted mix of create/search/delete requests over one pooled client."""
+
+    def __init__(self, client, mix, threshold=0.45, limit=5, seed=0):
+        self.client = client
+        self.mix = mix
+        self.threshold = threshold
+        self.limit = limit
+        self.random = random.Random(seed)
+        self.stats = LoadStats()
+        self.doc_ids = []
+
+    def choose_operation(self):
+        op = self.random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        # Nothing to delete yet: create instead so the mix stays self-sustaining
+        return "create" if op == "delete" and not self.doc_ids else op
+
+    async def create(self):
+        i = self.random.randrange(len(test_docs))
+        response = await self.client.post(
+            "/api/documents",
+            json={"text": test_docs[i], "userId": test_user_ids[i], "metadata": {"source": "load-test"}}
+        )
+        if response.status_code == 201:
+            doc_id = response.json().get("documentId")
+            if doc_id is not None:
+                self.doc_ids.append(doc_id)
+        return response.status_code, response.status_code != 201
+
+    async def search(self):
+        response = await self.client.get(
+            "/api/documents/search",
+            params={"query": self.random.choice(test_queries), "threshold": self.threshold, "limit": self.limit}
+        )
+        return response.status_code, response.status_code != 200
+
+    async def delete(self):
+        doc_id = self.doc_ids.pop(self.random.randrange(len(self.doc_ids)))
+        response = await self.client.delete(f"/api/documents/{doc_id}")
+        return response.status_code, response.status_code != 200
+
+    async def run_operation(self, op, scheduled=None):
+        """Run one operation and record its latency (from ``scheduled`` when given)."""
+        started = scheduled if scheduled is not None else time.perf_counter()
+        try:
+            status, error = await getattr(self, op)()
+        except httpx.HTTPError:
+            status, error = None, True
+        self.stats.record(op, (time.perf_counter() - started) * 1000, status, error)
+
+    async def closed_loop(self, concurrency, duration=None, total_requests=None, rate=None):
+        """``concurrency`` users each issuing requests back to back until time or requests run out."""
+        deadline = time.perf_counter() + duration if duration else None
+        remaining = [total_requests] if total_requests else None
+        interval = concurrency / rate if rate else 0.0
+
+        async def user():
+            while deadline is None or time.perf_counter() < deadline:
+                if remaining is not None:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                started = time.perf_counter()
+                await self.run_operation(self.choose_operation())
+                pause = interval - (time.perf_counter() - started)
+                if pause > 0:
+                    await asyncio.sleep(pause)
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+
+    async def open_loop(self, rate, concurrency, duration=None, total_requests=None):
+        """Start requests on a Poisson arrival schedule at ``rate`` per second.
+
+        ``concurrency`` only bounds the number of requests in flight; requests
+        that wait for a slot are still timed from their scheduled arrival. The
+        operation is chosen once the slot is free, so a delete never targets a
+        document another queued delete has already taken.
+        """
+        slots = asyncio.Semaphore(concurrency)
+        deadline = time.perf_counter() + duration if duration else None
+        tasks = []
+
+        async def arrival(scheduled):
+            async with slots:
+                await self.run_operation(self.choose_operation(), scheduled)
+
+        scheduled = time.perf_counter()
+        while (deadline is None or scheduled < deadline) and (not total_requests or len(tasks) < total_requests):
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(arrival(scheduled)))
+            scheduled += self.random.expovariate(rate)
+
+        await asyncio.gather(*tasks)
+
+    async def cleanup(self):
+        """Delete every document this run created and did not delete."""
+        doc_ids, self.doc_ids = self.doc_ids, []
+        await asyncio.gather(*(self.client.delete(f"/api/documents/{doc_id}") for doc_id in doc_ids),
+                             return_exceptions=True)
+        return len(doc_ids)
+
+
+async def check_api_health(client):
     print("ℹ Checking API health...")
     try:
-        response = requests.get(f"{API_URL}/health")
+        response = await client.get("/health")
         if response.status_code == 200:
-            data = response.json()
-            print(f"✓ API is healthy: {data.get('status', 'unknown')}")
+            print(f"✓ API is healthy: {response.json().get('status', 'unknown')}")
             return True
-        else:
-            print(f"✗ API returned status code: {response.status_code}")
-            print("⚠ API health check failed. Please make sure the API is running.")
-            print(f"ℹ Start the API with: cd api && node src/server.js")
-            return False
-    except requests.exceptions.ConnectionError:
+        print(f"✗ API returned status code: {response.status_code}")
+    except httpx.HTTPError:
         print("✗ Failed to connect to API")
-        print("⚠ API connection failed. Please make sure the API is running.")
-        print(f"ℹ Start the API with: cd api && node src/server.js")
-        return False
-
-def create_test_vectors():
-    print_header("CREATING TEST VECTORS")
-    
-    success_count = 0
-    
-    for i, (doc, user_id) in enumerate(zip(test_docs, test_user_ids)):
-        print(f"ℹ Creating vector {i+1}/{len(test_docs)}: '{doc[:50]}...'")
-        try:
-            response = requests.post(
-                f"{API_URL}/api/documents",
-                json={"text": doc, "userId": user_id, "metadata": {"source": "test"}}
-            )
-            
-            if response.status_code == 201:
-                data = response.json()
-                doc_id = data.get('documentId')
-                doc_ids.append(doc_id)
-                print(f"✓ Created vector with ID: {doc_id}")
-                success_count += 1
-            else:
-                print(f"✗ Failed to create vector: {response.status_code}")
-                if response.text:
-                    print(f"  Error: {response.text}")
-                print("⚠ Failed to create vector")
-        except Exception as e:
-            print(f"✗ Exception: {str(e)}")
-    
-    print(f"ℹ Created {success_count}/{len(test_docs)} vectors")
-    
-    if success_count < len(test_docs):
-        print("⚠ Not all vectors were created. Tests may not work correctly.")
-        
-    if success_count == 0:
-        print("⚠ No vectors were created. Cannot continue with tests.")
-        return False
-    
-    # Give a moment for vectors to be indexed if needed
-    print("ℹ Waiting for vectors to be indexed (3 minutes)...")
-    time.sleep(1)
-    
-    return True
-
-def search_vectors():
-    print_header("SEARCHING VECTORS")
-    
-    for i, query in enumerate(test_queries):
-        print(f"ℹ Query {i+1}/{len(test_queries)}: '{query}'")
-        try:
-            response = requests.get(
-                f"{API_URL}/api/documents/search",
-                params={"query": query, "threshold": 0.45}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                results = data.get('results', [])
-                print(f"✓ Found {len(results)} results")
-                
-                # Display result details if any found
-                if results:
-                    for j, result in enumerate(results):
-                        score = result.get('score', 0)
-                        text = result.get('text', '')[:50] + '...'
-                        print(f"  Result {j+1}: [{score:.4f}] {text}")
-                    print()
-            else:
-                print(f"✗ Search failed: {response.status_code}")
-                if response.text:
-                    print(f"  Error: {response.text}")
-        except Exception as e:
-            print(f"✗ Exception: {str(e)}")
-        
-        print()
-
-def delete_test_vectors():
-    print_header("DELETING TEST VECTORS")
-    
-    for i, doc_id in enumerate(doc_ids):
-        print(f"ℹ Deleting vector {i+1}/{len(doc_ids)}: ID {doc_id}")
-        try:
-            response = requests.delete(f"{API_URL}/api/documents/{doc_id}")
-            
-            if response.status_code == 200:
-                print(f"✓ Deleted vector with ID: {doc_id}")
-            else:
-                print(f"✗ Failed to delete vector: {response.status_code}")
-                if response.text:
-                    print(f"  Error: {response.text}")
-        except Exception as e:
-            print(f"✗ Exception: {str(e)}")
-
-def main():
-    if not check_api_health():
-        return
-    
-    if not create_test_vectors():
-        return
-    
-    search_vectors()
-    
-    delete_test_vectors()
-    
+    print("⚠ API health check failed. Please make sure the API is running.")
+    print("ℹ Start the API with: cd api && node src/server.js")
+    return False
+
+
+async def run_load_test(url, mode="closed", concurrency=4, rate=None, duration=30.0, total_requests=None,
+                        mix=DEFAULT_MIX, threshold=0.45, limit=5, timeout=30.0, seed=0):
+    """Run one load test against ``url`` and return its summary, or None if the API is down."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        if not await check_api_health(client):
+            return None
+
+        generator = LoadGenerator(client, parse_mix(mix) if isinstance(mix, str) else mix, threshold, limit, seed)
+        if mode == "open":
+            if not rate:
+                raise ValueError("Open-loop mode needs a request rate")
+            await generator.open_loop(rate, concurrency, duration, total_requests)
+        else:
+            await generator.closed_loop(concurrency, duration, total_requests, rate)
+        generator.stats.finished = time.perf_counter()
+
+        cleaned = await generator.cleanup()
+        if cleaned:
+            print(f"ℹ Deleted {cleaned} documents left over from the run")
+
+    summary = generator.stats.summary()
+    summary["config"] = {
+        "url": url, "mode": mode, "concurrency": concurrency, "rate": rate,
+        "duration_s": duration, "requests": total_requests, "mix": generator.mix
+    }
+    return summary
+
+
+def print_summary(summary):
+    print_header("LOAD TEST RESULTS")
+    print(f"ℹ {summary['requests']} requests in {summary['elapsed_s']:.1f}s "
+          f"({summary['throughput_rps']:.1f} req/s), {summary['errors']} errors")
+
+    for op, stats in summary["operations"].items():
+        print(f"\n{op.upper()}: {stats['requests']} requests, {stats['throughput_rps']:.1f} req/s, "
+              f"{stats['errors']} errors, statuses {stats['statuses']}")
+        print(f"  p50 {stats['p50_ms']:.1f} ms | p95 {stats['p95_ms']:.1f} ms | "
+              f"p99 {stats['p99_ms']:.1f} ms | max {stats['max_ms']:.1f} ms")
+        peak = max(stats["histogram"].values()) or 1
+        for label, count in stats["histogram"].items():
+            if count:
+                print(f"  {label:>10} {'#' * max(1, round(40 * count / peak))} {count}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the semantic search documents API")
+    parser.add_argument("--url", default=API_URL, help="API base URL")
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed", help="closed- or open-loop load model")
+    parser.add_argument("--concurrency", type=int, default=4, help="virtual users (closed) or max in-flight requests (open)")
+    parser.add_argument("--rate", type=float, default=None, help="target requests per second (required for open loop)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run (0 = until --requests is reached)")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights, e.g. create=1,search=8,delete=1")
+    parser.add_argument("--threshold", type=float, default=0.45, help="search similarity threshold")
+    parser.add_argument("--limit", type=int, default=5, help="search result limit")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the operation mix")
+    parser.add_argument("--json", help="write the summary to this JSON file")
+    parser.add_argument("--mock", action="store_true", help="run against an in-process mock server instead of --url")
+    parser.add_argument("--mock-latency-ms", type=float, default=0.0, help="latency added by the mock server")
+    parser.add_argument("--mock-jitter-ms", type=float, default=0.0, help="random jitter added by the mock server")
+    args = parser.parse_args(argv)
+    if not args.duration and not args.requests:
+        parser.error("either --duration or --requests must be set")
+    if args.mode == "open" and not (args.rate and args.rate > 0):
+        parser.error("--mode open needs a positive --rate")
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    url, server = args.url, None
+    if args.mock:
+        from mock_server import start_mock_server
+        server, url = start_mock_server(latency_ms=args.mock_latency_ms, jitter_ms=args.mock_jitter_ms)
+
+    print_header("SEMANTIC SEARCH API LOAD TEST")
+    print("ℹ Testing API at:", url)
+    print(f"ℹ {args.mode}-loop, concurrency {args.concurrency}, "
+          f"rate {args.rate or 'unbounded'}, mix {args.mix}")
+
+    try:
+        summary = asyncio.run(run_load_test(
+            url, args.mode, args.concurrency, args.rate, args.duration or None, args.requests,
+            args.mix, args.threshold, args.limit, args.timeout, args.seed
+        ))
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    if summary is None:
+        return 1
+
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nℹ Wrote results to {args.json}")
+
     print_header("TEST COMPLETE")
+    return 1 if summary["errors"] else 0
+
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Lazily Constructed Clients
+
+Supabase, OpenAI and the embedding cache/pipeline are built on first use and
+then reused, so importing a tool costs nothing and a run that never touches
+the network (e.g. searching a local snapshot with cached query embeddings)
+never imports ``supabase`` or ``openai`` at all.
+
+Usage:
+    from clients import get_supabase, get_embedding_pipeline
+
+    supabase = get_supabase()                       # created on first call
+    embeddings = get_embedding_pipeline().embed(texts)
+
+    # Cache-only embeddings: misses fail instead of calling OpenAI
+    pipeline = get_embedding_pipeline(offline=True)
+
+Requirements:
+    pip install python-dotenv
+    pip install supabase openai    # only when those clients are used
+"""
+
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from embedding_cache import EmbeddingCache, DEFAULT_CACHE_PATH
+from embedding_pipeline import EmbeddingPipeline
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+@lru_cache(maxsize=None)
+def load_environment() -> None:
+    """Load ``.env`` once; a missing python-dotenv just means only the real environment is used."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def credentials() -> Dict[str, Optional[str]]:
+    """Supabase and OpenAI credentials from the environment (after loading ``.env``)."""
+    load_environment()
+    return {
+        "supabase_url": os.getenv("SUPABASE_URL"),
+        "supabase_key": os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY"),
+        "openai_api_key": os.getenv("OPENAI_API_KEY")
+    }
+
+
+@lru_cache(maxsize=None)
+def get_supabase() -> Any:
+    """The shared Supabase client, created on first use."""
+    creds = credentials()
+    if not creds["supabase_url"] or not creds["supabase_key"]:
+        raise RuntimeError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY or SUPABASE_ANON_KEY must be set")
+
+    from supabase import create_client
+    return create_client(creds["supabase_url"], creds["supabase_key"])
+
+
+@lru_cache(maxsize=None)
+def get_embedding_cache() -> EmbeddingCache:
+    """The shared on-disk embedding cache."""
+    load_environment()
+    return EmbeddingCache(os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH))
+
+
+class _OfflineEmbeddings:
+    """Stands in for ``openai.embeddings`` when network calls are not allowed."""
+
+    def create(self, model: str, input: Any) -> Any:
+        raise RuntimeError(f"offline mode: {len(input)} texts are not in the embedding cache")
+
+
+class _OfflineClient:
+    embeddings = _OfflineEmbeddings()
+
+
+@lru_cache(maxsize=None)
+def get_embedding_pipeline(offline: bool = False) -> EmbeddingPipeline:
+    """The shared embedding pipeline.
+
+    ``openai`` is only imported on the first cache miss, and it reads
+    OPENAI_API_KEY from the environment that ``load_environment`` populated.
+    """
+    client = _OfflineClient() if offline else None
+    return EmbeddingPipeline(client=client, model=EMBEDDING_MODEL, cache=get_embedding_cache())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Streaming Corpus Loader
+
+Pages through the Supabase ``documents`` table by id range (keyset
+pagination), selecting only the columns the search path needs, and decodes
+embeddings straight into a preallocated float32 buffer as pages arrive. Peak
+memory stays close to the size of the final matrix instead of holding every
+row as a dict alongside its JSON-string embedding.
+
+Usage:
+    from corpus_loader import load_corpus
+
+    corpus = load_corpus(supabase, page_size=1000, metadata_columns=("person_id", "metadata"))
+    index = VectorIndex(corpus.ids, corpus.texts, normalize_rows(corpus.matrix), normalized=True,
+                        metadata=corpus.metadata)
+
+Requirements:
+    pip install supabase numpy
+"""
+
+from typing import List, Dict, Any, Optional, Iterator, Tuple, NamedTuple, Union
+
+import numpy as np
+
+from embedding_codec import EmbeddingDecoder, MODEL_DIMENSIONS
+from instrumentation import METRICS
+from metadata_filter import document_metadata
+
+DEFAULT_COLUMNS = ("id", "text", "embedding")
+
+# (change timestamp, id) of the last row a sync applied
+ChangeCursor = Tuple[str, Any]
+
+
+class Corpus(NamedTuple):
+    """Loaded documents: ids, texts, float32 embedding matrix and optional per-row metadata."""
+    ids: List[Any]
+    texts: List[str]
+    matrix: np.ndarray
+    metadata: Optional[List[Dict[str, Any]]] = None
+
+
+def iter_document_pages(client: Any, page_size: int = 1000,
+                        columns: Tuple[str, ...] = DEFAULT_COLUMNS,
+                        start_after: Any = None) -> Iterator[List[Dict[str, Any]]]:
+    """Yield pages of document rows ordered by id, paging with ``id > last_id``."""
+    last_id = start_after
+
+    while True:
+        query = client.table('documents').select(*columns).order('id').limit(page_size)
+        if last_id is not None:
+            query = query.gt('id', last_id)
+
+        with METRICS.span("fetch"):
+            rows = query.execute().data or []
+        METRICS.incr("documents_fetched", len(rows))
+        if not rows:
+            return
+
+        yield rows
+
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]['id']
+
+
+def iter_changed_pages(client: Any, since: Union[str, ChangeCursor, None], column: str = "updated_at",
+                       metadata_columns: Tuple[str, ...] = (),
+                       page_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+    """Yield pages of documents changed since ``since``, oldest first.
+
+    Pages are ordered by (column, id) and fetched with a keyset cursor on that
+    pair, so rows sharing a timestamp are never skipped at a page boundary and
+    rows updated during the sync move past the cursor instead of shifting an
+    offset. ``since`` is either a timestamp, which includes rows changed at
+    exactly that time, or a (timestamp, id) cursor from ``sync_since``, which
+    resumes just after that row.
+    """
+    columns = DEFAULT_COLUMNS + tuple(c for c in (column,) + tuple(metadata_columns) if c not in DEFAULT_COLUMNS)
+    cursor = since
+
+    while True:
+        query = client.table('documents').select(*columns).order(column).order('id').limit(page_size)
+        if isinstance(cursor, tuple):
+            # Quoted, since timestamps contain PostgREST's reserved '.' and ':'
+            value, last_id = cursor
+            query = query.or_(f'{column}.gt."{value}",and({column}.eq."{value}",id.gt.{last_id})')
+        elif cursor is not None:
+            query = query.gte(column, cursor)
+
+        with METRICS.span("fetch"):
+            rows = query.execute().data or []
+        METRICS.incr("documents_fetched", len(rows))
+        if not rows:
+            return
+
+        yield rows
+
+        if len(rows) < page_size:
+            return
+        cursor = (rows[-1][column], rows[-1]['id'])
+
+
+def count_documents(client: Any) -> Optional[int]:
+    """Return the exact number of documents, or None if the count is unavailable."""
+    try:
+        return client.table('documents').select('id', count='exact').limit(1).execute().count
+    except Exception:
+        return None
+
+
+def load_corpus(client: Any, page_size: int = 1000,
+                expected_rows: Optional[int] = None,
+                decoder: Optional[EmbeddingDecoder] = None,
+                metadata_columns: Tuple[str, ...] = (),
+                model: Optional[str] = None) -> Corpus:
+    """Stream the documents table into a Corpus of ids, texts and a float32 embedding matrix.
+
+    The matrix is allocated once from the table's row count (or ``expected_rows``)
+    and grown geometrically only if more rows arrive than expected. Rows without a
+    usable embedding, or whose dimension differs from the corpus dimension, are
+    skipped one by one. The corpus dimension is the decoder's, else the embedding
+    ``model``'s, else the most common dimension of the first page.
+    Pass an ``EmbeddingDecoder`` to collect embedding format statistics while loading,
+    and ``metadata_columns`` (e.g. ``("person_id", "metadata")``) to also select
+    those columns and return filterable metadata for each row.
+    """
+    decoder = decoder or EmbeddingDecoder()
+    if decoder.dimension is None and model is not None:
+        decoder.dimension = MODEL_DIMENSIONS.get(model)
+    capacity = expected_rows if expected_rows is not None else count_documents(client)
+    capacity = capacity or page_size
+
+    ids: List[Any] = []
+    texts: List[str] = []
+    metadata: Optional[List[Dict[str, Any]]] = [] if metadata_columns else None
+    matrix: Optional[np.ndarray] = None
+
+    columns = DEFAULT_COLUMNS + tuple(c for c in metadata_columns if c not in DEFAULT_COLUMNS)
+    for rows in iter_document_pages(client, page_size, columns):
+        page_ids = [row.get('id') for row in rows]
+        vectors, valid = decoder.decode_many([row.get('embedding') for row in rows], page_ids)
+        if not valid.any():
+            continue
+
+        if matrix is None:
+            matrix = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+
+        rows_kept = np.flatnonzero(valid)
+        needed = len(ids) + rows_kept.shape[0]
+        if needed > matrix.shape[0]:
+            grown = np.empty((max(needed, matrix.shape[0] * 2), matrix.shape[1]), dtype=np.float32)
+            grown[:len(ids)] = matrix[:len(ids)]
+            matrix = grown
+
+        matrix[len(ids):needed] = vectors[rows_kept]
+        for i in rows_kept:
+            ids.append(page_ids[i])
+            texts.append(rows[i].get('text') or '')
+            if metadata is not None:
+                metadata.append(document_metadata(rows[i]))
+
+    if matrix is None:
+        return Corpus([], [], np.zeros((0, 0), dtype=np.float32), metadata)
+    return Corpus(ids, texts, matrix[:len(ids)], metadata)
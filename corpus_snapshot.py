@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Corpus Snapshot
+
+Writes the document corpus to a local directory so later runs can skip
+Supabase entirely and memory-map the embeddings with near-zero startup time.
+Several worker processes loading the same snapshot share its pages through
+the OS page cache.
+
+Layout:
+    header.json     - format version, embedding model, dimension, row count
+    embeddings.npy  - float32 matrix of unit-length embeddings (n x dimension)
+    ids.npy         - int64 ids, or ids.json when ids are not integers
+    offsets.npy     - int64 byte offsets (n + 1) into texts.bin
+    texts.bin       - UTF-8 document texts, concatenated
+    metadata.json   - optional filterable metadata, one dict per row
+
+The header is written last, so a directory without one is an interrupted
+export. Loading checks the version and embedding model and raises
+``StaleSnapshotError`` when they do not match.
+
+Usage:
+    from corpus_snapshot import write_snapshot, load_snapshot
+
+    write_snapshot("snapshots/documents", ids, texts, matrix, model="text-embedding-3-small")
+    snapshot = load_snapshot("snapshots/documents", model="text-embedding-3-small")
+    index = VectorIndex(snapshot.ids, snapshot.texts, snapshot.matrix, normalized=True)
+
+Requirements:
+    pip install numpy
+"""
+
+import json
+import os
+import time
+from collections.abc import Sequence as SequenceABC
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from vector_index import normalize_rows
+
+SNAPSHOT_VERSION = 1
+
+HEADER_FILE = "header.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+IDS_FILE = "ids.npy"
+IDS_JSON_FILE = "ids.json"
+OFFSETS_FILE = "offsets.npy"
+TEXTS_FILE = "texts.bin"
+METADATA_FILE = "metadata.json"
+
+
+class StaleSnapshotError(ValueError):
+    """Raised when a snapshot was written by another format version or embedding model."""
+
+
+class TextBlob(SequenceABC):
+    """Lazy, read-only sequence of texts backed by a memory-mapped byte blob."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return self.offsets.shape[0] - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.blob[start:end].tobytes().decode("utf-8")
+
+
+class Snapshot:
+    """A loaded corpus snapshot: header, ids, lazy texts and the embedding matrix."""
+
+    def __init__(self, header: Dict[str, Any], ids: List[Any], texts: TextBlob, matrix: np.ndarray,
+                 metadata: Optional[List[Dict[str, Any]]] = None):
+        self.header = header
+        self.ids = ids
+        self.texts = texts
+        self.matrix = matrix
+        self.metadata = metadata
+
+    @property
+    def model(self) -> str:
+        """Embedding model the snapshot was built with."""
+        return self.header["model"]
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+
+def write_snapshot(path: str, ids: Sequence[Any], texts: Sequence[str], matrix: np.ndarray,
+                   model: str, normalized: bool = False,
+                   metadata: Optional[Dict[str, Any]] = None,
+                   row_metadata: Optional[Sequence[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Write a corpus snapshot to ``path`` and return its header.
+
+    Embeddings are stored unit-length so loaders can use the mapped matrix
+    directly; pass ``normalized=True`` if ``matrix`` already is. ``metadata``
+    is stored as-is in the header and ``row_metadata`` (one filterable dict per
+    row) in its own file; both must be JSON-serializable.
+    """
+    if len(ids) != len(texts) or len(ids) != matrix.shape[0]:
+        raise ValueError("ids, texts and matrix rows must have the same length")
+
+    os.makedirs(path, exist_ok=True)
+    header_path = os.path.join(path, HEADER_FILE)
+    if os.path.exists(header_path):
+        os.remove(header_path)
+
+    embeddings = np.array(matrix, dtype=np.float32)
+    if not normalized:
+        normalize_rows(embeddings)
+    np.save(os.path.join(path, EMBEDDINGS_FILE), embeddings)
+
+    integer_ids = all(isinstance(doc_id, int) and not isinstance(doc_id, bool) for doc_id in ids)
+    if integer_ids:
+        np.save(os.path.join(path, IDS_FILE), np.asarray(ids, dtype=np.int64))
+    else:
+        with open(os.path.join(path, IDS_JSON_FILE), "w") as f:
+            json.dump(list(ids), f)
+
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    with open(os.path.join(path, TEXTS_FILE), "wb") as f:
+        for i, text in enumerate(texts):
+            encoded = (text or '').encode("utf-8")
+            f.write(encoded)
+            offsets[i + 1] = offsets[i] + len(encoded)
+    np.save(os.path.join(path, OFFSETS_FILE), offsets)
+
+    metadata_path = os.path.join(path, METADATA_FILE)
+    if row_metadata is not None:
+        with open(metadata_path, "w") as f:
+            json.dump(list(row_metadata), f)
+    elif os.path.exists(metadata_path):
+        os.remove(metadata_path)
+
+    return write_header(path, model, int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+                        int(embeddings.shape[0]), "int64" if integer_ids else "json",
+                        row_metadata is not None, metadata)
+
+
+def write_header(path: str, model: str, dimension: int, count: int, id_format: str = "int64",
+                 has_row_metadata: bool = False, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Write the header that marks a snapshot directory complete; call it after all data files."""
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "model": model,
+        "dimension": dimension,
+        "count": count,
+        "dtype": "float32",
+        "normalized": True,
+        "id_format": id_format,
+        "has_row_metadata": has_row_metadata,
+        "created_at": time.time(),
+        "metadata": metadata or {}
+    }
+    with open(os.path.join(path, HEADER_FILE), "w") as f:
+        json.dump(header, f, indent=2)
+    return header
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    """Read a snapshot header without loading any data."""
+    header_path = os.path.join(path, HEADER_FILE)
+    if not os.path.exists(header_path):
+        raise FileNotFoundError(f"No snapshot header at {header_path} (missing or incomplete export)")
+    with open(header_path) as f:
+        return json.load(f)
+
+
+def load_snapshot(path: str, model: Optional[str] = None, mmap: bool = True) -> Snapshot:
+    """Load a snapshot, memory-mapping the embeddings and texts by default.
+
+    Raises ``StaleSnapshotError`` if the snapshot format version differs from
+    this module's, or if ``model`` is given and differs from the snapshot's.
+    """
+    header = read_header(path)
+    if header.get("version") != SNAPSHOT_VERSION:
+        raise StaleSnapshotError(
+            f"Snapshot version {header.get('version')} does not match expected version {SNAPSHOT_VERSION}"
+        )
+    if model is not None and header.get("model") != model:
+        raise StaleSnapshotError(
+            f"Snapshot was built with {header.get('model')}, but {model} is in use; re-export it"
+        )
+
+    mmap_mode = "r" if mmap else None
+    matrix = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode=mmap_mode)
+
+    if header.get("id_format") == "int64":
+        ids = np.load(os.path.join(path, IDS_FILE)).tolist()
+    else:
+        with open(os.path.join(path, IDS_JSON_FILE)) as f:
+            ids = json.load(f)
+
+    offsets = np.load(os.path.join(path, OFFSETS_FILE), mmap_mode=mmap_mode)
+    texts_path = os.path.join(path, TEXTS_FILE)
+    if os.path.getsize(texts_path):
+        blob = np.memmap(texts_path, dtype=np.uint8, mode="r") if mmap else np.fromfile(texts_path, dtype=np.uint8)
+    else:
+        blob = np.zeros(0, dtype=np.uint8)
+
+    row_metadata = None
+    if header.get("has_row_metadata"):
+        with open(os.path.join(path, METADATA_FILE)) as f:
+            row_metadata = json.load(f)
+
+    if matrix.shape[0] != header["count"] or len(ids) != header["count"]:
+        raise StaleSnapshotError(f"Snapshot at {path} is inconsistent with its header")
+
+    return Snapshot(header, ids, TextBlob(blob, offsets), matrix, row_metadata)
@@ -11,34 +11,53 @@ This script bypasses the API and directly:
 
 Usage:
     python direct_vector_test.py
+    python direct_vector_test.py --export-snapshot snapshots/documents
+    python direct_vector_test.py --snapshot snapshots/documents
+    python direct_vector_test.py --snapshot snapshots/documents --offline
+    python direct_vector_test.py --ann-lists 256 --ann-probes 1,4,16
+    python direct_vector_test.py --snapshot snapshots/documents --sharded-workers 1,4,8
+    python direct_vector_test.py --metadata-columns person_id,metadata --filter techs=React,Vue
+    python direct_vector_test.py --snapshot snapshots/documents --hybrid rrf --lexical-prefilter
+    python direct_vector_test.py --snapshot snapshots/documents --query-cache --semantic-epsilon 0.02
+    python direct_vector_test.py --snapshot snapshots/documents --calibrate labels.jsonl --min-recall 0.9
+    python direct_vector_test.py --snapshot snapshots/documents --streaming
+    python direct_vector_test.py --snapshot snapshots/documents --metrics --metrics-out metrics.prom
+    python direct_vector_test.py --snapshot snapshots/documents --profile cprofile --profile-out run.prof
 
 Requirements:
-    pip install supabase openai numpy python-dotenv
+    pip install numpy python-dotenv
+    pip install supabase openai    # not needed for --snapshot --offline runs
 """
 
-import os
-import json
-import numpy as np
-from typing import List, Dict, Any, Optional, Union
 import time
-from dotenv import load_dotenv
-from supabase import create_client, Client
-import openai
-import math
+STARTED = time.perf_counter()
 
-# Load environment variables
-load_dotenv()
+import argparse
+from typing import List, Dict, Any, Optional, Union, Tuple
+from clients import EMBEDDING_MODEL, credentials, get_supabase, get_embedding_cache, get_embedding_pipeline
+from search_core import search_similar_documents_batch, skipped_embeddings
+from search_core import build_vector_index as build_core_index
+from vector_index import VectorIndex, normalize_rows
+from corpus_loader import load_corpus
+from embedding_codec import EmbeddingDecoder, FORMATS
+from ann_index import IVFIndex
+from quantized_index import compare_quantization
+from truncated_search import measure_truncation_tradeoff
+from corpus_snapshot import write_snapshot, load_snapshot, StaleSnapshotError
+from mutable_index import MutableVectorIndex
+from metadata_filter import FILTER_FIELDS, FILTER_COLUMNS
+from hybrid_search import HybridSearch, FUSION_METHODS, compare_hybrid
+from query_cache import QueryCache, CachedSearch
+from threshold_calibration import load_labels, sweep_thresholds, recommend, format_report
+from streaming_search import streaming_search, iter_snapshot_chunks, iter_supabase_chunks
+from instrumentation import METRICS, PROFILE_MODES, capture_profile
 
-# Configuration
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+IMPORTED = time.perf_counter()
 
-# Initialize OpenAI client
-openai.api_key = OPENAI_API_KEY
-
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Supabase and OpenAI clients are created lazily (see clients.py), so
+# snapshot runs with cached query embeddings never touch the network.
+# main() switches this on for --offline runs.
+OFFLINE = False
 
 # Test queries - EXACT matches to test document text for guaranteed similarity
 EXACT_MATCH_QUERIES = [
@@ -49,6 +68,13 @@ EXACT_MATCH_QUERIES = [
     "Full stack developer experienced in JavaScript, Python, and SQL databases",
 ]
 
+# Keyword-heavy queries (from api/tests/test_api.py) where exact skill names matter
+KEYWORD_QUERIES = [
+    "Looking for someone with machine learning and NLP experience",
+    "Need a mobile app designer who knows Figma",
+    "Cloud infrastructure expert with AWS knowledge",
+]
+
 # ANSI colors for console output
 class Colors:
     HEADER = '\033[95m'
@@ -86,208 +112,155 @@ def print_debug(text: str) -> None:
     """Print debug information."""
     print(f"{Colors.BLUE}🔍 DEBUG: {text}{Colors.ENDC}")
 
-def fetch_documents() -> List[Dict[str, Any]]:
-    """Fetch all documents with embeddings from Supabase."""
-    print_info("Fetching documents from Supabase...")
+def load_vector_index(page_size: int = 1000, decoder: Optional[EmbeddingDecoder] = None,
+                      metadata_columns: Tuple[str, ...] = ()) -> Optional[VectorIndex]:
+    """Stream the documents table page by page straight into a vector index, or None if loading fails."""
+    print_info("Loading document embeddings from Supabase...")
     
     try:
-        response = supabase.table('documents').select('*').execute()
-        documents = response.data
-        
-        print_result(True, f"Retrieved {len(documents)} documents")
-        return documents
+        corpus = load_corpus(get_supabase(), page_size=page_size, decoder=decoder, metadata_columns=metadata_columns,
+                             model=EMBEDDING_MODEL)
+        # The loader's buffer is ours, so normalize it in place rather than copying it
+        index = VectorIndex(corpus.ids, corpus.texts, normalize_rows(corpus.matrix), normalized=True,
+                            metadata=corpus.metadata)
+        print_result(True, f"Loaded {len(index)} document embeddings")
+        return index
     except Exception as e:
-        print_result(False, f"Failed to fetch documents: {str(e)}")
-        return []
+        print_result(False, f"Failed to load documents: {str(e)}")
+        return None
 
-def examine_embedding_formats(documents: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Examine the embedding formats in the documents."""
-    print_header("EXAMINING EMBEDDING FORMATS")
+def load_snapshot_index(path: str) -> Optional[Tuple[VectorIndex, Dict[str, Any]]]:
+    """Memory-map a local corpus snapshot into a vector index, with its stored format stats."""
+    print_info(f"Loading corpus snapshot from {path}...")
     
-    formats = {
-        "string": 0,
-        "array": 0,
-        "object": 0,
-        "null": 0,
-        "other": 0
-    }
+    try:
+        with METRICS.span("fetch"):
+            snapshot = load_snapshot(path, model=EMBEDDING_MODEL)
+    except StaleSnapshotError as e:
+        print_result(False, f"Snapshot is stale: {str(e)}")
+        return None
+    except (OSError, ValueError) as e:
+        print_result(False, f"Failed to load snapshot: {str(e)}")
+        return None
     
-    dimensions = set()
-    first_values = {}
-    errors = []
+    index = VectorIndex(snapshot.ids, snapshot.texts, snapshot.matrix, normalized=True,
+                        metadata=snapshot.metadata)
+    stats = snapshot.header.get("metadata", {}).get("embedding_stats") or {
+        "formats": {fmt: 0 for fmt in FORMATS}, "dimensions": [index.dimension],
+        "samples": {}, "errors": [], "decoded": len(index), "bytes_decoded": 0
+    }
+    print_result(True, f"Mapped {len(index)} embeddings from snapshot")
+    return index, stats
+
+def export_snapshot_index(index: VectorIndex, path: str, stats: Dict[str, Any]) -> bool:
+    """Write the loaded corpus to a local snapshot for fast startup on later runs."""
+    print_info(f"Exporting corpus snapshot to {path}...")
     
-    for i, doc in enumerate(documents[:10]):  # Examine first 10 documents
-        doc_id = doc.get('id')
-        embedding = doc.get('embedding')
-        
-        if embedding is None:
-            formats["null"] += 1
-            continue
-        
-        embedding_type = type(embedding).__name__
-        print_info(f"Document {doc_id}: Embedding type = {embedding_type}")
-        
-        if embedding_type == 'str':
-            formats["string"] += 1
-            try:
-                # Try to parse as JSON
-                parsed = json.loads(embedding)
-                parsed_type = type(parsed).__name__
-                print_debug(f"Parsed as JSON: type = {parsed_type}")
-                
-                if isinstance(parsed, list):
-                    dimensions.add(len(parsed))
-                    first_values[doc_id] = parsed[:3]
-            except Exception as e:
-                errors.append(f"Document {doc_id}: Failed to parse embedding string: {str(e)}")
-        
-        elif embedding_type == 'list':
-            formats["array"] += 1
-            dimensions.add(len(embedding))
-            first_values[doc_id] = embedding[:3]
-        
-        elif embedding_type == 'dict':
-            formats["object"] += 1
-            print_debug(f"Object keys: {', '.join(embedding.keys())}")
-        
-        else:
-            formats["other"] += 1
+    try:
+        write_snapshot(path, index.ids, index.texts, index.matrix, EMBEDDING_MODEL,
+                       normalized=True, metadata={"embedding_stats": stats},
+                       row_metadata=index.row_metadata)
+        print_result(True, f"Exported {len(index)} embeddings to {path}")
+        return True
+    except (OSError, ValueError, TypeError) as e:
+        print_result(False, f"Failed to export snapshot: {str(e)}")
+        return False
+
+def report_embedding_formats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Print the embedding format statistics collected while decoding."""
+    print_header("EXAMINING EMBEDDING FORMATS")
     
     # Print summary
-    print_info("\nEmbedding Format Summary:")
-    for fmt, count in formats.items():
+    print_info("Embedding Format Summary:")
+    for fmt, count in stats["formats"].items():
         if count > 0:
             print_info(f"  - {fmt.capitalize()}: {count} documents")
     
-    if dimensions:
-        print_info(f"Vector dimensions observed: {', '.join(map(str, dimensions))}")
+    if stats["dimensions"]:
+        print_info(f"Vector dimensions observed: {', '.join(map(str, stats['dimensions']))}")
+    print_info(f"Decoded {stats['decoded']} embeddings ({stats['bytes_decoded'] / 1024:.1f} KB of text)")
     
-    if first_values:
+    if stats["samples"]:
         print_info("\nSample Vector Values:")
-        for doc_id, values in list(first_values.items())[:3]:
+        for doc_id, values in list(stats["samples"].items())[:3]:
             print_info(f"  - Document {doc_id}: {values}")
     
-    if errors:
+    if stats["errors"]:
         print_warning("\nErrors encountered:")
-        for error in errors[:5]:  # Show first 5 errors
+        for error in stats["errors"][:5]:  # Show first 5 errors
             print_warning(f"  - {error}")
     
-    return {
-        "formats": formats,
-        "dimensions": list(dimensions),
-        "errors": errors
-    }
+    return stats
+
+def examine_embedding_formats(documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Examine the embedding formats in the documents."""
+    decoder = EmbeddingDecoder()
+    decoder.decode_many([doc.get('embedding') for doc in documents],
+                        [doc.get('id') for doc in documents])
+    return report_embedding_formats(decoder.stats())
+
+def generate_embeddings(texts: List[str]) -> List[List[float]]:
+    """Generate embeddings for many texts using batched, concurrent OpenAI API calls."""
+    print_info(f"Generating embeddings for {len(texts)} texts...")
+    
+    embedding_pipeline = get_embedding_pipeline(OFFLINE)
+    calls_before = embedding_pipeline.api_calls
+    embeddings = embedding_pipeline.embed(texts)
+    for error in embedding_pipeline.errors:
+        print_result(False, f"Failed to generate embeddings: {error}")
+    
+    generated = sum(1 for embedding in embeddings if embedding)
+    if generated:
+        print_result(True, f"Generated {generated}/{len(texts)} embeddings in {embedding_pipeline.api_calls - calls_before} API calls")
+    return embeddings
 
 def generate_embedding(text: str) -> List[float]:
     """Generate an embedding for text using OpenAI API."""
     print_info(f"Generating embedding for: \"{text[:50]}...\"")
     
-    try:
-        response = openai.embeddings.create(
-            model="text-embedding-3-small",
-            input=text
-        )
-        embedding = response.data[0].embedding
+    embedding_pipeline = get_embedding_pipeline(OFFLINE)
+    embedding = embedding_pipeline.embed([text])[0]
+    if embedding:
         print_result(True, f"Generated embedding of length {len(embedding)}")
-        return embedding
-    except Exception as e:
-        print_result(False, f"Failed to generate embedding: {str(e)}")
-        return []
+    else:
+        error = embedding_pipeline.errors[0] if embedding_pipeline.errors else "empty response"
+        print_result(False, f"Failed to generate embedding: {error}")
+    return embedding
 
-def cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
-    """Calculate cosine similarity between two vectors."""
-    # Check for empties
-    if not vec_a or not vec_b:
-        return 0.0
-    
-    # Convert to numpy for efficiency
-    a = np.array(vec_a)
-    b = np.array(vec_b)
-    
-    # Handle different lengths
-    min_length = min(len(a), len(b))
-    a = a[:min_length]
-    b = b[:min_length]
-    
-    # Calculate cosine similarity
-    dot_product = np.dot(a, b)
-    norm_a = np.linalg.norm(a)
-    norm_b = np.linalg.norm(b)
-    
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    
-    similarity = dot_product / (norm_a * norm_b)
-    
-    # Handle numerical instability
-    if similarity > 1.0:
-        similarity = 1.0
-    elif similarity < -1.0:
-        similarity = -1.0
-    
-    return float(similarity)
+def build_vector_index(documents: List[Dict[str, Any]]) -> VectorIndex:
+    """Decode document embeddings once and load them into an in-memory vector index."""
+    index = build_core_index(documents)
+    skipped = skipped_embeddings(documents, index)
+    if skipped:
+        print_warning(f"Skipped {skipped} embeddings that could not be decoded or had a mismatched dimension")
+    return index
 
-def parse_embedding(embedding: Any) -> Optional[List[float]]:
-    """Parse an embedding into a list of floats."""
-    if embedding is None:
-        return None
-    
-    if isinstance(embedding, list):
-        # Check if it's a list of floats
-        if all(isinstance(x, (int, float)) for x in embedding):
-            return embedding
-    
-    if isinstance(embedding, str):
-        try:
-            parsed = json.loads(embedding)
-            if isinstance(parsed, list):
-                # Check if it's a list of floats
-                if all(isinstance(x, (int, float)) for x in parsed):
-                    return parsed
-        except:
-            pass
-    
-    return None
-
-def search_similar_documents(query_embedding: List[float], documents: List[Dict[str, Any]], threshold: float = 0.1, limit: int = 5) -> List[Dict[str, Any]]:
-    """Search for similar documents using cosine similarity."""
-    results = []
-    
-    for doc in documents:
-        doc_embedding = parse_embedding(doc.get('embedding'))
-        
-        if not doc_embedding:
-            continue
-        
-        similarity = cosine_similarity(query_embedding, doc_embedding)
-        
-        # Store result with similarity score
-        results.append({
-            "id": doc.get('id'),
-            "text": doc.get('text', '')[:100] + '...',
-            "similarity": similarity,
-            "passed_threshold": similarity >= threshold
-        })
-    
-    # Sort by similarity (highest first) and limit results
-    results.sort(key=lambda x: x["similarity"], reverse=True)
-    return results[:limit]
-
-def test_exact_match_queries(documents: List[Dict[str, Any]], threshold: float = 0.1) -> None:
-    """Test exact match queries against the documents."""
+def test_exact_match_queries(documents: Union[List[Dict[str, Any]], VectorIndex], threshold: float = 0.1, filters: Optional[Dict[str, Any]] = None) -> bool:
+    """Test exact match queries against the documents; False if the queries cannot be searched."""
     print_header("TESTING EXACT MATCH QUERIES")
     print_info(f"Using similarity threshold: {threshold}")
+    if filters:
+        print_info(f"Using metadata filters: {filters}")
     
-    for i, query in enumerate(EXACT_MATCH_QUERIES):
-        print_info(f"\nQuery {i+1}/{len(EXACT_MATCH_QUERIES)}: '{query[:50]}...'")
-        
-        # Generate embedding for query
-        query_embedding = generate_embedding(query)
-        if not query_embedding:
-            continue
-        
-        # Search for similar documents
-        results = search_similar_documents(query_embedding, documents, threshold)
+    # Parse and normalize the corpus once for all queries
+    index = documents if isinstance(documents, VectorIndex) else build_vector_index(documents)
+    print_info(f"Indexed {len(index)} document embeddings")
+    
+    # Embed every query first so they can be scored in one batched pass
+    queries, query_embeddings = [], []
+    for query, query_embedding in zip(EXACT_MATCH_QUERIES, generate_embeddings(EXACT_MATCH_QUERIES)):
+        if query_embedding:
+            queries.append(query)
+            query_embeddings.append(query_embedding)
+    
+    try:
+        batch_results = search_similar_documents_batch(query_embeddings, index, threshold, filters=filters)
+    except ValueError as e:
+        print_result(False, f"Search failed: {str(e)}")
+        return False
+    
+    for i, (query, results) in enumerate(zip(queries, batch_results)):
+        print_info(f"\nQuery {i+1}/{len(queries)}: '{query[:50]}...'")
         
         # Display results
         matching = [r for r in results if r["passed_threshold"]]
@@ -304,9 +277,192 @@ def test_exact_match_queries(documents: List[Dict[str, Any]], threshold: float =
             for j, result in enumerate(results[:3]):
                 similarity = result["similarity"] * 100
                 print(f"  {j+1}. [{similarity:.1f}%] {result['text']}")
+    return True
 
-def create_test_document(text: str, profile_id: str = "test_user") -> Optional[int]:
-    """Create a test document with embedding in Supabase."""
+def evaluate_ann_index(index: VectorIndex, n_lists: int, n_probes: List[int], k: int = 10) -> List[Dict[str, Any]]:
+    """Build an IVF index and report its recall and latency against exact search."""
+    print_header("APPROXIMATE INDEX RECALL")
+    
+    query_embeddings = [e for e in generate_embeddings(EXACT_MATCH_QUERIES) if e]
+    if not query_embeddings or not len(index):
+        print_warning("Need documents and query embeddings to evaluate the approximate index")
+        return []
+    
+    ann = IVFIndex(index, n_lists=n_lists)
+    print_info(f"Built IVF index with {ann.n_lists} lists in {ann.build_seconds * 1000:.1f} ms")
+    
+    report = ann.measure_recall(query_embeddings, k=k, n_probes=n_probes)
+    for row in report:
+        print_info(f"  n_probe={row['n_probe']:>3}: recall@{k}={row['recall']:.3f}, "
+                   f"{row['latency_ms']:.3f} ms/query vs {row['exact_latency_ms']:.3f} ms exact, "
+                   f"scanned {row['scanned_fraction'] * 100:.1f}%")
+    return report
+
+def evaluate_quantization(index: VectorIndex, k: int = 10) -> List[Dict[str, Any]]:
+    """Report memory saved by each quantization mode against top-k overlap with full precision."""
+    print_header("QUANTIZATION REPORT")
+    
+    query_embeddings = [e for e in generate_embeddings(EXACT_MATCH_QUERIES) if e]
+    if not query_embeddings or not len(index):
+        print_warning("Need documents and query embeddings to evaluate quantization")
+        return []
+    
+    report = compare_quantization(index, query_embeddings, k=k)
+    for row in report:
+        print_info(f"  {row['mode']:>8}: {row['bytes'] / 1024 / 1024:8.2f} MB "
+                   f"({row['bytes_per_vector']:.0f} B/vector, {row['compression']:.1f}x), "
+                   f"top-{k} overlap {row['overlap'] * 100:.1f}%")
+    return report
+
+def evaluate_truncated_search(index: VectorIndex, dimensions: List[int], multipliers: List[int], k: int = 10) -> List[Dict[str, Any]]:
+    """Report the latency/recall trade-off of truncated-dimension search with re-ranking."""
+    print_header("TRUNCATED DIMENSION SEARCH")
+    
+    query_embeddings = [e for e in generate_embeddings(EXACT_MATCH_QUERIES) if e]
+    if not query_embeddings or not len(index):
+        print_warning("Need documents and query embeddings to evaluate truncated search")
+        return []
+    
+    report = measure_truncation_tradeoff(index, query_embeddings, k=k, dimensions=dimensions,
+                                         candidate_multipliers=multipliers)
+    for row in report:
+        print_info(f"  {row['dimensions']:>4} dims x{row['candidate_multiplier']:<3} candidates: "
+                   f"recall@{k}={row['recall']:.3f}, {row['latency_ms']:.3f} ms/query "
+                   f"vs {row['exact_latency_ms']:.3f} ms exact")
+    return report
+
+def evaluate_sharded_search(index: VectorIndex, workers: List[int], shard_size: int = 0, k: int = 10) -> List[Dict[str, Any]]:
+    """Benchmark multi-process sharded search against the single-process engine."""
+    print_header("SHARDED SEARCH BENCHMARK")
+    
+    query_embeddings = [e for e in generate_embeddings(EXACT_MATCH_QUERIES) if e]
+    if not query_embeddings or not len(index):
+        print_warning("Need documents and query embeddings to benchmark sharded search")
+        return []
+    
+    # Imported here: multiprocessing adds noticeably to startup and only this report needs it
+    from sharded_search import benchmark_sharded
+    
+    report = benchmark_sharded(index, query_embeddings, k=k, workers=workers, shard_size=shard_size or None)
+    for row in report:
+        print_info(f"  {row['mode']:>14} x{row['workers']:<3} ({row['shards']} shards): "
+                   f"{row['latency_ms']:.3f} ms/batch, {row['speedup']:.2f}x, "
+                   f"top-{k} agreement {row['agreement'] * 100:.1f}%")
+    return report
+
+def evaluate_hybrid_search(index: VectorIndex, method: str = "rrf", alpha: float = 0.5,
+                           prefilter: bool = False, k: int = 10) -> List[Dict[str, Any]]:
+    """Show hybrid BM25 + vector results for keyword queries and compare fusion modes."""
+    print_header("HYBRID LEXICAL + VECTOR SEARCH")
+    
+    texts = KEYWORD_QUERIES + EXACT_MATCH_QUERIES
+    embedded = [(text, e) for text, e in zip(texts, generate_embeddings(texts)) if e]
+    if not embedded or not len(index):
+        print_warning("Need documents and query embeddings to evaluate hybrid search")
+        return []
+    
+    hybrid = HybridSearch(index, method=method, alpha=alpha, prefilter=prefilter)
+    print_info(f"Built BM25 index over {len(hybrid.lexical)} documents, {len(hybrid.lexical.terms)} terms "
+               f"({hybrid.lexical.nbytes / 1024:.1f} KB of postings)")
+    
+    for query, embedding in embedded[:len(KEYWORD_QUERIES)]:
+        print_info(f"\nQuery: '{query[:50]}...'")
+        for result in hybrid.search(query, embedding, limit=3):
+            print(f"  [{result['similarity'] * 100:.1f}%, bm25 {result['lexical_score']:.2f}] {result['text']}")
+    
+    report = compare_hybrid(index, [text for text, _ in embedded], [e for _, e in embedded],
+                            k=k, alpha=alpha, lexical=hybrid.lexical)
+    for row in report:
+        print_info(f"  {row['method']:>8}{' + prefilter' if row['prefilter'] else '':<12}: "
+                   f"{row['latency_ms']:.3f} ms/query vs {row['vector_latency_ms']:.3f} ms vector-only, "
+                   f"scanned {row['scanned_fraction'] * 100:.1f}%, "
+                   f"top-{k} overlap with vector {row['vector_overlap'] * 100:.1f}%")
+    return report
+
+def evaluate_query_cache(index: Union[VectorIndex, MutableVectorIndex], semantic_epsilon: Optional[float] = None,
+                         threshold: float = 0.1) -> Dict[str, Any]:
+    """Replay the test queries, then reworded copies of them, through a query result cache."""
+    print_header("QUERY RESULT CACHE")
+    
+    cache = QueryCache(semantic_epsilon=semantic_epsilon)
+    search = CachedSearch(index, cache, embed=lambda text: generate_embeddings([text])[0])
+    queries = EXACT_MATCH_QUERIES + KEYWORD_QUERIES
+    # Same queries with different case, spacing and punctuation, as users retype them
+    variants = [f"  {query.upper()}?" for query in queries] + [query.replace(" ", "  ") + "." for query in queries]
+    
+    for label, batch in (("cold", queries), ("repeat", queries), ("reworded", variants)):
+        started = time.perf_counter()
+        for query in batch:
+            search.search(query, threshold=threshold)
+        elapsed_ms = (time.perf_counter() - started) * 1000 / len(batch)
+        print_info(f"  {label:>8}: {elapsed_ms:.3f} ms/query")
+    
+    stats = cache.stats()
+    print_result(stats["hits"] + stats["semantic_hits"] > 0,
+                 f"Query cache: {stats['hits']} exact hits, {stats['semantic_hits']} semantic hits, "
+                 f"{stats['misses']} misses ({stats['hit_rate'] * 100:.1f}% hit rate)")
+    return stats
+
+def calibrate_thresholds(index: VectorIndex, labels_path: str, min_recall: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Sweep thresholds and top-k against labelled queries and recommend a setting."""
+    print_header("THRESHOLD CALIBRATION")
+    
+    try:
+        labels = load_labels(labels_path)
+    except (OSError, ValueError) as e:
+        print_result(False, f"Failed to load labels: {str(e)}")
+        return None
+    
+    # Labels may carry their own embeddings; only the rest go through the pipeline
+    missing = [label["query"] for label in labels if not label.get("embedding")]
+    embedded = dict(zip(missing, generate_embeddings(missing))) if missing else {}
+    usable = [(label.get("embedding") or embedded.get(label["query"]), label["relevant"]) for label in labels]
+    usable = [(embedding, relevant) for embedding, relevant in usable if embedding]
+    if not usable or not len(index):
+        print_warning("Need documents and embedded labelled queries to calibrate")
+        return None
+    
+    report = sweep_thresholds(index, [e for e, _ in usable], [r for _, r in usable])
+    print_info(f"Swept {len(report)} settings over {len(usable)} labelled queries")
+    print(format_report(report))
+    
+    best = recommend(report, min_recall)
+    if best is None:
+        print_result(False, f"No setting reaches recall {min_recall}")
+    else:
+        print_result(True, f"Recommended: top_k={best['top_k']}, threshold={best['threshold']} "
+                           f"(precision {best['precision']:.3f}, recall {best['recall']:.3f}, "
+                           f"{best['mean_results']:.1f} results/query, {best['mean_context_chars']:.0f} context chars)")
+    return best
+
+def evaluate_streaming_search(index: VectorIndex, snapshot_path: Optional[str] = None, limit: int = 5) -> bool:
+    """Re-run the test queries streaming the corpus in chunks and compare with the loaded index."""
+    print_header("STREAMING TOP-K SEARCH")
+    
+    query_embeddings = [e for e in generate_embeddings(EXACT_MATCH_QUERIES) if e]
+    if not query_embeddings or not len(index):
+        print_warning("Need documents and query embeddings to evaluate streaming search")
+        return False
+    
+    # Stream from the same source the index came from, never materializing it
+    if snapshot_path:
+        chunks = iter_snapshot_chunks(snapshot_path, model=EMBEDDING_MODEL)
+    else:
+        chunks = iter_supabase_chunks(get_supabase())
+    started = time.perf_counter()
+    streamed = streaming_search(chunks, query_embeddings, limit=limit, normalized=bool(snapshot_path))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    expected = index.search_batch(query_embeddings, limit=limit)
+    matches = sum([r["id"] for r in a] == [r["id"] for r in b] for a, b in zip(streamed, expected))
+    print_info(f"Streamed {len(index)} documents for {len(query_embeddings)} queries in {elapsed_ms:.1f} ms")
+    print_result(matches == len(query_embeddings),
+                 f"{matches}/{len(query_embeddings)} queries match the in-memory index")
+    return matches == len(query_embeddings)
+
+def create_test_document(text: str, profile_id: str = "test_user",
+                         live: Optional[MutableVectorIndex] = None) -> Optional[int]:
+    """Create a test document with embedding in Supabase, optionally upserting it into a live index."""
     print_info(f"Creating test document: '{text[:50]}...'")
     
     try:
@@ -316,7 +472,7 @@ def create_test_document(text: str, profile_id: str = "test_user") -> Optional[i
             return None
         
         # Insert document
-        response = supabase.table('documents').insert({
+        response = get_supabase().table('documents').insert({
             "text": text,
             "profile_id": profile_id,
             "embedding": embedding
@@ -325,6 +481,8 @@ def create_test_document(text: str, profile_id: str = "test_user") -> Optional[i
         if response.data and len(response.data) > 0:
             doc_id = response.data[0].get('id')
             print_result(True, f"Created document with ID: {doc_id}")
+            if live is not None:
+                live.upsert(doc_id, text, embedding, {"profile_id": profile_id})
             return doc_id
         else:
             print_result(False, "Failed to create document")
@@ -333,54 +491,154 @@ def create_test_document(text: str, profile_id: str = "test_user") -> Optional[i
         print_result(False, f"Error creating document: {str(e)}")
         return None
 
-def delete_test_document(doc_id: int) -> bool:
-    """Delete a test document from Supabase."""
+def delete_test_document(doc_id: int, live: Optional[MutableVectorIndex] = None) -> bool:
+    """Delete a test document from Supabase, optionally tombstoning it in a live index."""
     print_info(f"Deleting document ID: {doc_id}")
     
     try:
-        response = supabase.table('documents').delete().eq('id', doc_id).execute()
+        response = get_supabase().table('documents').delete().eq('id', doc_id).execute()
+        if not response.data:
+            print_result(False, f"Document ID {doc_id} was not deleted (no matching row)")
+            return False
+        if live is not None:
+            live.delete(doc_id)
         print_result(True, f"Deleted document ID: {doc_id}")
         return True
     except Exception as e:
         print_result(False, f"Failed to delete document: {str(e)}")
         return False
 
-def main() -> None:
+def parse_filters(expressions: List[str]) -> Dict[str, Any]:
+    """Parse FIELD=VALUE[,VALUE...] filter expressions into a metadata filter dict."""
+    filters: Dict[str, Any] = {}
+    for expression in expressions:
+        field, _, value = expression.partition('=')
+        field = field.strip()
+        if field not in FILTER_FIELDS:
+            raise ValueError(f"unknown filter field '{field}', expected one of {', '.join(FILTER_FIELDS)}")
+        values = [v.strip() for v in value.split(',') if v.strip()]
+        if not values:
+            raise ValueError(f"filter '{expression}' has no value")
+        filters[field] = values if len(values) > 1 else values[0]
+    return filters
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Main function to run the direct vector test."""
+    parser = argparse.ArgumentParser(description="Direct vector comparison test")
+    parser.add_argument("--snapshot", help="load the corpus from a local snapshot directory instead of Supabase")
+    parser.add_argument("--export-snapshot", help="write the loaded corpus to a snapshot directory")
+    parser.add_argument("--metadata-columns", default="", help="comma-separated document columns to load as filterable metadata (e.g. person_id,metadata; defaults to the columns the --filter fields are read from)")
+    parser.add_argument("--filter", action="append", default=[], metavar="FIELD=VALUE[,VALUE]",
+                        help="restrict queries by profile_id, content_type, techs or keywords (repeatable)")
+    parser.add_argument("--ann-lists", type=int, default=0, help="also evaluate an IVF index with this many lists (0 disables)")
+    parser.add_argument("--ann-probes", default="1,2,4,8,16", help="comma-separated probe counts for --ann-lists")
+    parser.add_argument("--truncated-dims", default="", help="comma-separated prefix dimensions to evaluate for two-stage search")
+    parser.add_argument("--candidate-multipliers", default="1,4,10", help="comma-separated re-ranking candidate multipliers for --truncated-dims")
+    parser.add_argument("--quantization-report", action="store_true", help="compare float16/int8/PQ storage against full precision")
+    parser.add_argument("--sharded-workers", default="", help="comma-separated worker counts to benchmark multi-process sharded search")
+    parser.add_argument("--shard-size", type=int, default=0, help="rows per shard for --sharded-workers (0 = two shards per worker)")
+    parser.add_argument("--offline", action="store_true", help="never call OpenAI; embed queries from the embedding cache only (use with --snapshot)")
+    parser.add_argument("--hybrid", choices=FUSION_METHODS, help="also run hybrid BM25 + vector search with this fusion")
+    parser.add_argument("--hybrid-alpha", type=float, default=0.5, help="vector weight for --hybrid weighted (0-1)")
+    parser.add_argument("--lexical-prefilter", action="store_true", help="with --hybrid, only vector-score documents containing a query term")
+    parser.add_argument("--query-cache", action="store_true", help="replay the test queries through the query result cache")
+    parser.add_argument("--semantic-epsilon", type=float, help="with --query-cache, reuse results for queries within this cosine distance")
+    parser.add_argument("--calibrate", metavar="LABELS", help="sweep thresholds and top-k against a JSON lines file of labelled queries")
+    parser.add_argument("--min-recall", type=float, help="with --calibrate, recommend the cheapest setting with at least this recall")
+    parser.add_argument("--streaming", action="store_true", help="also search by streaming the corpus in chunks and compare with the index")
+    parser.add_argument("--metrics", action="store_true", help="time the fetch/decode/embed/score/sort stages and print a summary")
+    parser.add_argument("--metrics-out", help="write stage timings and counters to this file (.prom/.txt for Prometheus text, otherwise JSON)")
+    parser.add_argument("--profile", choices=PROFILE_MODES, help="profile the whole run with cProfile or tracemalloc")
+    parser.add_argument("--profile-out", help="save the cProfile stats or tracemalloc snapshot to this file")
+    args = parser.parse_args(argv)
+    if args.offline and not args.snapshot:
+        parser.error("--offline needs --snapshot, since loading from Supabase is a network call")
+    try:
+        parse_filters(args.filter)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.metrics or args.metrics_out:
+        METRICS.enable()
+    with capture_profile(args.profile, args.profile_out):
+        run(args)
+    
+    if METRICS.enabled:
+        print_header("STAGE METRICS")
+        print(METRICS.summary())
+        if args.metrics_out:
+            METRICS.write(args.metrics_out)
+            print_info(f"Wrote metrics to {args.metrics_out}")
+
+def run(args: argparse.Namespace) -> None:
+    """Load the corpus and run the requested checks."""
+    filters = parse_filters(args.filter)
+    # By default select only the columns the filtered fields are read from
+    metadata_columns = (tuple(c for c in args.metadata_columns.split(',') if c) or
+                        tuple(dict.fromkeys(FILTER_COLUMNS[field] for field in filters)))
+    
     print_header("DIRECT VECTOR TEST")
     
     # Check environment variables
+    global OFFLINE
+    OFFLINE = args.offline
+    creds = credentials()
     missing_vars = []
-    if not SUPABASE_URL:
+    if not creds["supabase_url"] and not args.snapshot:
         missing_vars.append("SUPABASE_URL")
-    if not SUPABASE_KEY:
+    if not creds["supabase_key"] and not args.snapshot:
         missing_vars.append("SUPABASE_SERVICE_ROLE_KEY or SUPABASE_ANON_KEY")
-    if not OPENAI_API_KEY:
+    if not creds["openai_api_key"] and not OFFLINE:
         missing_vars.append("OPENAI_API_KEY")
     
     if missing_vars:
         print_warning("Missing environment variables: " + ", ".join(missing_vars))
         print_info("Please set these variables in your .env file and try again.")
+        if args.snapshot:
+            print_info("Or pass --offline to use cached query embeddings only.")
         return
 
-    print_info(f"Using Supabase URL: {SUPABASE_URL[:20]}...")
-    print_info(f"Using Supabase Key: {SUPABASE_KEY[:5]}...{SUPABASE_KEY[-4:]}")
-    print_info(f"Using OpenAI API Key: {OPENAI_API_KEY[:5]}...")
-    
-    # Fetch documents
-    documents = fetch_documents()
+    if not args.snapshot:
+        print_info(f"Using Supabase URL: {creds['supabase_url'][:20]}...")
+        print_info(f"Using Supabase Key: {creds['supabase_key'][:5]}...{creds['supabase_key'][-4:]}")
+    if OFFLINE:
+        print_info("Offline: query embeddings come from the embedding cache only")
+    else:
+        print_info(f"Using OpenAI API Key: {creds['openai_api_key'][:5]}...")
     
-    if not documents:
+    if args.snapshot:
+        loaded = load_snapshot_index(args.snapshot)
+        if loaded is None:
+            return
+        index, stats = loaded
+    else:
+        # Stream the full corpus into the vector index, collecting format statistics on the way
+        decoder = EmbeddingDecoder()
+        index = load_vector_index(decoder=decoder, metadata_columns=metadata_columns)
+        if index is None:
+            # A failed load is not an empty table, so never seed a test document here
+            return
+        stats = decoder.stats()
+    
+    if not len(index) and not args.snapshot:
         print_warning("No documents found. Creating a test document...")
-        test_doc_id = create_test_document(EXACT_MATCH_QUERIES[0])
+        # Upsert the new document into the loaded index instead of reloading the corpus
+        live = MutableVectorIndex(index)
+        test_doc_id = create_test_document(EXACT_MATCH_QUERIES[0], live=live)
         if test_doc_id:
-            documents = fetch_documents()
-            if not documents:
+            index = live.compact()
+            if not len(index):
                 print_warning("Still no documents found after creating test document.")
                 return
     
+    print_info(f"Index ready {(time.perf_counter() - STARTED) * 1000:.0f} ms after start "
+               f"(imports {(IMPORTED - STARTED) * 1000:.0f} ms)")
+    
+    if args.export_snapshot:
+        export_snapshot_index(index, args.export_snapshot, stats)
+    
     # Examine embedding formats
-    formats_info = examine_embedding_formats(documents)
+    formats_info = report_embedding_formats(stats)
     
     # Determine threshold based on format
     threshold = 0.1
@@ -389,7 +647,41 @@ def main() -> None:
         threshold = 0.05
     
     # Test exact match queries
-    test_exact_match_queries(documents, threshold)
+    if filters and index.metadata is None:
+        print_warning("Corpus has no metadata (re-export the snapshot with --metadata-columns); ignoring filters")
+        filters = {}
+    if not test_exact_match_queries(index, threshold, filters):
+        print_warning("Skipping the remaining checks, which search with the same query embeddings")
+        return
+    
+    if args.ann_lists:
+        evaluate_ann_index(index, args.ann_lists, [int(p) for p in args.ann_probes.split(',')])
+    
+    if args.truncated_dims:
+        evaluate_truncated_search(index, [int(d) for d in args.truncated_dims.split(',')],
+                                  [int(m) for m in args.candidate_multipliers.split(',')])
+    
+    if args.quantization_report:
+        evaluate_quantization(index)
+    
+    if args.sharded_workers:
+        evaluate_sharded_search(index, [int(w) for w in args.sharded_workers.split(',')], args.shard_size)
+    
+    if args.hybrid:
+        evaluate_hybrid_search(index, args.hybrid, args.hybrid_alpha, args.lexical_prefilter)
+    
+    if args.query_cache:
+        evaluate_query_cache(index, args.semantic_epsilon, threshold)
+    
+    if args.calibrate:
+        calibrate_thresholds(index, args.calibrate, args.min_recall)
+    
+    if args.streaming:
+        evaluate_streaming_search(index, args.snapshot)
+    
+    cache_stats = get_embedding_cache().stats()
+    print_info(f"Embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+               f"{cache_stats['entries']} entries ({cache_stats['size_bytes'] / 1024:.1f} KB)")
     
     print_header("TEST COMPLETE")
 
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Persistent Embedding Cache
+
+Content-addressed on-disk cache for embeddings, keyed on the embedding model
+and a hash of the whitespace-normalized text. Vectors are stored as float32
+blobs in a local SQLite database and evicted least-recently-used once the
+cache grows past its size budget.
+
+Usage:
+    from embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(".embedding_cache.sqlite3", max_bytes=512 * 1024 * 1024)
+    cached = cache.get_many("text-embedding-3-small", texts)
+    cache.put_many("text-embedding-3-small", {text: embedding})
+    print(cache.stats())
+
+Requirements:
+    pip install numpy
+"""
+
+import hashlib
+import re
+import sqlite3
+import time
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_CACHE_PATH = ".embedding_cache.sqlite3"
+
+
+def normalize_cache_text(text: str) -> str:
+    """Collapse whitespace so trivially different copies of a text share a cache entry."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def cache_key(model: str, text: str) -> str:
+    """Build the content-addressed key for a (model, text) pair."""
+    digest = hashlib.sha256(normalize_cache_text(text).encode("utf-8")).hexdigest()
+    return f"{model}:{digest}"
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache with size-based LRU eviction and hit/miss counters."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self.conn.commit()
+
+    def get_many(self, model: str, texts: Sequence[str]) -> Dict[str, List[float]]:
+        """Return cached embeddings for the given texts, keyed by the original text.
+
+        Texts that normalize to the same key all get the cached embedding.
+        """
+        keys: Dict[str, List[str]] = {}
+        for text in dict.fromkeys(texts):
+            keys.setdefault(cache_key(model, text), []).append(text)
+        found: Dict[str, List[float]] = {}
+        found_keys = []
+
+        key_list = list(keys)
+        for start in range(0, len(key_list), 500):
+            chunk = key_list[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                found_keys.append(key)
+                for text in keys[key]:
+                    found[text] = vector
+
+        if found_keys:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(now, key) for key in found_keys]
+            )
+            self.conn.commit()
+
+        self.hits += len(found)
+        self.misses += sum(len(group) for group in keys.values()) - len(found)
+        return found
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Return the cached embedding for a single text, or None."""
+        return self.get_many(model, [text]).get(text)
+
+    def put_many(self, model: str, embeddings: Dict[str, Sequence[float]]) -> None:
+        """Store embeddings keyed by text, then evict old entries if over budget."""
+        now = time.time()
+        rows = []
+        for text, embedding in embeddings.items():
+            if not len(embedding):
+                continue
+            blob = np.asarray(embedding, dtype=np.float32).tobytes()
+            rows.append((cache_key(model, text), blob, len(blob), now))
+
+        if not rows:
+            return
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector, size, last_used) VALUES (?, ?, ?, ?)", rows
+        )
+        self.conn.commit()
+        self.evict()
+
+    def put(self, model: str, text: str, embedding: Sequence[float]) -> None:
+        """Store a single embedding."""
+        self.put_many(model, {text: embedding})
+
+    def size_bytes(self) -> int:
+        """Total size of stored vectors in bytes."""
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+    def evict(self) -> int:
+        """Delete least-recently-used entries until the cache fits in max_bytes."""
+        excess = self.size_bytes() - self.max_bytes
+        if excess <= 0:
+            return 0
+
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM embeddings ORDER BY last_used ASC"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+        self.conn.executemany("DELETE FROM embeddings WHERE key = ?", doomed)
+        self.conn.commit()
+        self.evictions += len(doomed)
+        return len(doomed)
+
+    def clear(self) -> None:
+        """Remove every cached embedding."""
+        self.conn.execute("DELETE FROM embeddings")
+        self.conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and storage usage."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0],
+            "size_bytes": self.size_bytes()
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self.conn.close()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Embedding Decoder
+
+Single decoding layer for the embedding formats found in the ``documents``
+table: pgvector / JSON text (``[0.1,0.2,...]``), raw lists, base64-encoded
+float32 payloads and objects wrapping one of those. Text vectors are parsed
+in C with ``np.fromstring`` (a whole page at a time when possible) rather than
+``json.loads`` plus a per-element type check, and format statistics are
+collected as a byproduct of decoding instead of in a second pass.
+
+Usage:
+    from embedding_codec import EmbeddingDecoder
+
+    decoder = EmbeddingDecoder()
+    vector = decoder.decode(document['embedding'], document['id'])
+    matrix, valid = decoder.decode_many([d['embedding'] for d in documents])
+    print(decoder.stats())
+
+Requirements:
+    pip install numpy
+"""
+
+import base64
+import binascii
+import warnings
+from collections import Counter
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from instrumentation import METRICS
+
+FORMATS = ("string", "base64", "array", "object", "null", "other")
+
+# Keys under which object-wrapped embeddings have been seen
+OBJECT_KEYS = ("embedding", "values", "vector", "data")
+
+# Output dimension of the OpenAI embedding models the corpus is built with
+MODEL_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536
+}
+
+
+def _fromstring(body: str) -> Optional[np.ndarray]:
+    """Parse comma-separated numbers in C, returning None on malformed input."""
+    # Older NumPy warns and returns a partial array, newer NumPy raises
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        try:
+            return np.fromstring(body, dtype=np.float32, sep=',')
+        except ValueError:
+            return None
+
+
+def parse_vector_text(text: str) -> Optional[np.ndarray]:
+    """Parse pgvector/JSON vector text such as ``[0.1,0.2]`` into float32."""
+    body = text.strip()
+    if body.startswith('['):
+        body = body[1:-1] if body.endswith(']') else None
+    if not body:
+        return None
+
+    vector = _fromstring(body)
+    if vector is None or vector.shape[0] != body.count(',') + 1:
+        return None
+    return vector
+
+
+def parse_base64_vector(text: str) -> Optional[np.ndarray]:
+    """Decode a base64 string holding little-endian float32 values."""
+    try:
+        raw = base64.b64decode(text, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    if not raw or len(raw) % 4:
+        return None
+    return np.frombuffer(raw, dtype='<f4').astype(np.float32)
+
+
+def detect_format(embedding: Any) -> str:
+    """Classify a stored embedding into one of FORMATS."""
+    if embedding is None:
+        return "null"
+    if isinstance(embedding, str):
+        return "string" if embedding.lstrip().startswith('[') else "base64"
+    if isinstance(embedding, (list, tuple, np.ndarray)):
+        return "array"
+    if isinstance(embedding, dict):
+        return "object"
+    return "other"
+
+
+class EmbeddingDecoder:
+    """Decode stored embeddings to float32 vectors while tallying format statistics.
+
+    ``dimension`` is the corpus dimension ``decode_many`` expects; when it is
+    None it is fixed once, from the most common dimension of the first page
+    with a decodable row, and kept for every later page.
+    """
+
+    def __init__(self, max_samples: int = 3, max_errors: int = 50, dimension: Optional[int] = None):
+        self.max_samples = max_samples
+        self.max_errors = max_errors
+        self.dimension = dimension
+        self.formats = {fmt: 0 for fmt in FORMATS}
+        self.dimensions: Dict[int, int] = {}
+        self.samples: Dict[Any, List[float]] = {}
+        self.errors: List[str] = []
+        self.bytes_decoded = 0
+        self.decoded = 0
+
+    def _error(self, doc_id: Any, error: str) -> None:
+        if len(self.errors) < self.max_errors:
+            self.errors.append(f"Document {doc_id}: {error}")
+
+    def _record(self, vector: Optional[np.ndarray], doc_id: Any, error: str) -> Optional[np.ndarray]:
+        """Update statistics for a decoded (or failed) embedding."""
+        if vector is None or vector.shape[0] == 0:
+            self._error(doc_id, error)
+            return None
+
+        self.decoded += 1
+        self.dimensions[vector.shape[0]] = self.dimensions.get(vector.shape[0], 0) + 1
+        if len(self.samples) < self.max_samples and doc_id is not None:
+            self.samples[doc_id] = vector[:3].tolist()
+        return vector
+
+    def decode(self, embedding: Any, doc_id: Any = None) -> Optional[np.ndarray]:
+        """Decode one embedding to a float32 vector, or None if it is unusable."""
+        fmt = detect_format(embedding)
+        self.formats[fmt] += 1
+
+        if fmt == "null":
+            return None
+
+        if fmt == "object":
+            inner = next((embedding[key] for key in OBJECT_KEYS if key in embedding), None)
+            if inner is None or isinstance(inner, dict):
+                return self._record(None, doc_id, f"Unrecognized object keys: {', '.join(embedding.keys())}")
+            self.formats["object"] -= 1
+            return self.decode(inner, doc_id)
+
+        if fmt in ("string", "base64"):
+            self.bytes_decoded += len(embedding)
+            parser = parse_vector_text if fmt == "string" else parse_base64_vector
+            return self._record(parser(embedding), doc_id, f"Failed to parse {fmt} embedding")
+
+        if fmt == "array":
+            try:
+                vector = np.asarray(embedding, dtype=np.float32)
+            except (TypeError, ValueError):
+                vector = None
+            if vector is not None and vector.ndim != 1:
+                vector = None
+            return self._record(vector, doc_id, "Array embedding is not a flat list of numbers")
+
+        return self._record(None, doc_id, f"Unsupported embedding type: {type(embedding).__name__}")
+
+    def decode_many(self, embeddings: Sequence[Any],
+                    doc_ids: Optional[Sequence[Any]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Decode a page of embeddings into (matrix, valid_mask).
+
+        When every embedding is vector text of the corpus dimension the page is
+        parsed with a single ``np.fromstring`` call; otherwise rows are decoded one
+        by one. Rows that fail to decode, or whose dimension differs from
+        ``self.dimension``, are zero and marked False in the mask; the rest of
+        the page is kept.
+        """
+        bytes_before = self.bytes_decoded
+        with METRICS.span("decode"):
+            decoded = self._decode_many(embeddings, doc_ids)
+        METRICS.incr("embeddings_decoded", len(embeddings))
+        METRICS.incr("bytes_decoded", self.bytes_decoded - bytes_before)
+        return decoded
+
+    def _decode_many(self, embeddings: Sequence[Any],
+                     doc_ids: Optional[Sequence[Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        ids = doc_ids if doc_ids is not None else [None] * len(embeddings)
+        if not len(embeddings):
+            return np.zeros((0, self.dimension or 0), dtype=np.float32), np.zeros(0, dtype=bool)
+
+        bulk = self._decode_text_page(embeddings, ids)
+        if bulk is not None:
+            return bulk, np.ones(len(embeddings), dtype=bool)
+
+        vectors = [self.decode(embedding, doc_id) for embedding, doc_id in zip(embeddings, ids)]
+        if self.dimension is None:
+            counts = Counter(v.shape[0] for v in vectors if v is not None)
+            if not counts:
+                return np.zeros((len(vectors), 0), dtype=np.float32), np.zeros(len(vectors), dtype=bool)
+            self.dimension = counts.most_common(1)[0][0]
+
+        matrix = np.zeros((len(vectors), self.dimension), dtype=np.float32)
+        valid = np.zeros(len(vectors), dtype=bool)
+        for row, (vector, doc_id) in enumerate(zip(vectors, ids)):
+            if vector is None:
+                continue
+            if vector.shape[0] != self.dimension:
+                self._error(doc_id, f"Dimension {vector.shape[0]} does not match corpus dimension {self.dimension}")
+                continue
+            matrix[row] = vector
+            valid[row] = True
+        return matrix, valid
+
+    def _decode_text_page(self, embeddings: Sequence[Any], ids: Sequence[Any]) -> Optional[np.ndarray]:
+        """Parse a page of same-dimension vector text in one call, or return None."""
+        if not all(isinstance(e, str) and e.startswith('[') and e.endswith(']') for e in embeddings):
+            return None
+
+        commas = embeddings[0].count(',')
+        if not all(e.count(',') == commas for e in embeddings):
+            return None
+
+        dimension = commas + 1
+        if self.dimension is not None and dimension != self.dimension:
+            return None
+        body = ','.join(e[1:-1] for e in embeddings)
+        flat = _fromstring(body)
+        if flat is None or flat.shape[0] != dimension * len(embeddings):
+            return None
+
+        matrix = flat.reshape(len(embeddings), dimension)
+        self.dimension = dimension
+        self.formats["string"] += len(embeddings)
+        self.bytes_decoded += len(body)
+        self.decoded += len(embeddings)
+        self.dimensions[dimension] = self.dimensions.get(dimension, 0) + len(embeddings)
+        for doc_id, row in zip(ids, matrix):
+            if len(self.samples) >= self.max_samples or doc_id is None:
+                break
+            self.samples[doc_id] = row[:3].tolist()
+        return matrix
+
+    def stats(self) -> Dict[str, Any]:
+        """Return format counts, observed dimensions, sample values and errors."""
+        return {
+            "formats": dict(self.formats),
+            "dimensions": sorted(self.dimensions),
+            "samples": dict(self.samples),
+            "errors": list(self.errors),
+            "decoded": self.decoded,
+            "bytes_decoded": self.bytes_decoded
+        }
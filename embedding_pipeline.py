@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Batched Embedding Pipeline
+
+Generates OpenAI embeddings for many texts at once. Texts are de-duplicated,
+packed into requests sized by an approximate token budget, sent concurrently
+through a bounded thread pool and returned in input order. When an
+``EmbeddingCache`` is supplied, cached texts are served locally and only the
+misses reach the API.
+
+Usage:
+    from embedding_pipeline import EmbeddingPipeline
+
+    pipeline = EmbeddingPipeline()
+    embeddings = pipeline.embed(["first text", "second text"])
+
+    # Serve repeated texts from a persistent on-disk cache
+    pipeline = EmbeddingPipeline(cache=EmbeddingCache())
+
+    # Against a local stub server implementing POST /v1/embeddings
+    pipeline = EmbeddingPipeline(client=openai.OpenAI(base_url="http://localhost:8080/v1", api_key="stub"))
+
+Requirements:
+    pip install openai
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Sequence
+
+from instrumentation import METRICS
+from embedding_cache import normalize_cache_text
+
+DEFAULT_MODEL = "text-embedding-3-small"
+
+# OpenAI has a token limit, roughly 4 chars per token (same heuristic as preprocessing.js)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of tokens in a text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def pack_batches(texts: Sequence[str], max_batch_tokens: int, max_batch_size: int) -> List[List[int]]:
+    """Group text positions into batches that stay within the token and size budgets."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > max_batch_tokens or len(current) >= max_batch_size):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+class EmbeddingPipeline:
+    """Batched, concurrent embedding generation with duplicate coalescing."""
+
+    def __init__(self, client: Any = None, model: str = DEFAULT_MODEL,
+                 max_batch_tokens: int = 100000, max_batch_size: int = 512,
+                 max_workers: int = 4, cache: Any = None):
+        self._client = client
+        self.cache = cache
+        self.model = model
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_workers = max_workers
+        self.api_calls = 0
+        self.errors: List[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        """The OpenAI client, defaulting to the globally configured ``openai`` module."""
+        if self._client is None:
+            import openai
+            self._client = openai
+        return self._client
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Send a single embeddings request and return vectors in request order."""
+        response = self.client.embeddings.create(model=self.model, input=batch)
+        with self._lock:
+            self.api_calls += 1
+            METRICS.incr("embedding_api_calls")
+        data = sorted(response.data, key=lambda item: item.index)
+        if [item.index for item in data] != list(range(len(batch))):
+            raise ValueError(f"Embeddings response has {len(data)} vectors for {len(batch)} inputs")
+        return [item.embedding for item in data]
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Generate embeddings for texts, returned in input order.
+
+        Texts whose batch fails get an empty list, and the error is recorded in
+        ``errors``, mirroring how ``generate_embedding`` reports failures.
+        """
+        self.errors = []
+        with METRICS.span("embed"):
+            return self._embed(texts)
+
+    def _embed(self, texts: Sequence[str]) -> List[List[float]]:
+        # Coalesce texts on the cache's own normalization, so copies that differ
+        # only in whitespace are embedded once; the first copy is sent
+        positions: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            positions.setdefault(normalize_cache_text(text), []).append(i)
+        representatives = {key: texts[indices[0]] for key, indices in positions.items()}
+        cached_texts = (self.cache.get_many(self.model, list(representatives.values()))
+                        if self.cache is not None else {})
+        cached = {key: cached_texts[text] for key, text in representatives.items() if text in cached_texts}
+        unique = [text for key, text in representatives.items() if key not in cached]
+        METRICS.incr("embedding_cache_hits", len(cached))
+        METRICS.incr("embedding_cache_misses", len(unique))
+
+        batches = pack_batches(unique, self.max_batch_tokens, self.max_batch_size)
+        results: List[Optional[List[float]]] = [None] * len(unique)
+
+        def run(batch: List[int]) -> None:
+            try:
+                vectors = self._embed_batch([unique[i] for i in batch])
+            except Exception as e:
+                with self._lock:
+                    self.errors.append(f"Batch of {len(batch)} texts failed: {str(e)}")
+                return
+            for i, vector in zip(batch, vectors):
+                results[i] = vector
+
+        if len(batches) == 1:
+            run(batches[0])
+        elif batches:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(run, batches))
+
+        fresh = {text: vector for text, vector in zip(unique, results) if vector}
+        if self.cache is not None and fresh:
+            self.cache.put_many(self.model, fresh)
+
+        embeddings: List[List[float]] = [[] for _ in texts]
+        for key, indices in positions.items():
+            vector = cached.get(key) or fresh.get(representatives[key]) or []
+            for i in indices:
+                embeddings[i] = vector
+        return embeddings
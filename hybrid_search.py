@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Hybrid Lexical + Vector Search
+
+Combines BM25 keyword scores with cosine similarity, either by reciprocal
+rank fusion (``rrf``: each list contributes ``1 / (rrf_k + rank)``, so score
+scales never need to agree) or by a weighted sum (``weighted``: ``alpha *
+cosine + (1 - alpha) * bm25 / max_bm25``). Both fuse the top
+``limit * candidate_multiplier`` rows of each ranking.
+
+With ``prefilter=True`` the vector stage only scores documents that contain
+at least one query term, which is much cheaper than a full scan when the
+query is specific. Gathering scattered rows costs more per row than a
+contiguous scan, so it falls back to the full scan when more than
+``prefilter_max_fraction`` of the corpus matches, or fewer than ``limit``
+documents do.
+
+Usage:
+    from hybrid_search import HybridSearch, compare_hybrid
+
+    hybrid = HybridSearch(index, method="rrf")
+    results = hybrid.search("Need a mobile app designer who knows Figma", query_embedding, limit=5)
+    report = compare_hybrid(index, query_texts, query_embeddings, k=10)
+
+Requirements:
+    pip install numpy
+"""
+
+import time
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vector_index import VectorIndex, top_k_indices, format_result
+from lexical_index import BM25Index
+from instrumentation import METRICS
+
+FUSION_METHODS = ("rrf", "weighted")
+
+
+def reciprocal_rank_fusion(rankings: Sequence[np.ndarray], rrf_k: int = 60) -> Tuple[np.ndarray, np.ndarray]:
+    """Fuse best-first row rankings into (rows, scores), best first."""
+    rows = np.concatenate([np.asarray(ranking, dtype=np.int64) for ranking in rankings])
+    contributions = np.concatenate([1.0 / (rrf_k + 1 + np.arange(len(ranking))) for ranking in rankings])
+    if not rows.size:
+        return rows, contributions
+    unique, inverse = np.unique(rows, return_inverse=True)
+    fused = np.bincount(inverse, weights=contributions)
+    order = np.argsort(-fused, kind="stable")
+    return unique[order], fused[order]
+
+
+class HybridSearch:
+    """BM25 and cosine similarity over the same rows, fused into one ranking."""
+
+    def __init__(self, index: VectorIndex, lexical: Optional[BM25Index] = None, method: str = "rrf",
+                 alpha: float = 0.5, rrf_k: int = 60, candidate_multiplier: int = 4,
+                 prefilter: bool = False, prefilter_max_fraction: float = 0.25):
+        if method not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method {method!r}, expected one of {', '.join(FUSION_METHODS)}")
+        self.index = index
+        self.lexical = lexical if lexical is not None else BM25Index.from_vector_index(index)
+        if len(self.lexical) != len(index):
+            raise ValueError("lexical index and vector index must cover the same rows")
+        self.method = method
+        self.alpha = alpha
+        self.rrf_k = rrf_k
+        self.candidate_multiplier = max(1, candidate_multiplier)
+        self.prefilter = prefilter
+        self.prefilter_max_fraction = prefilter_max_fraction
+        self.scanned = 0
+
+    def top_k(self, query_text: str, query: Optional[np.ndarray], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (rows, fused scores) of the top k documents for a normalized query vector."""
+        depth = k * self.candidate_multiplier
+        with METRICS.span("lexical"):
+            lexical_rows, lexical_scores = self.lexical.scores(query_text)
+            lexical_top = lexical_rows[top_k_indices(lexical_scores, depth)]
+
+        vector_top = np.empty(0, dtype=np.int64)
+        if query is not None and len(self.index):
+            selective = k <= lexical_rows.size <= self.prefilter_max_fraction * len(self.index)
+            rows = lexical_rows if self.prefilter and selective else None
+            self.scanned += len(self.index) if rows is None else rows.size
+            vector_top = self.index.batch_top_k(query[np.newaxis], depth, rows=rows)[0][0]
+
+        with METRICS.span("fuse"):
+            if self.method == "rrf":
+                fused_rows, fused = reciprocal_rank_fusion([vector_top, lexical_top], self.rrf_k)
+            else:
+                fused_rows = np.union1d(vector_top, lexical_top)
+                cosine = self.index.matrix[fused_rows] @ query if query is not None else np.zeros(fused_rows.size)
+                bm25 = np.zeros(fused_rows.size, dtype=np.float32)
+                if lexical_rows.size:
+                    # lexical_rows is sorted, so each candidate's BM25 score is one binary search away
+                    at = np.minimum(np.searchsorted(lexical_rows, fused_rows), lexical_rows.size - 1)
+                    found = lexical_rows[at] == fused_rows
+                    bm25[found] = lexical_scores[at[found]] / lexical_scores.max()
+                fused = self.alpha * cosine + (1 - self.alpha) * bm25
+            best = top_k_indices(np.asarray(fused), k)
+        return fused_rows[best], np.asarray(fused)[best]
+
+    def search(self, query_text: str, query_embedding: Optional[Sequence[float]] = None,
+               threshold: float = 0.1, limit: int = 5) -> List[Dict[str, Any]]:
+        """Hybrid search in the VectorIndex result shape, plus ``score`` and ``lexical_score``.
+
+        ``similarity`` (and so ``passed_threshold``) stays the cosine similarity;
+        ``score`` is the fused score the results are ordered by. Without an
+        embedding the search is purely lexical.
+        """
+        if not len(self.index):
+            return []
+        query = self.index.prepare_query(query_embedding) if query_embedding is not None and len(query_embedding) else None
+
+        rows, fused = self.top_k(query_text, query, limit)
+        similarities = np.clip(self.index.matrix[rows] @ query, -1.0, 1.0) if query is not None else np.zeros(rows.size)
+        lexical_rows, lexical_scores = self.lexical.scores(query_text)
+        lexical = dict(zip(lexical_rows.tolist(), lexical_scores.tolist()))
+
+        results = []
+        for row, score, similarity in zip(rows.tolist(), fused, similarities):
+            result = format_result(self.index.ids[row], self.index.texts[row], float(similarity), threshold)
+            result["score"] = float(score)
+            result["lexical_score"] = lexical.get(row, 0.0)
+            results.append(result)
+        return results
+
+
+def compare_hybrid(index: VectorIndex, query_texts: Sequence[str], query_embeddings: Sequence[Sequence[float]],
+                   k: int = 10, alpha: float = 0.5, lexical: Optional[BM25Index] = None) -> List[Dict[str, Any]]:
+    """Per-query latency, rows scored and top-k overlap with pure vector search for each fusion mode."""
+    lexical = lexical if lexical is not None else BM25Index.from_vector_index(index)
+    queries = index.prepare_queries(query_embeddings)
+
+    started = time.perf_counter()
+    exact = [set(index.batch_top_k(query[np.newaxis], k)[0][0].tolist()) for query in queries]
+    exact_ms = (time.perf_counter() - started) * 1000 / max(len(queries), 1)
+
+    report = []
+    for method in FUSION_METHODS:
+        for prefilter in (False, True):
+            hybrid = HybridSearch(index, lexical, method=method, alpha=alpha, prefilter=prefilter)
+            started = time.perf_counter()
+            found = [hybrid.top_k(text, query, k)[0] for text, query in zip(query_texts, queries)]
+            elapsed_ms = (time.perf_counter() - started) * 1000 / max(len(queries), 1)
+
+            overlap = sum(len(expected & set(rows.tolist())) for expected, rows in zip(exact, found))
+            expected_total = sum(len(expected) for expected in exact)
+            report.append({
+                "method": method,
+                "prefilter": prefilter,
+                "latency_ms": elapsed_ms,
+                "vector_latency_ms": exact_ms,
+                "scanned_fraction": hybrid.scanned / max(len(index) * len(queries), 1),
+                "vector_overlap": overlap / expected_total if expected_total else 1.0
+            })
+    return report
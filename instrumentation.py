@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Hot-path Instrumentation
+
+Per-stage timing spans and counters for the search path (fetch, decode,
+embed, score, sort), exported as JSON or Prometheus text, plus an optional
+cProfile/tracemalloc capture around a whole run. The loader, codec, embedding
+pipeline and vector index record into the shared ``METRICS`` object; while it
+is disabled (the default) a span is a shared no-op context manager and a
+counter increment returns immediately, so the hot path pays one attribute
+check per call.
+
+Usage:
+    from instrumentation import METRICS, capture_profile
+
+    METRICS.enable()
+    with METRICS.span("score"):
+        scores = matrix @ query
+    METRICS.incr("documents_scanned", len(matrix))
+
+    print(METRICS.to_prometheus())
+    METRICS.write("metrics.json")
+
+    with capture_profile("cprofile", output="run.prof"):
+        main()
+
+Requirements:
+    (standard library only)
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, Optional
+
+# Search stages, in pipeline order; other span names are allowed and sort after these
+STAGES = ("fetch", "decode", "embed", "score", "sort")
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+_NULL_SPAN = nullcontext()
+
+
+def _format_count(value: float) -> str:
+    """Exact text for a counter: integers without exponent, floats round-tripping."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Span:
+    """Times one ``with`` block into its stage totals."""
+
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+
+
+class Metrics:
+    """Stage timings (calls, total and max seconds) and named counters."""
+
+    def __init__(self, enabled: bool = False, namespace: str = "vector_search"):
+        self.enabled = enabled
+        self.namespace = namespace
+        self.reset()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Forget every recorded span and counter."""
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, float] = {}
+
+    def span(self, name: str) -> Any:
+        """Context manager timing a block as stage ``name`` (a no-op while disabled)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record an externally measured duration for stage ``name``."""
+        if not self.enabled:
+            return
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = {"calls": 0, "seconds": 0.0, "max_seconds": 0.0}
+        stage["calls"] += 1
+        stage["seconds"] += seconds
+        if seconds > stage["max_seconds"]:
+            stage["max_seconds"] = seconds
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """Add ``value`` to counter ``name``."""
+        if not self.enabled:
+            return
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def _ordered_stages(self) -> Iterator[str]:
+        rank = {name: i for i, name in enumerate(STAGES)}
+        return iter(sorted(self.stages, key=lambda name: (rank.get(name, len(STAGES)), name)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Stage timings in milliseconds and counters, ready for ``json.dump``."""
+        return {
+            "stages": {
+                name: {
+                    "calls": self.stages[name]["calls"],
+                    "total_ms": self.stages[name]["seconds"] * 1000,
+                    "mean_ms": self.stages[name]["seconds"] * 1000 / self.stages[name]["calls"],
+                    "max_ms": self.stages[name]["max_seconds"] * 1000
+                }
+                for name in self._ordered_stages()
+            },
+            "counters": dict(sorted(self.counters.items()))
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (stage seconds and calls are counters)."""
+        ns = self.namespace
+        lines = [
+            f"# HELP {ns}_stage_seconds_total Time spent in each search stage.",
+            f"# TYPE {ns}_stage_seconds_total counter",
+        ]
+        lines += [f'{ns}_stage_seconds_total{{stage="{name}"}} {self.stages[name]["seconds"]:.9f}'
+                  for name in self._ordered_stages()]
+        lines += [
+            f"# HELP {ns}_stage_calls_total Number of times each search stage ran.",
+            f"# TYPE {ns}_stage_calls_total counter",
+        ]
+        lines += [f'{ns}_stage_calls_total{{stage="{name}"}} {self.stages[name]["calls"]}'
+                  for name in self._ordered_stages()]
+        lines += [
+            f"# HELP {ns}_stage_max_seconds Slowest single run of each search stage.",
+            f"# TYPE {ns}_stage_max_seconds gauge",
+        ]
+        lines += [f'{ns}_stage_max_seconds{{stage="{name}"}} {self.stages[name]["max_seconds"]:.9f}'
+                  for name in self._ordered_stages()]
+        for name, value in sorted(self.counters.items()):
+            lines += [f"# TYPE {ns}_{name}_total counter", f"{ns}_{name}_total {_format_count(value)}"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, fmt: Optional[str] = None) -> None:
+        """Write the metrics to ``path`` as ``json`` or ``prometheus`` (default: by extension)."""
+        if fmt is None:
+            fmt = "prometheus" if path.endswith((".prom", ".txt")) else "json"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write(self.to_prometheus() if fmt == "prometheus" else self.to_json())
+
+    def summary(self) -> str:
+        """A small per-stage table for terminal output."""
+        rows = [f"{'stage':<12} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"]
+        for name, stage in self.to_dict()["stages"].items():
+            rows.append(f"{name:<12} {stage['calls']:>7} {stage['total_ms']:>10.2f} "
+                        f"{stage['mean_ms']:>9.3f} {stage['max_ms']:>9.2f}")
+        for name, value in sorted(self.counters.items()):
+            rows.append(f"{name:<28} {_format_count(value):>12}")
+        return "\n".join(rows)
+
+
+# Shared by the loader, codec, embedding pipeline and vector index
+METRICS = Metrics()
+
+
+@contextmanager
+def capture_profile(mode: Optional[str], output: Optional[str] = None, top: int = 15) -> Iterator[None]:
+    """Profile the enclosed block with ``cprofile`` or ``tracemalloc`` (``None`` does nothing).
+
+    cProfile stats are saved to ``output`` (for snakeviz/pstats) when given and
+    the top functions by cumulative time are printed; tracemalloc prints the
+    peak traced memory and the top allocation sites, and saves the snapshot
+    to ``output``.
+    """
+    if mode is None:
+        yield
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode {mode!r}, expected one of {', '.join(PROFILE_MODES)}")
+
+    if mode == "cprofile":
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            if output:
+                profiler.dump_stats(output)
+            pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(top)
+        return
+
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        yield
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if output:
+            snapshot.dump(output)
+        print(f"Peak traced memory: {peak / 1024 / 1024:.1f} MB")
+        for stat in snapshot.statistics("lineno")[:top]:
+            print(f"  {stat}")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+BM25 Lexical Index
+
+An in-memory BM25 inverted index over document text and the ``techs`` and
+``keywords`` metadata fields, for queries that hinge on exact skill names
+("Figma", "Node.js", "C++") that embeddings sometimes blur. Postings are
+stored compactly as one CSR-style layout: a term offset array into shared
+int32 row and float32 term-frequency arrays, sorted by row within each term.
+
+Metadata fields count as extra occurrences weighted by ``field_weights``
+(a simple BM25F), so a document tagged ``techs: ["Figma"]`` outranks one that
+mentions Figma once in passing.
+
+Usage:
+    from lexical_index import BM25Index
+
+    lexical = BM25Index.from_vector_index(index)
+    rows, scores = lexical.search("mobile app designer who knows Figma", limit=10)
+    candidates = lexical.candidates("Figma")   # rows containing any query term
+
+Requirements:
+    pip install numpy
+"""
+
+import re
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vector_index import VectorIndex, top_k_indices
+
+# Keeps tech names like c++, c#, node.js and .net together as single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*|\.[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the "
+    "their this to was were who will with".split()
+)
+
+DEFAULT_FIELD_WEIGHTS = {"text": 1.0, "techs": 2.0, "keywords": 2.0}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase ``text`` and split it into search terms, dropping stopwords."""
+    return [token for token in TOKEN_PATTERN.findall((text or '').lower()) if token not in STOPWORDS]
+
+
+def _field_text(value: Any) -> str:
+    """Flatten a metadata value (string or list of strings) into text."""
+    if isinstance(value, (list, tuple, set)):
+        return " ".join(str(v) for v in value if v is not None)
+    return str(value) if value is not None else ""
+
+
+class BM25Index:
+    """Okapi BM25 over text plus weighted metadata fields, with compact postings."""
+
+    def __init__(self, texts: Sequence[str], metadata: Optional[Sequence[Dict[str, Any]]] = None,
+                 k1: float = 1.2, b: float = 0.75,
+                 field_weights: Dict[str, float] = DEFAULT_FIELD_WEIGHTS):
+        if metadata is not None and len(metadata) != len(texts):
+            raise ValueError("metadata must have one entry per text")
+
+        self.k1 = k1
+        self.b = b
+        self.field_weights = dict(field_weights)
+        self.terms: Dict[str, int] = {}
+
+        rows: List[List[int]] = []
+        frequencies: List[List[float]] = []
+        lengths = np.zeros(len(texts), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            counts: Dict[int, float] = {}
+            for field, weight in self.field_weights.items():
+                if field == "text":
+                    tokens = tokenize(text)
+                elif metadata is not None:
+                    tokens = tokenize(_field_text(metadata[row].get(field)))
+                else:
+                    continue
+                for token in tokens:
+                    term = self.terms.get(token)
+                    if term is None:
+                        term = self.terms[token] = len(rows)
+                        rows.append([])
+                        frequencies.append([])
+                    counts[term] = counts.get(term, 0.0) + weight
+                lengths[row] += weight * len(tokens)
+            for term, frequency in counts.items():
+                rows[term].append(row)
+                frequencies[term].append(frequency)
+
+        # Flatten the per-term lists into one offsets/rows/frequencies layout
+        document_frequency = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+        self.offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=self.offsets[1:])
+        self.rows = np.fromiter((r for posting in rows for r in posting), dtype=np.int32,
+                                count=int(self.offsets[-1]))
+        self.frequencies = np.fromiter((f for posting in frequencies for f in posting), dtype=np.float32,
+                                       count=int(self.offsets[-1]))
+
+        size = len(texts)
+        self.idf = np.log1p((size - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+        average = lengths.mean() if size else 0.0
+        # Per-row BM25 length normalization, precomputed once
+        self.norms = (self.k1 * (1 - self.b + self.b * lengths / average)).astype(np.float32) if average else \
+            np.full(size, self.k1, dtype=np.float32)
+
+    @classmethod
+    def from_vector_index(cls, index: VectorIndex, **kwargs: Any) -> "BM25Index":
+        """Index the texts (and metadata, when loaded) of a vector index, row for row."""
+        return cls(index.texts, index.row_metadata, **kwargs)
+
+    def __len__(self) -> int:
+        return self.norms.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the posting arrays."""
+        return self.offsets.nbytes + self.rows.nbytes + self.frequencies.nbytes + self.idf.nbytes + self.norms.nbytes
+
+    def _postings(self, query: str) -> List[int]:
+        """Term ids of the distinct query terms that occur in the corpus."""
+        seen = dict.fromkeys(tokenize(query))
+        return [self.terms[token] for token in seen if token in self.terms]
+
+    def scores(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (rows, scores) for every document containing a query term, rows sorted."""
+        terms = self._postings(query)
+        if not terms:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        rows, contributions = [], []
+        for term in terms:
+            start, end = self.offsets[term], self.offsets[term + 1]
+            posting = self.rows[start:end]
+            frequency = self.frequencies[start:end]
+            rows.append(posting)
+            contributions.append(self.idf[term] * frequency * (self.k1 + 1) / (frequency + self.norms[posting]))
+
+        if len(rows) == 1:
+            return rows[0].astype(np.int64), contributions[0]
+        matched, inverse = np.unique(np.concatenate(rows), return_inverse=True)
+        return matched.astype(np.int64), np.bincount(inverse, weights=np.concatenate(contributions)).astype(np.float32)
+
+    def search(self, query: str, limit: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (rows, scores) of the ``limit`` best BM25 matches, best first."""
+        rows, scores = self.scores(query)
+        best = top_k_indices(scores, limit)
+        return rows[best], scores[best]
+
+    def candidates(self, query: str) -> np.ndarray:
+        """Sorted rows containing at least one query term, for pre-filtering vector search."""
+        return self.scores(query)[0]
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Metadata Filter Index
+
+Per-field inverted indexes over document metadata (``profile_id``, content
+type, project ``techs`` and ``keywords``), stored as sorted row arrays. A
+filter is resolved to the matching rows before any scoring happens, so a
+narrow filter scores only those rows instead of the full matrix.
+
+Filters map a field to a value or a list of values: values within a field are
+OR-ed, fields are AND-ed. Array fields match when any element matches, and
+string values are compared case-insensitively.
+
+Usage:
+    from metadata_filter import MetadataIndex, document_metadata
+
+    metadata = MetadataIndex([document_metadata(row) for row in rows])
+    rows = metadata.rows({"content_type": "project", "techs": ["React", "Vue"]})
+
+Requirements:
+    pip install numpy
+"""
+
+from typing import List, Dict, Any, Optional, Sequence, Union
+
+import numpy as np
+
+FILTER_FIELDS = ("profile_id", "content_type", "techs", "keywords")
+
+# The documents column ``document_metadata`` reads each filter field from:
+# the API stores the owner as ``person_id`` and everything else in ``metadata``
+FILTER_COLUMNS = {
+    "profile_id": "person_id",
+    "content_type": "metadata",
+    "techs": "metadata",
+    "keywords": "metadata"
+}
+
+FilterValue = Union[Any, Sequence[Any]]
+
+
+def _normalize_value(value: Any) -> Any:
+    """Normalize a metadata value for exact matching."""
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+def document_metadata(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the filterable fields from a document row.
+
+    Fields are read from top-level columns first and then from a ``metadata``
+    JSON column (as written by the documents API), with ``person_id`` and
+    ``userId`` accepted as the profile id and ``type`` as the content type.
+    """
+    extra = row.get('metadata') if isinstance(row.get('metadata'), dict) else {}
+    return {
+        "profile_id": row.get('profile_id') or row.get('person_id') or extra.get('profile_id') or extra.get('userId'),
+        "content_type": row.get('content_type') or extra.get('content_type') or extra.get('type'),
+        "techs": row.get('techs') or extra.get('techs') or [],
+        "keywords": row.get('keywords') or extra.get('keywords') or []
+    }
+
+
+class MetadataIndex:
+    """Inverted indexes from field values to sorted row numbers."""
+
+    def __init__(self, rows: Sequence[Dict[str, Any]] = (), fields: Sequence[str] = FILTER_FIELDS):
+        self.fields = tuple(fields)
+        self.size = 0
+        self._postings: Dict[str, Dict[Any, List[int]]] = {field: {} for field in self.fields}
+        self._arrays: Dict[str, Dict[Any, np.ndarray]] = {}
+        for row in rows:
+            self.add(row)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, metadata: Dict[str, Any]) -> int:
+        """Index the metadata of the next row and return its row number."""
+        row = self.size
+        self.size += 1
+        for field in self.fields:
+            value = metadata.get(field)
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            for v in values:
+                if v is None:
+                    continue
+                key = _normalize_value(v)
+                self._postings[field].setdefault(key, []).append(row)
+                # Only the cached arrays of the values this row adds to are stale
+                self._arrays.get(field, {}).pop(key, None)
+        return row
+
+    def _posting(self, field: str, value: Any) -> np.ndarray:
+        """Sorted, de-duplicated rows for one field value (cached as an array)."""
+        arrays = self._arrays.setdefault(field, {})
+        key = _normalize_value(value)
+        if key not in arrays:
+            arrays[key] = np.unique(np.asarray(self._postings[field].get(key, []), dtype=np.int64))
+        return arrays[key]
+
+    def values(self, field: str) -> Dict[Any, int]:
+        """Return each indexed value of a field with its document count."""
+        return {value: len(set(rows)) for value, rows in self._postings[field].items()}
+
+    def rows(self, filters: Optional[Dict[str, FilterValue]]) -> Optional[np.ndarray]:
+        """Resolve filters to sorted matching rows, or None when there is nothing to filter."""
+        if not filters:
+            return None
+
+        # Intersect the smallest postings first so the working set shrinks fastest
+        per_field = []
+        for field, value in filters.items():
+            if field not in self._postings:
+                raise ValueError(f"Unknown filter field '{field}', expected one of {', '.join(self.fields)}")
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            postings = [self._posting(field, v) for v in values] or [np.empty(0, dtype=np.int64)]
+            per_field.append(postings[0] if len(postings) == 1 else np.unique(np.concatenate(postings)))
+
+        per_field.sort(key=len)
+        matched = per_field[0]
+        for rows in per_field[1:]:
+            if not matched.size:
+                break
+            matched = np.intersect1d(matched, rows, assume_unique=True)
+        return matched
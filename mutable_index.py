@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Incrementally Maintained Vector Index
+
+Keeps a long-lived ``VectorIndex`` fresh without rebuilding it. New and
+updated documents go into an append buffer, replaced and deleted rows are
+tombstoned, and searches score the base matrix and the buffer together while
+skipping tombstones. Once the buffer and tombstones grow past a fraction of
+the base, ``compact`` folds everything into a new base index.
+
+``sync_since`` pulls only the rows changed since a timestamp or the cursor
+returned by the previous sync, so keeping the index fresh costs time
+proportional to the changes, not the corpus size.
+Deletions are not visible through ``updated_at`` and must be applied with
+``delete``. ``version`` counts upserts and deletes, so caches of search
+results (see ``query_cache``) can tell when they have gone stale.
+
+Usage:
+    from mutable_index import MutableVectorIndex
+
+    live = MutableVectorIndex(index)
+    live.upsert(doc_id, text, embedding, {"profile_id": profile_id})
+    live.delete(other_id)
+    results = live.search(query_embedding, threshold=0.1, limit=5)
+    changed, cursor = live.sync_since(supabase, cursor)
+
+Requirements:
+    pip install numpy
+"""
+
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from vector_index import VectorIndex, top_k_indices, format_result
+from metadata_filter import MetadataIndex, document_metadata
+from embedding_codec import EmbeddingDecoder
+from corpus_loader import iter_changed_pages, ChangeCursor
+
+
+class MutableVectorIndex:
+    """A VectorIndex plus an append buffer and tombstones, with periodic compaction."""
+
+    def __init__(self, base: VectorIndex, compact_ratio: float = 0.2, min_compact_rows: int = 1024,
+                 auto_compact: bool = True):
+        self.compact_ratio = compact_ratio
+        self.min_compact_rows = min_compact_rows
+        self.auto_compact = auto_compact
+        self.compactions = 0
+        self.version = 0
+        self._reset(base)
+
+    def _reset(self, base: VectorIndex) -> None:
+        """Start over from a new base index with an empty buffer and no tombstones."""
+        self.base = base
+        self.buffer = np.empty((0, base.dimension), dtype=np.float32)
+        self.buffer_size = 0
+        self.buffer_ids: List[Any] = []
+        self.buffer_texts: List[str] = []
+        self.buffer_metadata: List[Dict[str, Any]] = []
+        self.deleted = np.zeros(len(base), dtype=bool)
+        self.tombstones = 0
+        self.locations: Dict[Any, int] = {doc_id: row for row, doc_id in enumerate(base.ids)}
+        self.metadata = MetadataIndex(base.row_metadata) if base.row_metadata is not None else None
+
+    def __len__(self) -> int:
+        return len(self.base) + self.buffer_size - self.tombstones
+
+    def __contains__(self, doc_id: Any) -> bool:
+        return doc_id in self.locations
+
+    @property
+    def dimension(self) -> int:
+        """Number of dimensions stored per document (0 until the first vector is known)."""
+        return self.buffer.shape[1]
+
+    def _row_id(self, row: int) -> Any:
+        """Document id stored at a base or buffer row."""
+        return self.base.ids[row] if row < len(self.base) else self.buffer_ids[row - len(self.base)]
+
+    def _row_text(self, row: int) -> str:
+        """Document text stored at a base or buffer row."""
+        return self.base.texts[row] if row < len(self.base) else self.buffer_texts[row - len(self.base)]
+
+    def _tombstone(self, row: int) -> None:
+        """Mark a row as deleted."""
+        if not self.deleted[row]:
+            self.deleted[row] = True
+            self.tombstones += 1
+
+    def upsert(self, doc_id: Any, text: str, embedding: Sequence[float],
+               metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Insert a document, or replace it if the id is already indexed."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        if self.dimension == 0 and not len(self.base):
+            self.buffer = np.empty((0, vector.shape[0]), dtype=np.float32)
+        if vector.ndim != 1 or vector.shape[0] != self.dimension:
+            raise ValueError(f"Embedding dimension {vector.shape[-1]} does not match index dimension {self.dimension}")
+
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+
+        if doc_id in self.locations:
+            self._tombstone(self.locations[doc_id])
+
+        if self.buffer_size == self.buffer.shape[0]:
+            capacity = max(16, self.buffer.shape[0] * 2)
+            grown = np.empty((capacity, self.dimension), dtype=np.float32)
+            grown[:self.buffer_size] = self.buffer[:self.buffer_size]
+            self.buffer = grown
+
+            deleted = np.zeros(len(self.base) + capacity, dtype=bool)
+            deleted[:self.deleted.shape[0]] = self.deleted
+            self.deleted = deleted
+
+        self.buffer[self.buffer_size] = vector
+        self.buffer_size += 1
+        self.buffer_ids.append(doc_id)
+        self.buffer_texts.append(text or '')
+        self.buffer_metadata.append(metadata or {})
+        self.locations[doc_id] = len(self.base) + self.buffer_size - 1
+        if self.metadata is not None:
+            self.metadata.add(metadata or {})
+
+        self.version += 1
+        self._maybe_compact()
+
+    def delete(self, doc_id: Any) -> bool:
+        """Tombstone a document; returns False if the id is not indexed."""
+        row = self.locations.pop(doc_id, None)
+        if row is None:
+            return False
+        self._tombstone(row)
+        self.version += 1
+        self._maybe_compact()
+        return True
+
+    def needs_compaction(self) -> bool:
+        """Whether the buffer and tombstones have grown enough to justify a rebuild."""
+        pending = self.buffer_size + self.tombstones
+        return pending >= max(self.min_compact_rows, self.compact_ratio * len(self.base))
+
+    def _maybe_compact(self) -> None:
+        """Compact automatically once enough changes have accumulated."""
+        if self.auto_compact and self.needs_compaction():
+            self.compact()
+
+    def compact(self) -> VectorIndex:
+        """Fold the buffer into the base, drop tombstoned rows and return the new base index."""
+        base_live = np.flatnonzero(~self.deleted[:len(self.base)])
+        buffer_live = np.flatnonzero(~self.deleted[len(self.base):len(self.base) + self.buffer_size])
+
+        if not len(self.base):
+            matrix = self.buffer[buffer_live]
+        else:
+            matrix = np.concatenate([self.base.matrix[base_live], self.buffer[buffer_live]])
+        ids = [self.base.ids[i] for i in base_live] + [self.buffer_ids[i] for i in buffer_live]
+        texts = [self.base.texts[i] for i in base_live] + [self.buffer_texts[i] for i in buffer_live]
+
+        metadata = None
+        if self.base.row_metadata is not None:
+            metadata = [self.base.row_metadata[i] for i in base_live] + \
+                [self.buffer_metadata[i] for i in buffer_live]
+
+        self._reset(VectorIndex(ids, texts, matrix, normalized=True, metadata=metadata))
+        self.compactions += 1
+        return self.base
+
+    def search(self, query_embedding: Sequence[float], threshold: float = 0.1, limit: int = 5,
+               filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Search the base and buffer together, skipping tombstoned rows."""
+        if not len(self) or not len(query_embedding):
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape[0] != self.dimension:
+            raise ValueError(f"Query dimension {query.shape[0]} does not match index dimension {self.dimension}")
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query = query / norm
+
+        rows, scores = self._score(query, filters)
+        live = ~self.deleted[rows]
+        rows, scores = rows[live], scores[live]
+        return [
+            format_result(self._row_id(rows[i]), self._row_text(rows[i]),
+                          float(np.clip(scores[i], -1.0, 1.0)), threshold)
+            for i in top_k_indices(scores, limit)
+        ]
+
+    def _score(self, query: np.ndarray, filters: Optional[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (rows, scores) for every candidate row, base rows first."""
+        n = len(self.base)
+        if not filters:
+            base_scores = self.base.matrix @ query if n else np.zeros(0, dtype=np.float32)
+            buffer_scores = self.buffer[:self.buffer_size] @ query
+            return np.arange(n + self.buffer_size), np.concatenate([base_scores, buffer_scores])
+
+        if self.metadata is None:
+            raise ValueError("This index was built without metadata, so it cannot be filtered")
+        rows = self.metadata.rows(filters)
+        base_rows, buffer_rows = rows[rows < n], rows[rows >= n]
+        base_scores = self.base.matrix[base_rows] @ query if n else np.zeros(0, dtype=np.float32)
+        return rows, np.concatenate([base_scores, self.buffer[buffer_rows - n] @ query])
+
+    def search_batch(self, query_embeddings: Sequence[Sequence[float]], threshold: float = 0.1,
+                     limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """Search for many queries."""
+        return [self.search(query, threshold, limit, filters) for query in query_embeddings]
+
+    def sync_since(self, client: Any, since: Union[str, ChangeCursor, None], column: str = "updated_at",
+                   metadata_columns: Tuple[str, ...] = (),
+                   page_size: int = 1000) -> Tuple[int, Union[str, ChangeCursor, None]]:
+        """Upsert every document changed since ``since``; returns (rows applied, new cursor).
+
+        The cursor is the (timestamp, id) of the last row seen; pass it back in
+        to resume exactly after that row.
+        """
+        decoder = EmbeddingDecoder()
+        applied, cursor = 0, since
+        for rows in iter_changed_pages(client, since, column, metadata_columns, page_size):
+            for row in rows:
+                cursor = (row.get(column), row.get('id'))
+                vector = decoder.decode(row.get('embedding'), row.get('id'))
+                if vector is None or (self.dimension and vector.shape[0] != self.dimension):
+                    continue
+                self.upsert(row.get('id'), row.get('text') or '', vector,
+                            document_metadata(row) if self.metadata is not None else None)
+                applied += 1
+        return applied, cursor
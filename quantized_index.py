@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Quantized Vector Index
+
+Compressed storage and scoring modes for a ``VectorIndex``:
+
+    float16 - half precision, 2 bytes per dimension
+    int8    - symmetric int8 with one float32 scale per vector, ~1 byte per dimension
+    pq      - product quantization: each vector is split into ``m`` sub-vectors,
+              each stored as a one-byte code into a 256-entry codebook, and scored
+              with asymmetric distance computation (full-precision query against
+              the codebooks)
+
+Scoring walks the codes chunk by chunk: float16 and int8 chunks are decoded
+and multiplied with the query, PQ chunks are looked up in the query's
+distance table. Besides the score vector only one chunk-sized float32
+temporary exists at a time. ``compare_quantization`` reports the memory saved against
+the top-k overlap with full-precision results.
+
+Usage:
+    from quantized_index import QuantizedIndex, compare_quantization
+
+    quantized = QuantizedIndex(index, mode="int8")
+    results = quantized.search(query_embedding, threshold=0.1, limit=5)
+    report = compare_quantization(index, query_embeddings, k=10)
+
+Requirements:
+    pip install numpy
+"""
+
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from vector_index import VectorIndex, top_k_indices, format_result
+
+MODES = ("float16", "int8", "pq")
+
+
+class QuantizedIndex:
+    """Cosine similarity search over float16, int8 or product-quantized embeddings."""
+
+    def __init__(self, index: VectorIndex, mode: str = "int8", pq_subvectors: Optional[int] = None,
+                 pq_train_size: int = 10000, chunk_size: int = 65536, seed: int = 0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown quantization mode '{mode}', expected one of {', '.join(MODES)}")
+
+        self.index = index
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.scales: Optional[np.ndarray] = None
+        self.codebooks: Optional[np.ndarray] = None
+
+        matrix = index.matrix
+        if mode == "float16":
+            self.codes = matrix.astype(np.float16)
+        elif mode == "int8":
+            self.scales = np.abs(matrix).max(axis=1).astype(np.float32) / 127.0
+            self.scales[self.scales == 0] = 1.0
+            self.codes = np.empty(matrix.shape, dtype=np.int8)
+            for start in range(0, len(index), chunk_size):
+                chunk = matrix[start:start + chunk_size] / self.scales[start:start + chunk_size, None]
+                self.codes[start:start + chunk_size] = np.rint(chunk).astype(np.int8)
+        else:
+            self._train_pq(pq_subvectors or self._default_subvectors(index.dimension), pq_train_size, seed)
+
+    @staticmethod
+    def _default_subvectors(dimension: int) -> int:
+        """Pick the largest sub-vector count up to dimension / 16 that divides the dimension."""
+        for m in range(max(1, dimension // 16), 0, -1):
+            if dimension % m == 0:
+                return m
+        return 1
+
+    def _train_pq(self, m: int, train_size: int, seed: int, n_iter: int = 6) -> None:
+        """Train one 256-entry codebook per sub-vector and encode every document.
+
+        Each k-means iteration assigns the training sample with ``_encode``
+        (chunk by chunk, one sub-space at a time) and then moves every
+        codeword of every sub-space to the mean of its assigned sub-vectors.
+        """
+        dimension = self.index.dimension
+        if dimension % m:
+            raise ValueError(f"Dimension {dimension} is not divisible by {m} sub-vectors")
+
+        rng = np.random.default_rng(seed)
+        matrix = self.index.matrix
+        if len(self.index) > train_size:
+            sample = matrix[np.sort(rng.choice(len(self.index), train_size, replace=False))]
+        else:
+            sample = np.asarray(matrix)
+
+        width = dimension // m
+        n_codes = min(256, max(1, sample.shape[0]))
+        sub = sample.reshape(sample.shape[0], m, width)
+        self.codebooks = np.ascontiguousarray(
+            sub[rng.choice(sample.shape[0], n_codes, replace=False)].transpose(1, 0, 2)
+        )
+
+        for _ in range(n_iter):
+            labels = self._encode(sample)
+            for j in range(m):
+                counts = np.bincount(labels[:, j], minlength=n_codes)
+                order = np.argsort(labels[:, j], kind="stable")
+                occupied = np.flatnonzero(counts)
+                starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[occupied]
+                sums = np.add.reduceat(sub[order, j], starts, axis=0)
+                self.codebooks[j, occupied] = sums / counts[occupied, None]
+
+                empty = np.flatnonzero(counts == 0)
+                if empty.size:
+                    self.codebooks[j, empty] = sub[rng.choice(sample.shape[0], empty.size, replace=False), j]
+
+        self.codes = self._encode(matrix)
+
+    def _encode(self, matrix: np.ndarray, chunk_size: int = 2048) -> np.ndarray:
+        """Assign every sub-vector of every row to its nearest codebook entry.
+
+        Subspaces are handled one at a time, so the distance temporary is only
+        ``chunk_size x n_codes`` floats (2 MB) rather than ``m`` times that.
+        """
+        m, n_codes, width = self.codebooks.shape
+        code_norms = np.einsum("jcw,jcw->jc", self.codebooks, self.codebooks)
+        codes = np.empty((matrix.shape[0], m), dtype=np.uint8)
+
+        for start in range(0, matrix.shape[0], chunk_size):
+            chunk = np.asarray(matrix[start:start + chunk_size])
+            for j in range(m):
+                # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2, and ||x||^2 is constant per sub-vector
+                distances = chunk[:, j * width:(j + 1) * width] @ self.codebooks[j].T
+                distances *= -2.0
+                distances += code_norms[j]
+                codes[start:start + chunk.shape[0], j] = np.argmin(distances, axis=1)
+        return codes
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the quantized codes plus scales or codebooks."""
+        total = self.codes.nbytes
+        if self.scales is not None:
+            total += self.scales.nbytes
+        if self.codebooks is not None:
+            total += self.codebooks.nbytes
+        return total
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """Approximate cosine similarity of a normalized query against every document."""
+        if self.mode == "pq":
+            m, _, width = self.codebooks.shape
+            # Asymmetric distance table: dot product of each query sub-vector with every code
+            table = np.einsum("jcw,jw->jc", self.codebooks, query.reshape(m, width))
+            scores = np.zeros(len(self), dtype=np.float32)
+            for start in range(0, len(self), self.chunk_size):
+                codes = self.codes[start:start + self.chunk_size]
+                chunk_scores = scores[start:start + codes.shape[0]]
+                for j in range(m):
+                    chunk_scores += table[j, codes[:, j]]
+            return scores
+
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), self.chunk_size):
+            chunk = self.codes[start:start + self.chunk_size].astype(np.float32)
+            scores[start:start + chunk.shape[0]] = chunk @ query
+        if self.scales is not None:
+            scores *= self.scales
+        return scores
+
+    def top_k(self, query: np.ndarray, k: int) -> np.ndarray:
+        """Return the approximate top k rows for a normalized query, best first."""
+        return top_k_indices(self.scores(query), k)
+
+    def search(self, query_embedding: Sequence[float], threshold: float = 0.1,
+               limit: int = 5) -> List[Dict[str, Any]]:
+        """Search quantized embeddings, returning results in the VectorIndex shape."""
+        if not len(self) or not len(query_embedding):
+            return []
+
+        query = self.index.prepare_query(query_embedding)
+        if query is None:
+            return []
+
+        scores = self.scores(query)
+        return [
+            format_result(self.index.ids[i], self.index.texts[i], float(np.clip(scores[i], -1.0, 1.0)), threshold)
+            for i in top_k_indices(scores, limit)
+        ]
+
+
+def compare_quantization(index: VectorIndex, query_embeddings: Sequence[Sequence[float]], k: int = 10,
+                         modes: Sequence[str] = MODES, **options: Any) -> List[Dict[str, Any]]:
+    """Report memory use and top-k overlap with full precision for each quantization mode."""
+    queries = index.prepare_queries(query_embeddings)
+    exact = [set(top_k_indices(index.matrix @ query, k).tolist()) for query in queries]
+    expected_total = sum(len(expected) for expected in exact)
+    full_bytes = len(index) * index.dimension * 4
+
+    report = [{
+        "mode": "float32",
+        "bytes": full_bytes,
+        "bytes_per_vector": index.dimension * 4,
+        "compression": 1.0,
+        "overlap": 1.0
+    }]
+    for mode in modes:
+        quantized = QuantizedIndex(index, mode=mode, **options)
+        hits = sum(len(expected & set(quantized.top_k(query, k).tolist()))
+                   for expected, query in zip(exact, queries))
+        report.append({
+            "mode": mode,
+            "bytes": quantized.nbytes,
+            "bytes_per_vector": quantized.nbytes / len(index) if len(index) else 0.0,
+            "compression": full_bytes / quantized.nbytes if quantized.nbytes else 0.0,
+            "overlap": hits / expected_total if expected_total else 1.0
+        })
+    return report
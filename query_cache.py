@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Query Result Cache
+
+An in-memory cache of search results with two tiers. The exact tier is keyed
+on the normalized query (``normalizeText`` from preprocessing.js: trimmed,
+whitespace collapsed, special characters removed, lowercased, plus trailing
+sentence punctuation dropped) together with the limit, threshold and filters,
+like ``getCacheKey`` in search.js. The optional semantic tier reuses the
+results of a cached query whose embedding is within ``semantic_epsilon``
+cosine distance of the new one, found by scanning a small matrix of cached
+query embeddings.
+
+Entries expire after ``ttl`` seconds and the least recently used entry is
+evicted once ``max_entries`` is reached. ``CachedSearch`` invalidates the
+whole cache when the index it wraps changes (``MutableVectorIndex.version``),
+since any insert or delete can change any query's results.
+
+Usage:
+    from query_cache import QueryCache, CachedSearch
+
+    cache = QueryCache(max_entries=1000, ttl=300, semantic_epsilon=0.02)
+    search = CachedSearch(live_index, cache, embed=lambda text: pipeline.embed([text])[0])
+    results = search.search("Need a mobile app designer who knows Figma", limit=5)
+    print(cache.stats())
+
+Requirements:
+    pip install numpy
+"""
+
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Sequence, Callable, NamedTuple, Union
+
+import numpy as np
+
+from instrumentation import METRICS
+
+# Same defaults as the result cache in api/src/lib/rag/search.js
+DEFAULT_TTL = 5 * 60.0
+DEFAULT_MAX_ENTRIES = 1000
+
+
+def normalize_query(text: str) -> str:
+    """Normalize a query like ``normalizeText`` in preprocessing.js, ignoring trailing punctuation."""
+    # Special characters go first, so removing one never leaves a double space behind
+    text = re.sub(r"[^\w\s.,!?-]", "", text or '')
+    return re.sub(r"\s+", " ", text).strip().lower().rstrip(".,!? ")
+
+
+def query_key(query: str, limit: int, options: Optional[Dict[str, Any]] = None) -> str:
+    """Exact-tier cache key: normalized query, limit and the search options."""
+    return f"{normalize_query(query)}:{limit}:{json.dumps(options or {}, sort_keys=True, default=str)}"
+
+
+class _Entry(NamedTuple):
+    results: List[Dict[str, Any]]
+    created: float
+    options_key: str
+    slot: int
+
+
+class QueryCache:
+    """TTL + LRU cache of search results with an optional near-duplicate embedding tier."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL,
+                 semantic_epsilon: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.semantic_epsilon = semantic_epsilon
+        self.clock = clock
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Semantic tier: one row per cached embedding, reused through a free list
+        self._vectors: Optional[np.ndarray] = None
+        self._slot_keys: List[Optional[str]] = []
+        self._free: List[int] = []
+
+    def invalidate(self) -> None:
+        """Forget all cached results, e.g. after the index changed."""
+        if self._entries:
+            self.invalidations += 1
+            METRICS.incr("query_cache_invalidations")
+        self.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        if entry.slot >= 0:
+            self._slot_keys[entry.slot] = None
+            self._free.append(entry.slot)
+
+    def _live(self, key: str) -> Optional[_Entry]:
+        """Return a fresh entry and mark it recently used, dropping it if expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.clock() - entry.created > self.ttl:
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _nearest(self, embedding: Sequence[float], options_key: str) -> Optional[_Entry]:
+        """A live entry with the same options whose query embedding is within the epsilon."""
+        if self.semantic_epsilon is None or self._vectors is None or not len(embedding):
+            return None
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0 or query.shape[0] != self._vectors.shape[1]:
+            return None
+
+        scores = self._vectors[:len(self._slot_keys)] @ (query / norm)
+        close = np.flatnonzero(scores >= 1 - self.semantic_epsilon)
+        for slot in close[np.argsort(-scores[close], kind="stable")]:
+            key = self._slot_keys[slot]
+            if key is None:
+                continue
+            entry = self._live(key)
+            if entry is not None and entry.options_key == options_key:
+                return entry
+        return None
+
+    def get(self, query: str, limit: int, options: Optional[Dict[str, Any]] = None,
+            embedding: Union[Sequence[float], Callable[[], Sequence[float]], None] = None
+            ) -> Optional[List[Dict[str, Any]]]:
+        """Cached results for the query, or None.
+
+        ``embedding`` enables the semantic tier; it may be a function, which is
+        only called when the exact tier misses.
+        """
+        entry = self._live(query_key(query, limit, options))
+        if entry is not None:
+            self.hits += 1
+            METRICS.incr("query_cache_hits")
+            return entry.results
+
+        if embedding is not None and self.semantic_epsilon is not None:
+            entry = self._nearest(embedding() if callable(embedding) else embedding, query_key("", limit, options))
+            if entry is not None:
+                self.semantic_hits += 1
+                METRICS.incr("query_cache_semantic_hits")
+                return entry.results
+
+        self.misses += 1
+        METRICS.incr("query_cache_misses")
+        return None
+
+    def put(self, query: str, limit: int, results: List[Dict[str, Any]],
+            options: Optional[Dict[str, Any]] = None, embedding: Optional[Sequence[float]] = None) -> None:
+        """Cache results for a query, evicting the least recently used entry when full."""
+        key = query_key(query, limit, options)
+        if key in self._entries:
+            self._remove(key)
+        while len(self._entries) >= self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+        slot = -1
+        if self.semantic_epsilon is not None and embedding is not None and len(embedding):
+            slot = self._store_vector(key, embedding)
+        self._entries[key] = _Entry(results, self.clock(), query_key("", limit, options), slot)
+
+    def _store_vector(self, key: str, embedding: Sequence[float]) -> int:
+        """Put a normalized query embedding in a free row of the semantic tier."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return -1
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+        elif vector.shape[0] != self._vectors.shape[1]:
+            return -1
+
+        slot = self._free.pop() if self._free else len(self._slot_keys)
+        if slot == len(self._slot_keys):
+            self._slot_keys.append(key)
+        else:
+            self._slot_keys[slot] = key
+        self._vectors[slot] = vector / norm
+        return slot
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters, including the semantic tier."""
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries)
+        }
+
+
+class CachedSearch:
+    """Search through a QueryCache, invalidating it whenever the wrapped index changes.
+
+    The exact tier is checked before the query is embedded, so a repeated
+    query costs neither an embedding lookup nor a scan.
+    """
+
+    def __init__(self, index: Any, cache: Optional[QueryCache] = None,
+                 embed: Optional[Callable[[str], Sequence[float]]] = None):
+        self.index = index
+        self.cache = cache if cache is not None else QueryCache()
+        self.embed = embed
+        self._version = getattr(index, "version", 0)
+
+    def _check_version(self) -> None:
+        version = getattr(self.index, "version", 0)
+        if version != self._version:
+            self.cache.invalidate()
+            self._version = version
+
+    def search(self, query: str, query_embedding: Optional[Sequence[float]] = None, threshold: float = 0.1,
+               limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Cached ``index.search``; without ``query_embedding`` the query is embedded only on an exact miss."""
+        self._check_version()
+        options = {"threshold": threshold, "filters": filters}
+        embedded: List[Sequence[float]] = []
+
+        def embedding() -> Sequence[float]:
+            if not embedded:
+                if query_embedding is None and self.embed is None:
+                    raise ValueError("CachedSearch needs a query embedding or an embed function")
+                embedded.append(query_embedding if query_embedding is not None else self.embed(query))
+            return embedded[0]
+
+        results = self.cache.get(query, limit, options, embedding)
+        if results is not None:
+            return results
+
+        if not len(embedding()):
+            return []
+        results = self.index.search(embedding(), threshold, limit, filters=filters)
+        self.cache.put(query, limit, results, options, embedding())
+        return results
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Semantic Search Latency Benchmark
+
+Runs a fixed query set at several corpus sizes and records cold and warm
+latency separately, either against the local vector engine (``local``) or
+against the documents API (``api``):
+
+    local - corpus from a snapshot, truncated to each size. Cold queries embed
+            through an empty embedding cache and then search; warm queries
+            repeat them, so the embedding is a cache hit. With ``--offline``
+            the queries are perturbed corpus vectors and no API is called;
+            nothing is cached then, so only warm latency (after one untimed
+            pass) is recorded.
+    api   - the documents API is seeded up to each size. Cold queries carry a
+            per-run tag so no server-side cache has seen them; warm queries
+            repeat them, so any query or embedding cache is hit. Results are
+            keyed by the requested size, so baselines stay comparable even
+            when some creates fail.
+
+Results are saved as JSON. Each run is checked against the search SLA
+(1 s, as logged by search.js) and, when ``--baseline`` is given, against a
+stored baseline: any p50/p95 that is more than ``--tolerance`` slower than
+the baseline fails the run with exit code 1. A baseline recorded with a
+different backend, sizes, limit, repeats or query set is not compared, and
+also fails the run.
+
+Usage:
+    python search_benchmark.py local --snapshot snapshots/documents --sizes 1000,10000,100000
+    python search_benchmark.py local --snapshot snapshots/documents --offline --baseline bench/baseline.json
+    python search_benchmark.py local --snapshot snapshots/synthetic-1m --offline --sizes 1000,100000,1000000
+    python search_benchmark.py api --url http://localhost:3000 --sizes 100,1000 --output bench/api.json
+    python search_benchmark.py local --snapshot snapshots/documents --save-baseline bench/baseline.json
+
+Requirements:
+    pip install numpy openai httpx
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vector_index import VectorIndex
+from corpus_snapshot import load_snapshot
+from embedding_cache import EmbeddingCache
+from embedding_pipeline import EmbeddingPipeline, DEFAULT_MODEL
+
+# Matches the warning threshold in api/src/lib/rag/search.js
+DEFAULT_SLA_MS = 1000.0
+
+# Fixed query set, so runs are comparable with each other and with the baseline
+BENCHMARK_QUERIES = [
+    "JavaScript developer with 5 years of experience in React and Node.js",
+    "Data scientist specializing in natural language processing and machine learning",
+    "UX designer focused on creating intuitive interfaces for mobile applications",
+    "DevOps engineer with expertise in AWS, Docker, and Kubernetes",
+    "Full stack developer experienced in JavaScript, Python, and SQL databases",
+    "Looking for someone with machine learning and NLP experience",
+    "Need a mobile app designer who knows Figma",
+    "Cloud infrastructure expert with AWS knowledge",
+    "Backend engineer who has built REST APIs with Express and PostgreSQL",
+    "Project using computer vision to track movement in video",
+]
+
+# Metrics compared against the baseline
+REGRESSION_METRICS = ("p50_ms", "p95_ms")
+
+# Settings that must match the baseline's for its latencies to be comparable
+BASELINE_CONFIG_KEYS = ("backend", "offline", "limit", "warm_repeats", "sizes", "queries")
+
+
+def latency_summary(latencies_ms: Sequence[float], sla_ms: float) -> Dict[str, Any]:
+    """Percentiles and SLA violations for one set of per-query latencies."""
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    if not values.size:
+        values = np.zeros(1)
+    return {
+        "queries": len(latencies_ms),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+        "sla_violations": int((values > sla_ms).sum())
+    }
+
+
+def benchmark_local(snapshot_path: str, sizes: Sequence[int], queries: Sequence[str], limit: int = 5,
+                    warm_repeats: int = 3, offline: bool = False, model: str = DEFAULT_MODEL,
+                    seed: int = 0) -> List[Tuple[int, str, List[float]]]:
+    """Time cold and warm searches against the local engine at each corpus size."""
+    # Offline runs never embed queries, so they also accept synthetic_corpus.py snapshots
+    snapshot = load_snapshot(snapshot_path, model=None if offline else model)
+    rng = np.random.default_rng(seed)
+    runs = []
+
+    for size in sizes:
+        size = min(size, len(snapshot.ids))
+        index = VectorIndex(snapshot.ids[:size], snapshot.texts[:size], snapshot.matrix[:size], normalized=True)
+
+        if offline:
+            # Nearby-but-not-identical vectors stand in for real query embeddings
+            picks = rng.choice(size, min(len(queries), size), replace=False)
+            vectors = index.matrix[picks] + rng.normal(scale=0.01, size=(picks.size, index.dimension))
+            embed = lambda i: vectors[i]
+        else:
+            # A private in-memory cache: the first pass misses, later passes hit
+            pipeline = EmbeddingPipeline(model=model, cache=EmbeddingCache(":memory:"))
+            embed = lambda i: pipeline.embed([queries[i]])[0]
+
+        count = len(queries) if not offline else vectors.shape[0]
+
+        def run_pass() -> List[float]:
+            latencies = []
+            for i in range(count):
+                started = time.perf_counter()
+                embedding = embed(i)
+                if len(embedding):
+                    index.search(embedding, limit=limit)
+                latencies.append((time.perf_counter() - started) * 1000)
+            return latencies
+
+        if offline:
+            # No embedding happens offline, so a first pass is not cold; run it untimed
+            run_pass()
+        else:
+            runs.append((size, "cold", run_pass()))
+        runs.append((size, "warm", [latency for _ in range(warm_repeats) for latency in run_pass()]))
+        print(f"ℹ local: measured {size} documents")
+    return runs
+
+
+def benchmark_api(url: str, sizes: Sequence[int], queries: Sequence[str], limit: int = 5,
+                  warm_repeats: int = 3, concurrency: int = 8, timeout: float = 30.0,
+                  keep: bool = False) -> List[Tuple[int, str, List[float]]]:
+    """Seed the documents API up to each size and time cold and warm searches."""
+    import asyncio
+    import httpx
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api", "tests"))
+    from test_api import check_api_health, test_docs, test_user_ids
+
+    async def run() -> List[Tuple[int, str, List[float]]]:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+            if not await check_api_health(client):
+                raise RuntimeError(f"API at {url} is not healthy")
+
+            created: List[Any] = []
+            slots = asyncio.Semaphore(concurrency)
+
+            async def create(n: int) -> None:
+                async with slots:
+                    response = await client.post("/api/documents", json={
+                        "text": f"{test_docs[n % len(test_docs)]} (benchmark document {n})",
+                        "userId": test_user_ids[n % len(test_user_ids)],
+                        "metadata": {"source": "benchmark"}
+                    })
+                    if response.status_code == 201:
+                        created.append(response.json().get("documentId"))
+
+            async def timed_search(query: str) -> float:
+                started = time.perf_counter()
+                response = await client.get("/api/documents/search", params={"query": query, "limit": limit})
+                response.raise_for_status()
+                return (time.perf_counter() - started) * 1000
+
+            runs = []
+            try:
+                for size in sizes:
+                    await asyncio.gather(*(create(n) for n in range(len(created), size)))
+                    tag = uuid.uuid4().hex[:8]
+                    tagged = [f"{query} [{tag}]" for query in queries]
+                    cold = [await timed_search(query) for query in tagged]
+                    warm = [await timed_search(query) for _ in range(warm_repeats) for query in tagged]
+                    runs.extend([(size, "cold", cold), (size, "warm", warm)])
+                    if len(created) < size:
+                        print(f"⚠ api: only {len(created)}/{size} documents were created")
+                    print(f"ℹ api: measured {len(created)} documents")
+            finally:
+                if not keep:
+                    await asyncio.gather(*(client.delete(f"/api/documents/{doc_id}") for doc_id in created),
+                                         return_exceptions=True)
+            return runs
+
+    return asyncio.run(run())
+
+
+def config_differences(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Describe every BASELINE_CONFIG_KEYS setting that differs between a report and its baseline."""
+    def settings(run: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(run.get("config", {}), backend=run.get("backend"))
+
+    current, previous = settings(report), settings(baseline)
+    return [f"{key} {current.get(key)!r} vs baseline {previous.get(key)!r}"
+            for key in BASELINE_CONFIG_KEYS if current.get(key) != previous.get(key)]
+
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline: Dict[str, Any],
+                        tolerance: float) -> List[str]:
+    """Return a message for every metric that is slower than the baseline by more than ``tolerance``."""
+    previous = {(r["corpus_size"], r["phase"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get((result["corpus_size"], result["phase"]))
+        if before is None:
+            continue
+        for metric in REGRESSION_METRICS:
+            if metric in result and metric in before and result[metric] > before[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{result['phase']} {metric} at {result['corpus_size']} documents: "
+                    f"{result[metric]:.2f} ms vs baseline {before[metric]:.2f} ms "
+                    f"({(result[metric] / before[metric] - 1) * 100:+.0f}%, tolerance {tolerance * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Semantic search latency SLA and regression benchmark")
+    parser.add_argument("backend", choices=("local", "api"), help="benchmark the local engine or the documents API")
+    parser.add_argument("--snapshot", help="corpus snapshot directory (local backend)")
+    parser.add_argument("--url", default="http://localhost:3000", help="API base URL (api backend)")
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated corpus sizes")
+    parser.add_argument("--limit", type=int, default=5, help="results per query")
+    parser.add_argument("--warm-repeats", type=int, default=3, help="warm passes over the query set")
+    parser.add_argument("--offline", action="store_true", help="local backend: use corpus vectors as queries, no OpenAI calls")
+    parser.add_argument("--concurrency", type=int, default=8, help="api backend: concurrent seeding requests")
+    parser.add_argument("--keep", action="store_true", help="api backend: keep seeded documents after the run")
+    parser.add_argument("--sla-ms", type=float, default=DEFAULT_SLA_MS, help="fail if any p95 exceeds this latency")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this results JSON and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", help="also write the results to this path as the new baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    started = time.time()
+    if args.backend == "local":
+        if not args.snapshot:
+            parser.error("the local backend needs --snapshot")
+        runs = benchmark_local(args.snapshot, sizes, BENCHMARK_QUERIES, args.limit, args.warm_repeats, args.offline)
+    else:
+        runs = benchmark_api(args.url, sizes, BENCHMARK_QUERIES, args.limit, args.warm_repeats,
+                             args.concurrency, keep=args.keep)
+
+    results = [
+        dict(corpus_size=size, phase=phase, **latency_summary(latencies, args.sla_ms))
+        for size, phase, latencies in runs
+    ]
+    report = {
+        "backend": args.backend,
+        "created_at": started,
+        "sla_ms": args.sla_ms,
+        "config": {"sizes": sizes, "limit": args.limit, "warm_repeats": args.warm_repeats,
+                   "offline": args.offline, "queries": len(BENCHMARK_QUERIES)},
+        "results": results
+    }
+
+    print(f"\n{'size':>8} {'phase':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'> SLA':>6}")
+    for r in results:
+        print(f"{r['corpus_size']:>8} {r['phase']:>5} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+              f"{r['p99_ms']:>9.2f} {r['max_ms']:>9.2f} {r['sla_violations']:>6}")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"ℹ Wrote results to {path}")
+
+    failures = [
+        f"{r['phase']} p95 at {r['corpus_size']} documents is {r['p95_ms']:.2f} ms, over the {args.sla_ms:.0f} ms SLA"
+        for r in results if r["p95_ms"] > args.sla_ms
+    ]
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        differences = config_differences(report, baseline)
+        if differences:
+            # Latencies from another configuration would give false regressions or passes
+            failures.append(f"baseline {args.baseline} was recorded with a different configuration "
+                            f"({'; '.join(differences)}), so it was not compared")
+        else:
+            failures.extend(compare_to_baseline(results, baseline, args.tolerance))
+
+    for failure in failures:
+        print(f"✗ {failure}")
+    if not failures:
+        print("✓ All runs within the SLA" + (" and the baseline tolerance" if args.baseline else ""))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
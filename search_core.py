@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Search Core
+
+The scoring helpers of the direct vector tools, without their clients: this
+module imports only numpy and the local index/codec modules, so tools that
+just need ``cosine_similarity``, ``parse_embedding`` or an in-memory index do
+not pay for ``supabase``, ``openai`` or any network setup.
+
+Usage:
+    from search_core import build_vector_index, search_similar_documents, cosine_similarity
+
+    index = build_vector_index(documents)
+    results = search_similar_documents(query_embedding, index, threshold=0.1, limit=5)
+
+    # Documents from a generator, scored in chunks without building an index
+    results = search_similar_documents_streaming(query_embedding, iter_documents(), limit=5)
+
+Requirements:
+    pip install numpy
+"""
+
+from typing import List, Dict, Any, Optional, Union, Iterable
+
+import numpy as np
+
+from vector_index import VectorIndex
+from embedding_codec import EmbeddingDecoder
+from streaming_search import streaming_search, iter_document_chunks
+
+
+def cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
+    """Calculate cosine similarity between two vectors."""
+    # Check for empties
+    if not vec_a or not vec_b:
+        return 0.0
+
+    # Convert to numpy for efficiency
+    a = np.array(vec_a)
+    b = np.array(vec_b)
+
+    # Handle different lengths
+    min_length = min(len(a), len(b))
+    a = a[:min_length]
+    b = b[:min_length]
+
+    # Calculate cosine similarity
+    dot_product = np.dot(a, b)
+    norm_a = np.linalg.norm(a)
+    norm_b = np.linalg.norm(b)
+
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+
+    similarity = dot_product / (norm_a * norm_b)
+
+    # Handle numerical instability
+    if similarity > 1.0:
+        similarity = 1.0
+    elif similarity < -1.0:
+        similarity = -1.0
+
+    return float(similarity)
+
+
+def parse_embedding(embedding: Any) -> Optional[List[float]]:
+    """Parse an embedding into a list of floats."""
+    vector = EmbeddingDecoder().decode(embedding)
+    return vector.tolist() if vector is not None else None
+
+
+def build_vector_index(documents: List[Dict[str, Any]]) -> VectorIndex:
+    """Decode document embeddings once and load them into an in-memory vector index.
+
+    Embeddings that cannot be decoded or have a mismatched dimension are
+    skipped; ``skipped_embeddings`` reports how many were dropped.
+    """
+    doc_ids = [doc.get('id') for doc in documents]
+    matrix, valid = EmbeddingDecoder().decode_many([doc.get('embedding') for doc in documents], doc_ids)
+
+    rows = np.flatnonzero(valid)
+    return VectorIndex([doc_ids[i] for i in rows],
+                       [documents[i].get('text', '') for i in rows],
+                       matrix[rows])
+
+
+def skipped_embeddings(documents: List[Dict[str, Any]], index: VectorIndex) -> int:
+    """Number of non-null document embeddings that did not make it into the index."""
+    return sum(1 for doc in documents if doc.get('embedding') is not None) - len(index)
+
+
+def search_similar_documents(query_embedding: List[float], documents: Union[List[Dict[str, Any]], VectorIndex], threshold: float = 0.1, limit: int = 5) -> List[Dict[str, Any]]:
+    """Search for similar documents using cosine similarity."""
+    index = documents if isinstance(documents, VectorIndex) else build_vector_index(documents)
+    return index.search(query_embedding, threshold, limit)
+
+
+def search_similar_documents_batch(query_embeddings: List[List[float]], documents: Union[List[Dict[str, Any]], VectorIndex], threshold: float = 0.1, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+    """Search for similar documents for many queries with a single batched matrix product."""
+    index = documents if isinstance(documents, VectorIndex) else build_vector_index(documents)
+    return index.search_batch(query_embeddings, threshold, limit, filters=filters)
+
+
+def search_similar_documents_streaming(query_embedding: List[float], documents: Iterable[Dict[str, Any]],
+                                       threshold: float = 0.1, limit: int = 5,
+                                       chunk_size: int = 1000) -> List[Dict[str, Any]]:
+    """Search documents read from any iterable in fixed-size chunks, keeping only a running top-k."""
+    if not len(query_embedding):
+        return []
+    return streaming_search(iter_document_chunks(documents, chunk_size), [query_embedding], threshold, limit)[0]
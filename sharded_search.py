@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Multi-process Sharded Search
+
+Splits the corpus matrix into row shards and scores them on a process pool,
+so the Python work around each matrix product (argpartition, sorting) runs on
+every core instead of one. Workers attach to the matrix without copying it:
+a memory-mapped snapshot matrix is re-opened from its file, anything else is
+copied once into a ``multiprocessing.shared_memory`` block. Each worker
+returns a local top-k per query and the parent merges the sorted shard lists
+with a heap.
+
+``benchmark_sharded`` times the sharded engine against the single-process
+``VectorIndex.batch_top_k`` for several worker counts and checks that the
+results agree.
+
+Usage:
+    from sharded_search import ShardedSearch, benchmark_sharded
+
+    with ShardedSearch(index, workers=8, shard_size=250000) as sharded:
+        results = sharded.search_batch(query_embeddings, threshold=0.1, limit=5)
+    report = benchmark_sharded(index, query_embeddings, k=10, workers=[1, 2, 4, 8])
+
+Requirements:
+    pip install numpy
+"""
+
+import heapq
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vector_index import VectorIndex, format_result
+
+# Matrix attached by each worker process (see _attach_matrix)
+_worker_matrix: Optional[np.ndarray] = None
+_worker_memory: Optional[shared_memory.SharedMemory] = None
+
+
+def _attach_matrix(source: Dict[str, Any]) -> None:
+    """Pool initializer: map the corpus matrix into this worker without copying it."""
+    global _worker_matrix, _worker_memory
+    shape, dtype = tuple(source["shape"]), np.dtype(source["dtype"])
+    if source["kind"] == "mmap":
+        _worker_matrix = np.memmap(source["filename"], dtype=dtype, mode="r",
+                                   offset=source["offset"], shape=shape)
+    else:
+        _worker_memory = shared_memory.SharedMemory(name=source["name"])
+        _worker_matrix = np.ndarray(shape, dtype=dtype, buffer=_worker_memory.buf)
+
+
+def _shard_top_k(start: int, stop: int, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Score one shard and return its (global indices, scores) top k per query, best first."""
+    scores = queries @ _worker_matrix[start:stop].T
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        local = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, local, axis=1)
+    else:
+        local = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(local, order, axis=1) + start, np.take_along_axis(scores, order, axis=1)
+
+
+def heap_merge(shard_results: Sequence[Tuple[np.ndarray, np.ndarray]], query: int,
+               k: int) -> List[Tuple[int, float]]:
+    """Merge one query's sorted per-shard lists into the global top k with a heap."""
+    streams = [zip(indices[query].tolist(), scores[query].tolist()) for indices, scores in shard_results]
+    merged = heapq.merge(*streams, key=lambda item: -item[1])
+    return list(itertools.islice(merged, k))
+
+
+class ShardedSearch:
+    """Exact cosine similarity search over row shards scored in a process pool."""
+
+    def __init__(self, index: VectorIndex, workers: Optional[int] = None, shard_size: Optional[int] = None):
+        self.index = index
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        # Default to a couple of shards per worker so a slow shard does not hold up the merge
+        self.shard_size = max(1, shard_size or -(-len(index) // (self.workers * 2)))
+        self.shards = [(start, min(start + self.shard_size, len(index)))
+                       for start in range(0, len(index), self.shard_size)]
+
+        self._memory: Optional[shared_memory.SharedMemory] = None
+        matrix = index.matrix
+        if isinstance(matrix, np.memmap) and matrix.filename and matrix.flags.c_contiguous:
+            source = {"kind": "mmap", "filename": matrix.filename, "offset": matrix.offset}
+        else:
+            # One copy into shared memory; every worker then maps the same pages
+            self._memory = shared_memory.SharedMemory(create=True, size=max(1, matrix.nbytes))
+            np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=self._memory.buf)[:] = matrix
+            source = {"kind": "shm", "name": self._memory.name}
+        source.update(shape=matrix.shape, dtype=matrix.dtype.str)
+
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_attach_matrix,
+                                         initargs=(source,))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __enter__(self) -> "ShardedSearch":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker pool and release the shared-memory block."""
+        self._pool.shutdown()
+        if self._memory is not None:
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+    def batch_top_k(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        """Return the top k (row, score) pairs per normalized query, best first."""
+        if k <= 0 or not self.shards:
+            return [[] for _ in range(queries.shape[0])]
+
+        futures = [self._pool.submit(_shard_top_k, start, stop, queries, k) for start, stop in self.shards]
+        shard_results = [future.result() for future in futures]
+        return [heap_merge(shard_results, q, k) for q in range(queries.shape[0])]
+
+    def search_batch(self, query_embeddings: Sequence[Sequence[float]], threshold: float = 0.1,
+                     limit: int = 5) -> List[List[Dict[str, Any]]]:
+        """Search for many queries across all shards, in the VectorIndex result shape."""
+        if not len(query_embeddings):
+            return []
+
+        queries = self.index.prepare_queries(query_embeddings)
+        return [
+            [
+                format_result(self.index.ids[row], self.index.texts[row],
+                              float(np.clip(score, -1.0, 1.0)), threshold)
+                for row, score in matches
+            ]
+            for matches in self.batch_top_k(queries, limit)
+        ]
+
+    def search(self, query_embedding: Sequence[float], threshold: float = 0.1,
+               limit: int = 5) -> List[Dict[str, Any]]:
+        """Search for one query across all shards."""
+        if not len(self) or not len(query_embedding):
+            return []
+        return self.search_batch([query_embedding], threshold, limit)[0]
+
+
+def benchmark_sharded(index: VectorIndex, query_embeddings: Sequence[Sequence[float]], k: int = 10,
+                      workers: Sequence[int] = (1, 2, 4), shard_size: Optional[int] = None,
+                      repeats: int = 3) -> List[Dict[str, Any]]:
+    """Time sharded search for several worker counts against the single-process engine."""
+    queries = index.prepare_queries(query_embeddings)
+
+    def best_of(run) -> float:
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return min(timings) * 1000
+
+    exact_indices, _ = index.batch_top_k(queries, k)
+    single_ms = best_of(lambda: index.batch_top_k(queries, k))
+
+    report = [{
+        "mode": "single-process",
+        "workers": 1,
+        "shards": 1,
+        "latency_ms": single_ms,
+        "speedup": 1.0,
+        "agreement": 1.0
+    }]
+    for count in workers:
+        with ShardedSearch(index, workers=count, shard_size=shard_size) as sharded:
+            found = sharded.batch_top_k(queries, k)  # also warms up the pool
+            elapsed_ms = best_of(lambda: sharded.batch_top_k(queries, k))
+
+            expected_total = exact_indices.size
+            hits = sum(len(set(expected.tolist()) & {row for row, _ in matches})
+                       for expected, matches in zip(exact_indices, found))
+            report.append({
+                "mode": "sharded",
+                "workers": count,
+                "shards": len(sharded.shards),
+                "latency_ms": elapsed_ms,
+                "speedup": single_ms / elapsed_ms if elapsed_ms else float("inf"),
+                "agreement": hits / expected_total if expected_total else 1.0
+            })
+    return report
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Streaming Exact Top-k Search
+
+Exact cosine top-k over corpora that are never held in memory as a whole.
+The corpus arrives as an iterable of ``(ids, texts, matrix)`` chunks, from a
+Supabase page loop, a snapshot, a list of document dicts or any generator.
+Each chunk is scored against all queries with one matrix product, cut to its
+own top k with ``argpartition`` and merged into the running top k per query.
+Ids and texts are only kept for rows that are still in the running top k,
+and result dicts are built only for the final k, so memory stays at one
+chunk of vectors plus ``queries x k`` candidates whatever the corpus size.
+
+Usage:
+    from streaming_search import streaming_search, iter_supabase_chunks, iter_snapshot_chunks
+
+    results = streaming_search(iter_supabase_chunks(supabase), query_embeddings, threshold=0.1, limit=5)
+    results = streaming_search(iter_snapshot_chunks("snapshots/documents"), query_embeddings)
+    results = streaming_search(iter_document_chunks(document_generator()), query_embeddings)
+
+    python streaming_search.py --synthetic 5000000 --dimension 384 --chunk-size 65536
+    python streaming_search.py --snapshot snapshots/documents --verify
+
+Requirements:
+    pip install numpy
+"""
+
+import argparse
+import itertools
+import time
+from typing import List, Dict, Any, Optional, Sequence, Iterable, Iterator, Tuple
+
+import numpy as np
+
+from vector_index import VectorIndex, normalize_rows, merge_top_k, format_result
+from embedding_codec import EmbeddingDecoder
+from instrumentation import METRICS
+
+DEFAULT_CHUNK_SIZE = 65536
+
+# One chunk of corpus rows: ids, texts (or None) and a (rows x dimension) matrix;
+# ids and texts only need to support indexing by position within the chunk
+Chunk = Tuple[Sequence[Any], Optional[Sequence[str]], np.ndarray]
+
+
+class _Window:
+    """Read-only view of ``sequence[start:]``, so a chunk of a lazy text blob is not decoded up front."""
+
+    __slots__ = ("sequence", "start")
+
+    def __init__(self, sequence: Sequence[Any], start: int):
+        self.sequence = sequence
+        self.start = start
+
+    def __getitem__(self, i: int) -> Any:
+        return self.sequence[self.start + i]
+
+
+def iter_array_chunks(ids: Sequence[Any], texts: Optional[Sequence[str]], matrix: np.ndarray,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Chunk]:
+    """Split an in-memory or memory-mapped corpus into chunks (slices of a memmap stay lazy)."""
+    for start in range(0, matrix.shape[0], chunk_size):
+        yield (_Window(ids, start), _Window(texts, start) if texts is not None else None,
+               matrix[start:start + chunk_size])
+
+
+def iter_snapshot_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, model: Optional[str] = None) -> Iterator[Chunk]:
+    """Stream a corpus snapshot chunk by chunk from its memory-mapped files."""
+    from corpus_snapshot import load_snapshot
+    snapshot = load_snapshot(path, model=model)
+    yield from iter_array_chunks(snapshot.ids, snapshot.texts, snapshot.matrix, chunk_size)
+
+
+def _decode_page(rows: List[Dict[str, Any]], decoder: EmbeddingDecoder) -> Optional[Chunk]:
+    """Decode one page of document dicts, keeping the rows the decoder accepts.
+
+    The decoder fixes the corpus dimension on its first page and rejects rows
+    of any other dimension one by one.
+    """
+    page_ids = [row.get('id') for row in rows]
+    vectors, valid = decoder.decode_many([row.get('embedding') for row in rows], page_ids)
+    if not valid.any():
+        return None
+
+    kept = np.flatnonzero(valid)
+    return [page_ids[i] for i in kept], [rows[i].get('text') or '' for i in kept], vectors[kept]
+
+
+def iter_document_chunks(documents: Iterable[Dict[str, Any]], chunk_size: int = 1000,
+                         decoder: Optional[EmbeddingDecoder] = None) -> Iterator[Chunk]:
+    """Group document dicts (e.g. from a generator) into decoded chunks."""
+    decoder = decoder or EmbeddingDecoder()
+    documents = iter(documents)
+    while True:
+        rows = list(itertools.islice(documents, chunk_size))
+        if not rows:
+            return
+        chunk = _decode_page(rows, decoder)
+        if chunk is not None:
+            yield chunk
+
+
+def iter_supabase_chunks(client: Any, page_size: int = 1000,
+                         decoder: Optional[EmbeddingDecoder] = None) -> Iterator[Chunk]:
+    """Stream the documents table page by page as decoded chunks."""
+    from corpus_loader import iter_document_pages
+    decoder = decoder or EmbeddingDecoder()
+    for rows in iter_document_pages(client, page_size):
+        chunk = _decode_page(rows, decoder)
+        if chunk is not None:
+            yield chunk
+
+
+def stream_top_k(chunks: Iterable[Chunk], queries: np.ndarray, k: int,
+                 normalized: bool = False) -> Tuple[List[List[Any]], List[List[str]], np.ndarray]:
+    """Exact top k per normalized query over streamed chunks: (ids, texts, scores), best first.
+
+    Chunk matrices are normalized on the fly unless ``normalized`` is True.
+    """
+    best_rows = np.empty((queries.shape[0], 0), dtype=np.int64)
+    best_scores = np.empty((queries.shape[0], 0), dtype=np.float32)
+    kept: Dict[int, Tuple[Any, str]] = {}
+    offset = 0
+
+    for ids, texts, matrix in chunks:
+        rows = matrix.shape[0]
+        if not rows or k <= 0:
+            offset += rows
+            continue
+        if matrix.shape[1] != queries.shape[1]:
+            raise ValueError(f"Chunk dimension {matrix.shape[1]} does not match query dimension {queries.shape[1]}")
+        if not normalized:
+            matrix = normalize_rows(np.array(matrix, dtype=np.float32))
+
+        with METRICS.span("score"):
+            scores = queries @ matrix.T
+        METRICS.incr("documents_scanned", rows)
+
+        with METRICS.span("sort"):
+            if rows > k:
+                local = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, local, axis=1)
+            else:
+                local = np.broadcast_to(np.arange(rows), scores.shape)
+            best_rows, best_scores = merge_top_k(best_rows, best_scores, local + offset, scores, k)
+
+        # Remember ids and texts only for rows that survived the merge
+        survivors = np.unique(best_rows)
+        for row in survivors[survivors >= offset].tolist():
+            kept[row] = (ids[row - offset], texts[row - offset] if texts is not None else '')
+        kept = {row: kept[row] for row in survivors.tolist()}
+        offset += rows
+
+    with METRICS.span("sort"):
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        best_scores = np.clip(np.take_along_axis(best_scores, order, axis=1), -1.0, 1.0)
+    return ([[kept[row][0] for row in ranked] for ranked in best_rows.tolist()],
+            [[kept[row][1] for row in ranked] for ranked in best_rows.tolist()],
+            best_scores)
+
+
+def streaming_search(chunks: Iterable[Chunk], query_embeddings: Sequence[Sequence[float]],
+                     threshold: float = 0.1, limit: int = 5, normalized: bool = False) -> List[List[Dict[str, Any]]]:
+    """Search streamed chunks for many queries in one pass, in the VectorIndex result shape."""
+    if not len(query_embeddings):
+        return []
+    queries = normalize_rows(np.array(query_embeddings, dtype=np.float32, ndmin=2))
+    ids, texts, scores = stream_top_k(chunks, queries, limit, normalized)
+    return [
+        [format_result(doc_id, text, float(score), threshold)
+         for doc_id, text, score in zip(row_ids, row_texts, row_scores)]
+        for row_ids, row_texts, row_scores in zip(ids, texts, scores)
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Exact top-k search over a streamed corpus with bounded memory")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--snapshot", help="stream this corpus snapshot")
+    source.add_argument("--synthetic", type=int, help="stream a generated synthetic corpus of this many rows")
+    parser.add_argument("--dimension", type=int, default=384, help="synthetic embedding dimension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows scored per snapshot chunk (synthetic corpora stream in generation blocks)")
+    parser.add_argument("--queries", type=int, default=10, help="number of queries")
+    parser.add_argument("--k", type=int, default=10, help="results per query")
+    parser.add_argument("--verify", action="store_true", help="check the results against an in-memory VectorIndex")
+    args = parser.parse_args(argv)
+
+    import tracemalloc
+    rng = np.random.default_rng(0)
+
+    if args.synthetic:
+        from synthetic_corpus import SyntheticCorpus, BLOCK_SIZE
+        synthetic = SyntheticCorpus(args.synthetic, dimension=args.dimension)
+        queries, _ = synthetic.queries(args.queries)
+
+        class BlockTexts:
+            """Texts of one block, generated only for the rows stream_top_k keeps."""
+            def __init__(self, start: int, labels: np.ndarray):
+                self.start, self.labels = start, labels
+
+            def __getitem__(self, i: int) -> str:
+                return synthetic.text(self.start + i, int(self.labels[i]))
+
+        def chunks() -> Iterator[Chunk]:
+            # Blocks are generated on demand, so the corpus never exists in memory
+            for start, labels, matrix in synthetic.iter_blocks():
+                yield range(start, start + matrix.shape[0]), BlockTexts(start, labels), matrix
+        size = args.synthetic
+        print(f"ℹ Streaming {size} x {args.dimension} synthetic rows in blocks of {BLOCK_SIZE}")
+    else:
+        from corpus_snapshot import load_snapshot
+        snapshot = load_snapshot(args.snapshot)
+        queries = normalize_rows(snapshot.matrix[rng.choice(len(snapshot.ids), args.queries)] +
+                                 rng.normal(scale=0.01, size=(args.queries, snapshot.matrix.shape[1])).astype(np.float32))
+        chunks = lambda: iter_array_chunks(snapshot.ids, snapshot.texts, snapshot.matrix, args.chunk_size)
+        size = len(snapshot.ids)
+        print(f"ℹ Streaming {size} snapshot rows in chunks of {args.chunk_size}")
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    ids, _, scores = stream_top_k(chunks(), queries, args.k, normalized=True)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"✓ Top-{args.k} for {len(queries)} queries in {elapsed:.2f}s "
+          f"({size / elapsed / 1e6:.2f}M rows/s), peak traced memory {peak / 1024 / 1024:.1f} MB")
+
+    if args.verify:
+        if args.synthetic:
+            corpus = synthetic.to_corpus(with_metadata=False)
+            index = VectorIndex(corpus.ids, corpus.texts, corpus.matrix, normalized=True)
+        else:
+            index = VectorIndex(snapshot.ids, snapshot.texts, snapshot.matrix, normalized=True)
+        expected_rows, _ = index.batch_top_k(queries, args.k)
+        matches = sum(found == [index.ids[row] for row in rows] for found, rows in zip(ids, expected_rows.tolist()))
+        print(f"{'✓' if matches == len(queries) else '✗'} {matches}/{len(queries)} queries match the in-memory index")
+
+
+if __name__ == "__main__":
+    main()
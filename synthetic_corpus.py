@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Synthetic Embedding Corpus
+
+Deterministic, clustered, unit-length embeddings with matching fake texts and
+metadata, for benchmarking and recall-testing the search engines with no
+Supabase or OpenAI access. Each document is a cluster centroid plus Gaussian
+noise. Cluster sizes are uneven, as they are in real corpora, and every
+cluster has its own topic, which its texts and metadata follow.
+
+Rows are generated in fixed-size blocks, and each block is seeded by its
+position, so row ``i`` is the same for a given seed however the corpus is
+produced. ``write_snapshot`` streams blocks straight into a corpus snapshot,
+so corpora far larger than memory (10M x 384 is ~15 GB) can be built and then
+memory-mapped.
+
+Queries are noisy copies of chosen documents, so each query's source row is
+its known nearest neighbour. ``ground_truth`` computes the exact top-k for
+recall measurements.
+
+Usage:
+    from synthetic_corpus import SyntheticCorpus, ground_truth
+
+    synthetic = SyntheticCorpus(100000, dimension=384, seed=0)
+    corpus = synthetic.to_corpus()
+    index = VectorIndex(corpus.ids, corpus.texts, corpus.matrix, normalized=True, metadata=corpus.metadata)
+    queries, source_rows = synthetic.queries(100)
+    expected = ground_truth(index, queries, k=10)
+
+    python synthetic_corpus.py snapshots/synthetic-1m --size 1000000 --dimension 384
+    python synthetic_corpus.py snapshots/synthetic-100k --size 100000 --report
+
+Requirements:
+    pip install numpy
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+import numpy as np
+
+from vector_index import VectorIndex, normalize_rows
+from corpus_loader import Corpus
+from corpus_snapshot import (write_header, EMBEDDINGS_FILE, IDS_FILE, OFFSETS_FILE, TEXTS_FILE,
+                             METADATA_FILE, HEADER_FILE)
+
+SYNTHETIC_MODEL = "synthetic"
+
+# Rows per generation block; part of the corpus definition, so changing it changes every corpus
+BLOCK_SIZE = 16384
+
+QUERIES_FILE = "queries.npy"
+QUERY_SOURCES_FILE = "query_sources.npy"
+GROUND_TRUTH_FILE = "ground_truth.npy"
+
+ROLES = ["Full stack developer", "Frontend engineer", "Backend engineer", "Data scientist", "ML engineer",
+         "DevOps engineer", "Mobile developer", "UX designer", "Product engineer", "Platform engineer"]
+TECHS = ["JavaScript", "TypeScript", "React", "Node.js", "Python", "Django", "FastAPI", "PostgreSQL", "Supabase",
+         "Docker", "Kubernetes", "AWS", "Go", "Rust", "Swift", "Kotlin", "TensorFlow", "PyTorch", "OpenAI",
+         "Pinecone", "Next.js", "Vue", "GraphQL", "Redis", "Figma"]
+KEYWORDS = ["web", "mobile", "ai", "search", "analytics", "realtime", "portfolio", "chatbot", "vision", "audio",
+            "education", "health", "finance", "devtools", "automation", "games", "social", "maps", "security", "data"]
+TEMPLATES = [
+    "{role} with experience in {tech0}, {tech1} and {tech2}, focused on {keyword} products.",
+    "Built a {keyword} project using {tech0} and {tech1}; deployed with {tech2}.",
+    "{role} who enjoys {keyword} problems and works mostly in {tech1}.",
+    "Project: {keyword} platform written in {tech0}, with a {tech2} backend and {tech1} tooling.",
+]
+
+
+class SyntheticCorpus:
+    """A deterministic clustered embedding corpus of ``size`` rows."""
+
+    def __init__(self, size: int, dimension: int = 384, n_clusters: Optional[int] = None,
+                 spread: float = 0.6, n_profiles: Optional[int] = None, seed: int = 0):
+        self.size = size
+        self.dimension = dimension
+        self.n_clusters = max(1, n_clusters or min(4096, int(math.sqrt(max(size, 1)))))
+        self.spread = spread
+        self.n_profiles = max(1, n_profiles or self.size // 20)
+        self.seed = seed
+
+        rng = np.random.default_rng([seed, 0])
+        self.centroids = normalize_rows(rng.standard_normal((self.n_clusters, dimension), dtype=np.float32))
+        # Uneven cluster sizes: a few large topics and a long tail
+        self.weights = rng.dirichlet(np.full(self.n_clusters, 0.5))
+        self.topics = [
+            {
+                "role": ROLES[rng.integers(len(ROLES))],
+                "techs": [TECHS[t] for t in rng.choice(len(TECHS), 3, replace=False)],
+                "keyword": KEYWORDS[rng.integers(len(KEYWORDS))]
+            }
+            for _ in range(self.n_clusters)
+        ]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def block(self, number: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (cluster labels, unit-length embeddings) for one generation block."""
+        start = number * BLOCK_SIZE
+        rows = max(0, min(BLOCK_SIZE, self.size - start))
+        rng = np.random.default_rng([self.seed, 1, number])
+        labels = rng.choice(self.n_clusters, rows, p=self.weights)
+        # Per-coordinate noise of spread / sqrt(d) gives a noise vector of norm ~spread
+        noise = rng.standard_normal((rows, self.dimension), dtype=np.float32)
+        noise *= self.spread / math.sqrt(self.dimension)
+        return labels, normalize_rows(self.centroids[labels] + noise)
+
+    def iter_blocks(self) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        """Yield (start row, labels, embeddings) for every block in order."""
+        for number in range(-(-self.size // BLOCK_SIZE)):
+            labels, matrix = self.block(number)
+            yield number * BLOCK_SIZE, labels, matrix
+
+    def rows(self, rows: np.ndarray) -> np.ndarray:
+        """Regenerate the embeddings of specific rows, one block at a time."""
+        rows = np.asarray(rows, dtype=np.int64)
+        out = np.empty((rows.shape[0], self.dimension), dtype=np.float32)
+        for number in np.unique(rows // BLOCK_SIZE):
+            mask = rows // BLOCK_SIZE == number
+            out[mask] = self.block(int(number))[1][rows[mask] - number * BLOCK_SIZE]
+        return out
+
+    def text(self, row: int, label: int) -> str:
+        """Fake document text following the row's cluster topic."""
+        topic = self.topics[label]
+        techs = topic["techs"]
+        body = TEMPLATES[row % len(TEMPLATES)].format(
+            role=topic["role"], keyword=topic["keyword"], tech0=techs[0], tech1=techs[1], tech2=techs[2]
+        )
+        return f"{body} (synthetic document {row})"
+
+    def metadata(self, row: int, label: int) -> Dict[str, Any]:
+        """Filterable metadata in the ``document_metadata`` shape."""
+        topic = self.topics[label]
+        return {
+            "profile_id": f"profile-{row % self.n_profiles}",
+            "content_type": "project" if row % 3 else "profile",
+            "techs": topic["techs"],
+            "keywords": [topic["keyword"]]
+        }
+
+    def to_corpus(self, with_metadata: bool = True) -> Corpus:
+        """Materialize the whole corpus in memory."""
+        matrix = np.empty((self.size, self.dimension), dtype=np.float32)
+        texts: List[str] = []
+        metadata: Optional[List[Dict[str, Any]]] = [] if with_metadata else None
+        for start, labels, block in self.iter_blocks():
+            matrix[start:start + block.shape[0]] = block
+            for offset, label in enumerate(labels.tolist()):
+                texts.append(self.text(start + offset, label))
+                if metadata is not None:
+                    metadata.append(self.metadata(start + offset, label))
+        return Corpus(list(range(self.size)), texts, matrix, metadata)
+
+    def queries(self, n_queries: int, noise: float = 0.1, seed: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (queries, source rows): noisy copies of random documents and the rows they came from.
+
+        With ``noise`` well below the cluster spread, each query's source row
+        is its nearest neighbour.
+        """
+        rng = np.random.default_rng([self.seed, 2, seed])
+        sources = np.sort(rng.choice(self.size, min(n_queries, self.size), replace=False))
+        perturbation = rng.standard_normal((sources.shape[0], self.dimension), dtype=np.float32)
+        perturbation *= noise / math.sqrt(self.dimension)
+        return normalize_rows(self.rows(sources) + perturbation), sources
+
+    def write_snapshot(self, path: str, with_metadata: Optional[bool] = None) -> Dict[str, Any]:
+        """Stream the corpus into a snapshot directory without holding it in memory.
+
+        Per-row metadata is written as JSON, which only suits moderate sizes,
+        so by default it is included up to one million rows.
+        """
+        with_metadata = self.size <= 1_000_000 if with_metadata is None else with_metadata
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, HEADER_FILE)):
+            os.remove(os.path.join(path, HEADER_FILE))
+
+        embeddings = np.lib.format.open_memmap(os.path.join(path, EMBEDDINGS_FILE), mode="w+",
+                                               dtype=np.float32, shape=(self.size, self.dimension))
+        offsets = np.zeros(self.size + 1, dtype=np.int64)
+        metadata_path = os.path.join(path, METADATA_FILE)
+        metadata_file = open(metadata_path, "w") if with_metadata else None
+        if metadata_file is not None:
+            metadata_file.write("[")
+
+        with open(os.path.join(path, TEXTS_FILE), "wb") as texts:
+            for start, labels, block in self.iter_blocks():
+                embeddings[start:start + block.shape[0]] = block
+                encoded = [self.text(start + i, label).encode("utf-8") for i, label in enumerate(labels.tolist())]
+                texts.write(b"".join(encoded))
+                offsets[start + 1:start + 1 + len(encoded)] = offsets[start] + np.cumsum([len(e) for e in encoded])
+                if metadata_file is not None:
+                    for i, label in enumerate(labels.tolist()):
+                        separator = "," if start + i else ""
+                        metadata_file.write(separator + json.dumps(self.metadata(start + i, label), separators=(",", ":")))
+
+        embeddings.flush()
+        del embeddings
+        np.save(os.path.join(path, IDS_FILE), np.arange(self.size, dtype=np.int64))
+        np.save(os.path.join(path, OFFSETS_FILE), offsets)
+        if metadata_file is not None:
+            metadata_file.write("]")
+            metadata_file.close()
+        elif os.path.exists(metadata_path):
+            os.remove(metadata_path)
+
+        return write_header(path, SYNTHETIC_MODEL, self.dimension, self.size, "int64", with_metadata, {
+            "synthetic": {"size": self.size, "dimension": self.dimension, "n_clusters": self.n_clusters,
+                          "spread": self.spread, "n_profiles": self.n_profiles, "seed": self.seed}
+        })
+
+
+def ground_truth(index: VectorIndex, queries: np.ndarray, k: int = 10, chunk_size: int = 65536) -> np.ndarray:
+    """Exact top-k rows for each normalized query (the reference for recall measurements)."""
+    indices, _ = index.batch_top_k(queries, k, chunk_size)
+    return indices
+
+
+def report_recall(index: VectorIndex, queries: np.ndarray, sources: np.ndarray, k: int = 10) -> None:
+    """Print exact-search latency and known-neighbour hit rate, then recall for every index mode."""
+    from ann_index import IVFIndex
+    from quantized_index import compare_quantization
+    from truncated_search import measure_truncation_tradeoff
+
+    started = time.perf_counter()
+    exact = ground_truth(index, queries, k)
+    exact_ms = (time.perf_counter() - started) * 1000 / max(len(queries), 1)
+    top1 = float(np.mean(exact[:, 0] == sources)) if len(queries) else 0.0
+    print(f"exact: {exact_ms:.3f} ms/query (batched), source row ranked first for {top1 * 100:.1f}% of queries")
+
+    ann = IVFIndex(index)
+    for row in ann.measure_recall(queries, k=k, n_probes=(1, 4, 16)):
+        print(f"ivf    n_probe={row['n_probe']:<3} recall@{k}={row['recall']:.3f} "
+              f"{row['latency_ms']:.3f} ms/query, scanned {row['scanned_fraction'] * 100:.1f}%")
+    for row in compare_quantization(index, queries, k=k):
+        print(f"quant  {row['mode']:<8} overlap@{k}={row['overlap']:.3f} {row['compression']:.1f}x smaller")
+    for row in measure_truncation_tradeoff(index, queries, k=k, dimensions=(index.dimension // 4, index.dimension // 2)):
+        print(f"trunc  {row['dimensions']} dims x{row['candidate_multiplier']:<3} recall@{k}={row['recall']:.3f} "
+              f"{row['latency_ms']:.3f} ms/query")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic embedding corpus snapshot")
+    parser.add_argument("path", help="snapshot directory to write")
+    parser.add_argument("--size", type=int, default=100000, help="number of documents")
+    parser.add_argument("--dimension", type=int, default=384, help="embedding dimension")
+    parser.add_argument("--clusters", type=int, default=0, help="number of clusters (default sqrt(size), at most 4096)")
+    parser.add_argument("--spread", type=float, default=0.6, help="noise norm around each centroid")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--queries", type=int, default=100, help="queries to save with exact ground truth")
+    parser.add_argument("--query-noise", type=float, default=0.1, help="noise norm added to each query's source row")
+    parser.add_argument("--k", type=int, default=10, help="ground-truth neighbours per query")
+    parser.add_argument("--no-metadata", action="store_true", help="skip per-row metadata")
+    parser.add_argument("--report", action="store_true", help="recall-test every index mode on the result")
+    args = parser.parse_args(argv)
+
+    synthetic = SyntheticCorpus(args.size, args.dimension, args.clusters or None, args.spread, seed=args.seed)
+    started = time.perf_counter()
+    synthetic.write_snapshot(args.path, False if args.no_metadata else None)
+    print(f"Wrote {args.size} x {args.dimension} synthetic corpus ({synthetic.n_clusters} clusters) "
+          f"to {args.path} in {time.perf_counter() - started:.1f}s")
+
+    from corpus_snapshot import load_snapshot
+    snapshot = load_snapshot(args.path)
+    index = VectorIndex(snapshot.ids, snapshot.texts, snapshot.matrix, normalized=True)
+    queries, sources = synthetic.queries(args.queries, args.query_noise)
+    np.save(os.path.join(args.path, QUERIES_FILE), queries)
+    np.save(os.path.join(args.path, QUERY_SOURCES_FILE), sources)
+    np.save(os.path.join(args.path, GROUND_TRUTH_FILE), ground_truth(index, queries, args.k))
+    print(f"Saved {len(queries)} queries with exact top-{args.k} ground truth")
+
+    if args.report:
+        report_recall(index, queries, sources, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Shared fixtures for the vector search module tests."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The modules under test live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_index import VectorIndex  # noqa: E402
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+@pytest.fixture
+def corpus(rng):
+    """300 random 16-dimensional documents with filterable metadata."""
+    matrix = rng.standard_normal((300, 16)).astype(np.float32)
+    ids = list(range(1000, 1300))
+    texts = [f"document {i}" for i in ids]
+    metadata = [
+        {"profile_id": f"p{i % 7}", "content_type": "project" if i % 2 else "profile",
+         "techs": ["React"] if i % 3 == 0 else ["Python", "Docker"], "keywords": []}
+        for i in range(300)
+    ]
+    return ids, texts, matrix, metadata
+
+
+@pytest.fixture
+def index(corpus):
+    ids, texts, matrix, metadata = corpus
+    return VectorIndex(ids, texts, matrix, metadata=metadata)
+
+
+def brute_force_top_k(matrix, query, k, rows=None):
+    """Reference top k by full sort of cosine similarities."""
+    normalized = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    candidates = np.arange(len(matrix)) if rows is None else np.asarray(rows)
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return order[:k].tolist(), scores
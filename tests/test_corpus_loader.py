@@ -0,0 +1,143 @@
+"""Keyset paging in corpus_loader against an in-memory stand-in for the Supabase client."""
+
+import re
+
+import numpy as np
+
+from corpus_loader import iter_document_pages, iter_changed_pages, load_corpus
+
+# The keyset filter iter_changed_pages builds for a (timestamp, id) cursor
+KEYSET_FILTER = re.compile(r'(\w+)\.gt\."([^"]*)",and\(\1\.eq\."\2",id\.gt\.(\d+)\)')
+
+
+class FakeQuery:
+    def __init__(self, table):
+        self.table = table
+        self.columns = ()
+        self.orders = []
+        self.filters = []
+        self.page_size = None
+
+    def select(self, *columns, **kwargs):
+        self.columns = columns
+        return self
+
+    def order(self, column):
+        self.orders.append(column)
+        return self
+
+    def limit(self, page_size):
+        self.page_size = page_size
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row[column] > value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row[column] >= value)
+        return self
+
+    def or_(self, expression):
+        column, value, last_id = KEYSET_FILTER.fullmatch(expression).groups()
+        self.filters.append(lambda row: (row[column], row['id']) > (value, int(last_id)))
+        return self
+
+    def execute(self):
+        self.table.requests += 1
+        rows = [row for row in self.table.rows if all(f(row) for f in self.filters)]
+        rows.sort(key=lambda row: tuple(row[column] for column in self.orders))
+        rows = [{column: row.get(column) for column in self.columns} for row in rows[:self.page_size]]
+        if self.table.on_execute:
+            self.table.on_execute(self.table)
+        return type("Response", (), {"data": rows, "count": len(self.table.rows)})()
+
+
+class FakeClient:
+    def __init__(self, rows, on_execute=None):
+        self.rows = rows
+        self.requests = 0
+        self.on_execute = on_execute
+
+    def table(self, name):
+        assert name == 'documents'
+        return FakeQuery(self)
+
+
+def make_rows(count, dimension=4, timestamp=lambda i: f"2024-01-01T00:00:{i // 3:02d}.000+00:00"):
+    return [{
+        "id": i,
+        "text": f"doc {i}",
+        "embedding": "[" + ",".join(str(float(i + j)) for j in range(dimension)) + "]",
+        "updated_at": timestamp(i),
+        "person_id": f"p{i % 2}",
+        "metadata": {"content_type": "project"}
+    } for i in range(1, count + 1)]
+
+
+def ids(pages):
+    return [row["id"] for page in pages for row in page]
+
+
+def test_document_pages_walk_every_row_once():
+    client = FakeClient(make_rows(25))
+    pages = list(iter_document_pages(client, page_size=10))
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert ids(pages) == list(range(1, 26))
+    assert set(pages[0][0]) == {"id", "text", "embedding"}
+
+
+def test_document_pages_resume_after_id():
+    client = FakeClient(make_rows(25))
+    assert ids(iter_document_pages(client, page_size=10, start_after=20)) == [21, 22, 23, 24, 25]
+
+
+def test_changed_pages_keep_rows_sharing_a_timestamp_across_pages():
+    # Three rows per timestamp, so every page boundary splits a timestamp
+    client = FakeClient(make_rows(20))
+    pages = list(iter_changed_pages(client, since=None, page_size=4))
+    assert ids(pages) == list(range(1, 21))
+
+
+def test_changed_pages_since_timestamp_includes_that_instant():
+    client = FakeClient(make_rows(20))
+    since = "2024-01-01T00:00:02.000+00:00"
+    assert ids(iter_changed_pages(client, since=since, page_size=4)) == list(range(6, 21))
+
+
+def test_changed_pages_resume_after_a_cursor():
+    client = FakeClient(make_rows(20))
+    cursor = ("2024-01-01T00:00:02.000+00:00", 7)
+    assert ids(iter_changed_pages(client, since=cursor, page_size=4)) == list(range(8, 21))
+
+
+def test_row_updated_during_sync_is_picked_up_later():
+    def touch_first_row(table):
+        if table.requests == 1:
+            table.rows[0]["updated_at"] = "2024-01-01T00:00:59.000+00:00"
+
+    client = FakeClient(make_rows(12), on_execute=touch_first_row)
+    seen = ids(iter_changed_pages(client, since=None, page_size=4))
+    assert seen[:4] == [1, 2, 3, 4]
+    assert seen[-1] == 1
+    assert sorted(set(seen)) == list(range(1, 13))
+
+
+def test_load_corpus_drops_only_rows_of_another_dimension():
+    rows = make_rows(9)
+    rows[4]["embedding"] = "[1.0,2.0]"
+    rows[6]["embedding"] = None
+    corpus = load_corpus(FakeClient(rows), page_size=4, metadata_columns=("person_id", "metadata"))
+
+    assert corpus.ids == [1, 2, 3, 4, 6, 8, 9]
+    assert corpus.matrix.shape == (7, 4)
+    np.testing.assert_array_equal(corpus.matrix[4], [6.0, 7.0, 8.0, 9.0])
+    assert corpus.texts[0] == "doc 1"
+    assert corpus.metadata[0]["profile_id"] == "p1"
+    assert corpus.metadata[0]["content_type"] == "project"
+
+
+def test_load_corpus_grows_past_the_expected_size():
+    corpus = load_corpus(FakeClient(make_rows(30)), page_size=8, expected_rows=5)
+    assert corpus.ids == list(range(1, 31))
+    assert corpus.matrix.shape == (30, 4)
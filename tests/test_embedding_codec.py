@@ -0,0 +1,73 @@
+"""EmbeddingDecoder on every stored format, and per-row dimension checks."""
+
+import base64
+
+import numpy as np
+import pytest
+
+from embedding_codec import EmbeddingDecoder, detect_format, parse_vector_text
+
+VECTOR = [0.25, -1.5, 3.0]
+
+
+def b64(values):
+    return base64.b64encode(np.asarray(values, dtype="<f4").tobytes()).decode("ascii")
+
+
+@pytest.mark.parametrize("embedding, fmt", [
+    ("[0.25,-1.5,3]", "string"),
+    (" [0.25, -1.5, 3.0] ", "string"),
+    (b64(VECTOR), "base64"),
+    (VECTOR, "array"),
+    (np.array(VECTOR), "array"),
+    ({"embedding": "[0.25,-1.5,3]"}, "object"),
+    ({"values": VECTOR}, "object"),
+])
+def test_decode_formats(embedding, fmt):
+    assert detect_format(embedding) == fmt
+    decoder = EmbeddingDecoder()
+    vector = decoder.decode(embedding, doc_id=1)
+    assert vector.dtype == np.float32
+    np.testing.assert_allclose(vector, VECTOR)
+    assert decoder.decoded == 1
+
+
+@pytest.mark.parametrize("embedding", [None, "[1,,2]", "[]", "not base64!", [[1, 2], [3, 4]], {"other": 1}, 42])
+def test_unusable_embeddings_decode_to_none(embedding):
+    assert EmbeddingDecoder().decode(embedding, doc_id=1) is None
+
+
+def test_parse_vector_text_rejects_partial_input():
+    assert parse_vector_text("[1,2,x]") is None
+    np.testing.assert_allclose(parse_vector_text("1,2"), [1, 2])
+
+
+def test_decode_many_bulk_text_page():
+    decoder = EmbeddingDecoder()
+    matrix, valid = decoder.decode_many(["[1,2,3]", "[4,5,6]"], [1, 2])
+    assert valid.all()
+    np.testing.assert_allclose(matrix, [[1, 2, 3], [4, 5, 6]])
+    assert decoder.stats()["formats"]["string"] == 2
+
+
+def test_decode_many_rejects_only_mismatched_rows():
+    decoder = EmbeddingDecoder()
+    matrix, valid = decoder.decode_many(["[1,2]", [1, 2, 3], b64([4, 5, 6]), None, "[7,8,9]"], list(range(5)))
+    assert decoder.dimension == 3
+    assert valid.tolist() == [False, True, True, False, True]
+    np.testing.assert_allclose(matrix[valid], [[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+    assert any("Dimension 2 does not match corpus dimension 3" in error for error in decoder.errors)
+
+
+def test_decode_many_keeps_the_first_page_dimension():
+    decoder = EmbeddingDecoder()
+    decoder.decode_many(["[1,2,3]", "[4,5,6]"])
+    matrix, valid = decoder.decode_many(["[1,2]", "[3,4]"])
+    assert matrix.shape == (2, 3)
+    assert not valid.any()
+
+
+def test_expected_dimension_overrides_the_page():
+    decoder = EmbeddingDecoder(dimension=2)
+    _, valid = decoder.decode_many(["[1,2,3]", "[4,5,6]", "[7,8]"])
+    assert valid.tolist() == [False, False, True]
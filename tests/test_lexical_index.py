@@ -0,0 +1,72 @@
+"""BM25Index scoring against the Okapi BM25 formula."""
+
+import math
+
+import numpy as np
+import pytest
+
+from lexical_index import BM25Index, tokenize
+
+TEXTS = [
+    "Senior React developer building React Native apps",
+    "Python backend engineer with Django and Docker",
+    "Designer who prototypes mobile apps in Figma",
+    "Full stack developer: node.js, c++ and Python",
+]
+
+
+def bm25(texts, query, k1=1.2, b=0.75):
+    """Reference BM25 over plain text, one document at a time."""
+    documents = [tokenize(text) for text in texts]
+    average = sum(len(d) for d in documents) / len(documents)
+    scores = []
+    for document in documents:
+        score = 0.0
+        for term in dict.fromkeys(tokenize(query)):
+            df = sum(term in d for d in documents)
+            tf = document.count(term)
+            if not tf:
+                continue
+            idf = math.log1p((len(documents) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(document) / average))
+        scores.append(score)
+    return scores
+
+
+def test_tokenize_keeps_tech_names_and_drops_stopwords():
+    assert tokenize("Node.js and C++ for the .NET team, C#") == ["node.js", "c++", ".net", "team", "c#"]
+
+
+@pytest.mark.parametrize("query", ["react developer", "python", "mobile apps figma", "c++ node.js"])
+def test_scores_match_reference(query):
+    index = BM25Index(TEXTS)
+    rows, scores = index.scores(query)
+    expected = bm25(TEXTS, query)
+
+    assert rows.tolist() == [row for row, score in enumerate(expected) if score > 0]
+    np.testing.assert_allclose(scores, [expected[row] for row in rows], rtol=1e-5)
+
+
+def test_search_orders_by_score_and_candidates_are_sorted():
+    index = BM25Index(TEXTS)
+    rows, scores = index.search("react developer python", limit=2)
+    assert rows[0] == 0
+    assert len(rows) == 2 and scores[0] >= scores[1]
+    assert index.candidates("react developer python").tolist() == [0, 1, 3]
+    assert index.candidates("kubernetes").tolist() == []
+
+
+def test_metadata_fields_are_weighted():
+    texts = ["experienced engineer", "experienced engineer"]
+    metadata = [{"techs": ["Go"]}, {"keywords": "go"}]
+    rows, scores = BM25Index(texts, metadata, field_weights={"text": 1.0, "techs": 3.0, "keywords": 1.0}).scores("go")
+    assert rows.tolist() == [0, 1]
+    assert scores[0] > scores[1]
+
+    unweighted = BM25Index(texts, metadata, field_weights={"text": 1.0})
+    assert unweighted.candidates("go").tolist() == []
+
+
+def test_metadata_length_must_match():
+    with pytest.raises(ValueError):
+        BM25Index(TEXTS, [{}])
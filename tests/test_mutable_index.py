@@ -0,0 +1,74 @@
+"""MutableVectorIndex upserts, deletes and compaction against a rebuilt index."""
+
+import numpy as np
+import pytest
+
+from mutable_index import MutableVectorIndex
+from vector_index import VectorIndex
+
+
+def result_ids(results):
+    return [r["id"] for r in results]
+
+
+@pytest.fixture
+def live(index):
+    return MutableVectorIndex(index, auto_compact=False)
+
+
+def test_upsert_and_delete_match_a_rebuilt_index(live, corpus, rng):
+    ids, texts, matrix, metadata = corpus
+    added = rng.standard_normal((20, 16)).astype(np.float32)
+    replaced = rng.standard_normal(16).astype(np.float32)
+
+    for i, vector in enumerate(added):
+        live.upsert(f"new{i}", f"new {i}", vector, {"content_type": "project"})
+    live.upsert(ids[5], "replaced", replaced, metadata[5])
+    for doc_id in ids[10:40]:
+        assert live.delete(doc_id)
+    assert not live.delete("missing")
+
+    kept = [row for row in range(len(ids)) if row != 5 and not 10 <= row < 40]
+    expected = VectorIndex(
+        [ids[row] for row in kept] + [f"new{i}" for i in range(20)] + [ids[5]],
+        [texts[row] for row in kept] + [f"new {i}" for i in range(20)] + ["replaced"],
+        np.concatenate([matrix[kept], added, replaced[np.newaxis]]),
+    )
+    assert len(live) == len(expected)
+    for query in rng.standard_normal((5, 16)):
+        assert result_ids(live.search(query, limit=10)) == result_ids(expected.search(query, limit=10))
+
+
+def test_compaction_preserves_results(live, rng):
+    for i, vector in enumerate(rng.standard_normal((10, 16))):
+        live.upsert(f"new{i}", "", vector)
+    live.delete(1000)
+    queries = rng.standard_normal((5, 16))
+    before = [result_ids(live.search(query, limit=8)) for query in queries]
+
+    base = live.compact()
+    assert len(base) == len(live) == 309
+    assert live.buffer_size == 0 and live.tombstones == 0
+    assert 1000 not in live
+    assert [result_ids(live.search(query, limit=8)) for query in queries] == before
+
+
+def test_filters_see_buffered_rows(live):
+    vector = np.ones(16, dtype=np.float32)
+    live.upsert("fresh", "", vector, {"profile_id": "someone-new"})
+    results = live.search(vector, limit=5, filters={"profile_id": "someone-new"})
+    assert result_ids(results) == ["fresh"]
+
+
+def test_auto_compaction_and_version(index, rng):
+    live = MutableVectorIndex(index, compact_ratio=0.1, min_compact_rows=1)
+    for i, vector in enumerate(rng.standard_normal((30, 16))):
+        live.upsert(f"new{i}", "", vector)
+    assert live.compactions >= 1
+    assert live.version == 30
+    assert len(live) == 330
+
+
+def test_dimension_mismatch_raises(live):
+    with pytest.raises(ValueError):
+        live.upsert("bad", "", [1.0, 2.0])
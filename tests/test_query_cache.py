@@ -0,0 +1,96 @@
+"""QueryCache TTL/LRU eviction, the semantic tier and CachedSearch invalidation."""
+
+import numpy as np
+import pytest
+
+from mutable_index import MutableVectorIndex
+from query_cache import QueryCache, CachedSearch, normalize_query
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_normalize_query():
+    assert normalize_query("  React   Developer?? ") == "react developer"
+    assert normalize_query("C# & Figma!") == "c figma"
+    assert normalize_query("React Developer") == normalize_query("react developer.")
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = QueryCache(ttl=10, clock=clock)
+    cache.put("react developer", 5, [{"id": 1}])
+    clock.now = 10
+    assert cache.get("React developer", 5) == [{"id": 1}]
+    clock.now = 10.5
+    assert cache.get("react developer", 5) is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+
+def test_limit_and_options_are_part_of_the_key(clock):
+    cache = QueryCache(clock=clock)
+    cache.put("react", 5, [{"id": 1}], {"filters": {"techs": "React"}})
+    assert cache.get("react", 10, {"filters": {"techs": "React"}}) is None
+    assert cache.get("react", 5) is None
+    assert cache.get("react", 5, {"filters": {"techs": "React"}}) == [{"id": 1}]
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = QueryCache(max_entries=2, clock=clock)
+    cache.put("a", 5, [{"id": "a"}])
+    cache.put("b", 5, [{"id": "b"}])
+    assert cache.get("a", 5) is not None
+    cache.put("c", 5, [{"id": "c"}])
+
+    assert cache.evictions == 1
+    assert cache.get("b", 5) is None
+    assert cache.get("a", 5) == [{"id": "a"}]
+    assert cache.get("c", 5) == [{"id": "c"}]
+
+
+def test_semantic_tier_reuses_near_duplicate_queries(clock):
+    cache = QueryCache(semantic_epsilon=0.01, clock=clock)
+    cache.put("mobile designer", 5, [{"id": 7}], embedding=[1.0, 0.0, 0.0])
+
+    assert cache.get("designer for mobile", 5, embedding=[0.999, 0.01, 0.0]) == [{"id": 7}]
+    assert cache.get("backend engineer", 5, embedding=[0.0, 1.0, 0.0]) is None
+    assert cache.get("designer for mobile", 10, embedding=[1.0, 0.0, 0.0]) is None
+    assert cache.semantic_hits == 1
+
+
+def test_evicted_entries_leave_the_semantic_tier(clock):
+    cache = QueryCache(max_entries=1, semantic_epsilon=0.01, clock=clock)
+    cache.put("first", 5, [{"id": 1}], embedding=[1.0, 0.0])
+    cache.put("second", 5, [{"id": 2}], embedding=[0.0, 1.0])
+    assert cache.get("other", 5, embedding=[1.0, 0.0]) is None
+    assert cache.get("other", 5, embedding=[0.0, 1.0]) == [{"id": 2}]
+
+
+def test_cached_search_embeds_only_on_a_miss_and_invalidates_on_change(index, rng):
+    live = MutableVectorIndex(index, auto_compact=False)
+    query = rng.standard_normal(16).astype(np.float32)
+    calls = []
+
+    def embed(text):
+        calls.append(text)
+        return query
+
+    search = CachedSearch(live, QueryCache(), embed=embed)
+    first = search.search("react developer", threshold=-1.0, limit=3)
+    assert search.search("React developer ", threshold=-1.0, limit=3) is first
+    assert calls == ["react developer"]
+
+    live.upsert("exact", "", query)
+    refreshed = search.search("react developer", threshold=-1.0, limit=3)
+    assert refreshed[0]["id"] == "exact"
+    assert search.cache.invalidations == 1
@@ -0,0 +1,21 @@
+"""Merging per-shard top-k lists."""
+
+import numpy as np
+
+from sharded_search import ShardedSearch, heap_merge
+
+
+def test_heap_merge_interleaves_sorted_shards():
+    shard_a = (np.array([[0, 2, 4]]), np.array([[0.9, 0.5, 0.1]]))
+    shard_b = (np.array([[1, 3]]), np.array([[0.8, 0.6]]))
+    merged = heap_merge([shard_a, shard_b], query=0, k=4)
+    assert [row for row, _ in merged] == [0, 1, 3, 2]
+    assert [score for _, score in merged] == [0.9, 0.8, 0.6, 0.5]
+
+
+def test_sharded_search_matches_single_process(index, rng):
+    queries = index.prepare_queries(rng.standard_normal((3, 16)))
+    expected, _ = index.batch_top_k(queries, 5)
+    with ShardedSearch(index, workers=2, shard_size=64) as sharded:
+        found = sharded.batch_top_k(queries, 5)
+    assert [[row for row, _ in matches] for matches in found] == expected.tolist()
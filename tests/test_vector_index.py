@@ -0,0 +1,73 @@
+"""VectorIndex top-k and metadata filters against brute force."""
+
+import numpy as np
+import pytest
+
+from conftest import brute_force_top_k
+from vector_index import VectorIndex, merge_top_k, top_k_indices
+
+
+def test_search_matches_brute_force(index, corpus, rng):
+    _, _, matrix, _ = corpus
+    for query in rng.standard_normal((5, 16)):
+        expected, scores = brute_force_top_k(matrix, query, 10)
+        results = index.search(query, threshold=0.0, limit=10)
+        assert [index.ids.index(r["id"]) for r in results] == expected
+        assert [r["similarity"] for r in results] == pytest.approx(scores[expected], abs=1e-5)
+
+
+def test_batch_top_k_is_independent_of_chunk_size(index, rng):
+    queries = index.prepare_queries(rng.standard_normal((4, 16)))
+    rows, scores = index.batch_top_k(queries, 7)
+    chunked_rows, chunked_scores = index.batch_top_k(queries, 7, chunk_size=13)
+    assert rows.tolist() == chunked_rows.tolist()
+    np.testing.assert_allclose(scores, chunked_scores, atol=1e-6)
+
+
+def test_filtered_search_matches_brute_force(index, corpus, rng):
+    _, _, matrix, metadata = corpus
+    filters = {"content_type": "project", "techs": ["react", "Docker"]}
+    allowed = [row for row, m in enumerate(metadata)
+               if m["content_type"] == "project" and {"React", "Docker"} & set(m["techs"])]
+    assert index.filter_rows(filters).tolist() == allowed
+
+    query = rng.standard_normal(16)
+    expected, _ = brute_force_top_k(matrix, query, 5, rows=allowed)
+    results = index.search(query, threshold=0.0, limit=5, filters=filters)
+    assert [index.ids.index(r["id"]) for r in results] == expected
+
+
+def test_unknown_filter_field_raises(index):
+    with pytest.raises(ValueError):
+        index.search(np.ones(16), filters={"colour": "red"})
+
+
+def test_query_dimension_mismatch_raises(index):
+    with pytest.raises(ValueError, match="does not match index dimension"):
+        index.search(np.ones(8))
+
+
+def test_top_k_indices_orders_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.7], dtype=np.float32)
+    assert top_k_indices(scores, 3).tolist() == [1, 3, 2]
+    assert top_k_indices(scores, 0).tolist() == []
+
+
+def test_merge_top_k_keeps_the_best_of_both(rng):
+    best_scores = rng.random((3, 4)).astype(np.float32)
+    chunk_scores = rng.random((3, 6)).astype(np.float32)
+    best_indices = np.tile(np.arange(4), (3, 1))
+    chunk_indices = np.tile(np.arange(4, 10), (3, 1))
+
+    indices, scores = merge_top_k(best_indices, best_scores, chunk_indices, chunk_scores, 4)
+    combined = np.concatenate([best_scores, chunk_scores], axis=1)
+    for row in range(3):
+        expected = set(np.argsort(-combined[row])[:4].tolist())
+        assert set(indices[row].tolist()) == expected
+        np.testing.assert_allclose(sorted(scores[row]), sorted(combined[row, list(expected)]))
+
+
+def test_normalized_float32_matrix_is_not_copied(corpus):
+    ids, texts, matrix, _ = corpus
+    matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    assert VectorIndex(ids, texts, matrix, normalized=True).matrix is matrix
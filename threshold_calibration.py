@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Threshold and Top-k Calibration
+
+Scores a labelled query set against the corpus in one batched pass and
+sweeps similarity thresholds and top-k limits. For every (top_k, threshold)
+setting it reports precision, recall and F1 together with what the setting
+costs downstream: results per query, queries left with no results, and the
+characters of document text a RAG prompt would have to assemble. The scoring
+latency of each top-k is measured too, so the defaults scattered across the
+tools (0.1/0.05 in direct_vector_test.py, 0.45 in test_api.py, 0.3 in the
+API) can be replaced by measured ones.
+
+Labels are JSON lines, one query per line, relevant documents by id and an
+optional precomputed embedding:
+
+    {"query": "Need a mobile app designer who knows Figma", "relevant": [12, 87]}
+
+For synthetic_corpus.py snapshots, ``--from-ground-truth`` uses the saved
+queries and treats each query's exact top-k neighbours as its relevant set.
+
+Usage:
+    python threshold_calibration.py --snapshot snapshots/documents --labels labels.jsonl
+    python threshold_calibration.py --snapshot snapshots/documents --labels labels.jsonl --min-recall 0.9 --output calibration.json
+    python threshold_calibration.py --snapshot snapshots/synthetic-100k --from-ground-truth --thresholds 0.5,0.6,0.7,0.8
+
+    from threshold_calibration import sweep_thresholds, recommend
+    report = sweep_thresholds(index, query_embeddings, relevant_ids, thresholds=[0.1, 0.3], top_ks=[5, 10])
+
+Requirements:
+    pip install numpy
+    pip install openai    # only to embed label queries that have no embedding
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vector_index import VectorIndex
+
+DEFAULT_THRESHOLDS = (0.05, 0.1, 0.2, 0.3, 0.45, 0.6)
+DEFAULT_TOP_KS = (1, 3, 5, 10, 20)
+
+
+def load_labels(path: str) -> List[Dict[str, Any]]:
+    """Read ``{"query", "relevant"[, "embedding"]}`` objects from a JSON lines file."""
+    labels = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            label = json.loads(line)
+            if "query" not in label or "relevant" not in label:
+                raise ValueError(f"{path}:{number}: each label needs 'query' and 'relevant'")
+            labels.append(label)
+    return labels
+
+
+def sweep_thresholds(index: VectorIndex, query_embeddings: Sequence[Sequence[float]],
+                     relevant_ids: Sequence[Sequence[Any]], thresholds: Sequence[float] = DEFAULT_THRESHOLDS,
+                     top_ks: Sequence[int] = DEFAULT_TOP_KS, repeats: int = 3) -> List[Dict[str, Any]]:
+    """Precision, recall, result-set size and scoring latency for every (top_k, threshold) pair.
+
+    Precision and recall are micro-averaged over all queries; a setting that
+    returns nothing has precision 0.
+    """
+    queries = index.prepare_queries(query_embeddings)
+    top_ks = sorted(set(min(k, len(index)) for k in top_ks if k > 0))
+    if not len(queries) or not top_ks:
+        return []
+
+    # One batched pass at the largest k; smaller k are prefixes of the same ranking
+    rows, scores = index.batch_top_k(queries, top_ks[-1])
+    rows_of = {doc_id: row for row, doc_id in enumerate(index.ids)}
+    relevant = [set(rows_of[doc_id] for doc_id in ids if doc_id in rows_of) for ids in relevant_ids]
+    is_relevant = np.array([[row in wanted for row in ranked] for ranked, wanted in zip(rows.tolist(), relevant)],
+                           dtype=bool).reshape(rows.shape)
+    text_chars = np.array([[len(index.texts[row] or '') for row in ranked] for ranked in rows.tolist()],
+                          dtype=np.int64).reshape(rows.shape)
+    total_relevant = sum(len(wanted) for wanted in relevant)
+
+    report = []
+    for k in top_ks:
+        timings = []
+        for _ in range(max(1, repeats)):
+            started = time.perf_counter()
+            index.batch_top_k(queries, k)
+            timings.append(time.perf_counter() - started)
+        latency_ms = min(timings) * 1000 / len(queries)
+
+        for threshold in thresholds:
+            kept = scores[:, :k] >= threshold
+            retrieved = int(kept.sum())
+            hits = int((kept & is_relevant[:, :k]).sum())
+            precision = hits / retrieved if retrieved else 0.0
+            recall = hits / total_relevant if total_relevant else 1.0
+            report.append({
+                "top_k": k,
+                "threshold": threshold,
+                "precision": precision,
+                "recall": recall,
+                "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+                "mean_results": retrieved / len(queries),
+                "empty_fraction": float((kept.sum(axis=1) == 0).mean()),
+                "mean_context_chars": float((text_chars[:, :k] * kept).sum() / len(queries)),
+                "latency_ms": latency_ms
+            })
+    return report
+
+
+def recommend(report: List[Dict[str, Any]], min_recall: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """The best-F1 setting, or with ``min_recall`` the cheapest setting that reaches it.
+
+    Ties go to the higher threshold, which prunes more when the corpus grows.
+    """
+    if not report:
+        return None
+    if min_recall is None:
+        return max(report, key=lambda row: (row["f1"], -row["mean_results"], row["threshold"]))
+    eligible = [row for row in report if row["recall"] >= min_recall]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda row: (row["mean_context_chars"], row["mean_results"], -row["precision"], -row["threshold"]))
+
+
+def format_report(report: List[Dict[str, Any]]) -> str:
+    """A table of the sweep for terminal output."""
+    lines = [f"{'top_k':>5} {'thresh':>6} {'prec':>6} {'recall':>6} {'f1':>6} "
+             f"{'results':>8} {'empty':>6} {'ctx chars':>10} {'ms/query':>9}"]
+    for row in report:
+        lines.append(f"{row['top_k']:>5} {row['threshold']:>6.2f} {row['precision']:>6.3f} {row['recall']:>6.3f} "
+                     f"{row['f1']:>6.3f} {row['mean_results']:>8.2f} {row['empty_fraction'] * 100:>5.0f}% "
+                     f"{row['mean_context_chars']:>10.0f} {row['latency_ms']:>9.3f}")
+    return "\n".join(lines)
+
+
+def labelled_queries(labels: List[Dict[str, Any]], offline: bool = False) -> Tuple[List[List[float]], List[List[Any]]]:
+    """Embeddings and relevant ids for labels, embedding any queries without a stored embedding."""
+    missing = [label["query"] for label in labels if not label.get("embedding")]
+    embedded: Dict[str, List[float]] = {}
+    if missing:
+        from clients import get_embedding_pipeline
+        pipeline = get_embedding_pipeline(offline)
+        embedded = dict(zip(missing, pipeline.embed(missing)))
+        for error in pipeline.errors:
+            print(f"⚠ {error}")
+
+    embeddings, relevant = [], []
+    for label in labels:
+        embedding = label.get("embedding") or embedded.get(label["query"])
+        if embedding:
+            embeddings.append(embedding)
+            relevant.append(label["relevant"])
+    return embeddings, relevant
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Calibrate similarity thresholds and top-k against labelled queries")
+    parser.add_argument("--snapshot", required=True, help="corpus snapshot directory")
+    parser.add_argument("--labels", help="JSON lines file of {\"query\", \"relevant\"[, \"embedding\"]}")
+    parser.add_argument("--from-ground-truth", action="store_true",
+                        help="use the queries and exact top-k saved by synthetic_corpus.py as labels")
+    parser.add_argument("--thresholds", default=",".join(map(str, DEFAULT_THRESHOLDS)), help="comma-separated thresholds")
+    parser.add_argument("--top-k", default=",".join(map(str, DEFAULT_TOP_KS)), help="comma-separated top-k limits")
+    parser.add_argument("--min-recall", type=float, help="recommend the cheapest setting with at least this recall")
+    parser.add_argument("--offline", action="store_true", help="embed label queries from the embedding cache only")
+    parser.add_argument("--output", help="write the sweep and recommendation to this JSON file")
+    args = parser.parse_args(argv)
+    if bool(args.labels) == args.from_ground_truth:
+        parser.error("pass exactly one of --labels and --from-ground-truth")
+
+    from corpus_snapshot import load_snapshot
+    snapshot = load_snapshot(args.snapshot, model=None)
+    index = VectorIndex(snapshot.ids, snapshot.texts, snapshot.matrix, normalized=True)
+
+    if args.from_ground_truth:
+        from synthetic_corpus import QUERIES_FILE, GROUND_TRUTH_FILE
+        embeddings = np.load(os.path.join(args.snapshot, QUERIES_FILE))
+        relevant = [[index.ids[row] for row in rows] for rows in np.load(os.path.join(args.snapshot, GROUND_TRUTH_FILE))]
+    else:
+        embeddings, relevant = labelled_queries(load_labels(args.labels), args.offline)
+    if not len(embeddings):
+        print("✗ No labelled queries could be embedded")
+        return 1
+
+    report = sweep_thresholds(index, embeddings, relevant,
+                              [float(t) for t in args.thresholds.split(',') if t],
+                              [int(k) for k in args.top_k.split(',') if k])
+    print(f"ℹ Calibrated {len(embeddings)} labelled queries against {len(index)} documents\n")
+    print(format_report(report))
+
+    best = recommend(report, args.min_recall)
+    if best is None:
+        print(f"\n✗ No setting reaches recall {args.min_recall}")
+    else:
+        goal = f"cheapest with recall >= {args.min_recall}" if args.min_recall is not None else "best F1"
+        print(f"\n✓ Recommended ({goal}): top_k={best['top_k']}, threshold={best['threshold']} "
+              f"(precision {best['precision']:.3f}, recall {best['recall']:.3f}, "
+              f"{best['mean_results']:.1f} results/query)")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"snapshot": args.snapshot, "queries": len(embeddings), "results": report,
+                       "recommended": best}, f, indent=2)
+        print(f"ℹ Wrote calibration to {args.output}")
+    return 0 if best is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Truncated-Dimension (Matryoshka) Search
+
+Two-stage search for embeddings trained so that their leading dimensions
+carry most of the signal (text-embedding-3 models are). The first stage
+scans a re-normalized copy of only the first ``dimensions`` columns of every
+embedding; the second re-scores the best ``limit * candidate_multiplier``
+candidates against the full-dimension vectors.
+
+Usage:
+    from truncated_search import TruncatedSearch, measure_truncation_tradeoff
+
+    truncated = TruncatedSearch(index, dimensions=256, candidate_multiplier=10)
+    results = truncated.search(query_embedding, threshold=0.1, limit=5)
+    report = measure_truncation_tradeoff(index, query_embeddings, dimensions=[128, 256, 512])
+
+Requirements:
+    pip install numpy
+"""
+
+import time
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from vector_index import VectorIndex, normalize_rows, top_k_indices, format_result
+
+
+class TruncatedSearch:
+    """Coarse scan on the leading dimensions, then full-dimension re-ranking."""
+
+    def __init__(self, index: VectorIndex, dimensions: int = 256, candidate_multiplier: int = 10,
+                 chunk_size: int = 65536):
+        self.index = index
+        self.dimensions = max(1, min(dimensions, index.dimension)) if index.dimension else 0
+        self.candidate_multiplier = max(1, candidate_multiplier)
+
+        # Copy the prefix chunk by chunk so a memory-mapped matrix is never fully paged in twice
+        self.prefix = np.empty((len(index), self.dimensions), dtype=np.float32)
+        for start in range(0, len(index), chunk_size):
+            self.prefix[start:start + chunk_size] = index.matrix[start:start + chunk_size, :self.dimensions]
+        normalize_rows(self.prefix)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def top_k(self, query: np.ndarray, k: int, candidate_multiplier: Optional[int] = None) -> np.ndarray:
+        """Return the top k rows for a normalized full-dimension query, best first."""
+        prefix_query = query[:self.dimensions]
+        norm = np.linalg.norm(prefix_query)
+        if norm == 0:
+            return np.empty(0, dtype=np.int64)
+
+        multiplier = candidate_multiplier or self.candidate_multiplier
+        # Sorted row order keeps the full-dimension gather sequential
+        candidates = np.sort(top_k_indices(self.prefix @ (prefix_query / norm), k * multiplier))
+        rescored = self.index.matrix[candidates] @ query
+        return candidates[top_k_indices(rescored, k)]
+
+    def search(self, query_embedding: Sequence[float], threshold: float = 0.1, limit: int = 5,
+               candidate_multiplier: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Two-stage cosine similarity search in the same result shape as VectorIndex."""
+        if not len(self) or not len(query_embedding):
+            return []
+
+        query = self.index.prepare_query(query_embedding)
+        if query is None:
+            return []
+
+        rows = self.top_k(query, limit, candidate_multiplier)
+        scores = np.clip(self.index.matrix[rows] @ query, -1.0, 1.0)
+        return [
+            format_result(self.index.ids[row], self.index.texts[row], float(score), threshold)
+            for row, score in zip(rows, scores)
+        ]
+
+
+def measure_truncation_tradeoff(index: VectorIndex, query_embeddings: Sequence[Sequence[float]],
+                                k: int = 10, dimensions: Sequence[int] = (64, 128, 256, 512),
+                                candidate_multipliers: Sequence[int] = (1, 4, 10)) -> List[Dict[str, Any]]:
+    """Measure recall@k and per-query latency of truncated search against a full exact scan."""
+    queries = index.prepare_queries(query_embeddings)
+
+    started = time.perf_counter()
+    exact = [set(top_k_indices(index.matrix @ query, k).tolist()) for query in queries]
+    exact_ms = (time.perf_counter() - started) * 1000 / max(len(queries), 1)
+    expected_total = sum(len(expected) for expected in exact)
+
+    report = []
+    for dims in dimensions:
+        if dims >= index.dimension:
+            continue
+        truncated = TruncatedSearch(index, dimensions=dims)
+        for multiplier in candidate_multipliers:
+            started = time.perf_counter()
+            found = [truncated.top_k(query, k, multiplier) for query in queries]
+            elapsed_ms = (time.perf_counter() - started) * 1000 / max(len(queries), 1)
+
+            hits = sum(len(expected & set(rows.tolist())) for expected, rows in zip(exact, found))
+            report.append({
+                "dimensions": dims,
+                "candidate_multiplier": multiplier,
+                "recall": hits / expected_total if expected_total else 1.0,
+                "latency_ms": elapsed_ms,
+                "exact_latency_ms": exact_ms,
+                "speedup": exact_ms / elapsed_ms if elapsed_ms else float("inf")
+            })
+    return report
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+In-process Vector Index
+
+Loads a document corpus once into a contiguous, pre-normalized float32 matrix
+and answers cosine similarity queries with a single matrix-vector product and
+an argpartition top-k, instead of re-parsing and re-normalizing every document
+embedding on every query. Many queries can be answered together with one
+query-matrix x corpus-matrix product, chunked over the corpus to bound memory.
+
+Usage:
+    from vector_index import VectorIndex
+
+    index = VectorIndex.from_embeddings(ids, texts, embeddings)
+    results = index.search(query_embedding, threshold=0.1, limit=5)
+    batch_results = index.search_batch(query_embeddings, threshold=0.1, limit=5)
+    project_results = index.search(query_embedding, filters={"content_type": "project"})
+
+Requirements:
+    pip install numpy
+"""
+
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from metadata_filter import MetadataIndex
+from instrumentation import METRICS
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row of a matrix to unit length in place (zero rows stay zero)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the k highest scores, highest first."""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if k < scores.size:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.size)
+
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def merge_top_k(best_indices: np.ndarray, best_scores: np.ndarray,
+                chunk_indices: np.ndarray, chunk_scores: np.ndarray,
+                k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge per-row running top-k candidates with a new chunk of candidates."""
+    indices = np.concatenate([best_indices, chunk_indices], axis=1)
+    scores = np.concatenate([best_scores, chunk_scores], axis=1)
+
+    if scores.shape[1] > k:
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        indices = np.take_along_axis(indices, keep, axis=1)
+        scores = np.take_along_axis(scores, keep, axis=1)
+
+    return indices, scores
+
+
+def format_result(doc_id: Any, text: str, similarity: float, threshold: float) -> Dict[str, Any]:
+    """Build a search result dict in the shape used by the direct vector tools."""
+    return {
+        "id": doc_id,
+        "text": (text or '')[:100] + '...',
+        "similarity": similarity,
+        "passed_threshold": similarity >= threshold
+    }
+
+
+class VectorIndex:
+    """Exact cosine similarity index over a pre-normalized float32 matrix."""
+
+    def __init__(self, ids: Sequence[Any], texts: Sequence[str], matrix: np.ndarray,
+                 normalized: bool = False, metadata: Optional[Sequence[Dict[str, Any]]] = None):
+        """Wrap a corpus; pass ``normalized=True`` to use a unit-length (e.g. memory-mapped) matrix as is.
+
+        ``metadata`` holds one dict of filterable fields per row (see
+        ``metadata_filter.document_metadata``) and enables ``filters=`` on searches.
+        """
+        if len(ids) != len(texts) or len(ids) != matrix.shape[0]:
+            raise ValueError("ids, texts and matrix rows must have the same length")
+
+        self.ids = list(ids)
+        self.texts = texts if isinstance(texts, Sequence) else list(texts)
+        if normalized and matrix.dtype == np.float32:
+            self.matrix = matrix
+        else:
+            self.matrix = normalize_rows(np.array(matrix, dtype=np.float32))
+
+        if metadata is not None and len(metadata) != len(self.ids):
+            raise ValueError("metadata must have one entry per row")
+        self.row_metadata = list(metadata) if metadata is not None else None
+        self.metadata = MetadataIndex(self.row_metadata) if metadata is not None else None
+
+    @classmethod
+    def from_embeddings(cls, ids: Sequence[Any], texts: Sequence[str],
+                        embeddings: Sequence[Sequence[float]]) -> "VectorIndex":
+        """Build an index from parsed embeddings, skipping rows with a mismatched dimension."""
+        if len(embeddings) == 0:
+            return cls([], [], np.zeros((0, 0), dtype=np.float32))
+        if isinstance(embeddings, np.ndarray) and embeddings.ndim == 2:
+            return cls(ids, texts, embeddings)
+
+        dimension = len(embeddings[0])
+        keep = [i for i, embedding in enumerate(embeddings) if len(embedding) == dimension]
+
+        matrix = np.empty((len(keep), dimension), dtype=np.float32)
+        for row, i in enumerate(keep):
+            matrix[row] = embeddings[i]
+
+        return cls([ids[i] for i in keep], [texts[i] for i in keep], matrix)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        """Number of dimensions stored per document."""
+        return self.matrix.shape[1]
+
+    def prepare_query(self, query_embedding: Sequence[float]) -> Optional[np.ndarray]:
+        """Convert a query embedding to a unit-length float32 vector, or None if unusable."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.ndim != 1 or query.shape[0] != self.dimension:
+            raise ValueError(
+                f"Query dimension {query.shape[-1] if query.ndim else 0} "
+                f"does not match index dimension {self.dimension}"
+            )
+
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return None
+        return query / norm
+
+    def filter_rows(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Resolve metadata filters to sorted row numbers, or None for no filtering."""
+        if not filters:
+            return None
+        if self.metadata is None:
+            raise ValueError("This index was built without metadata, so it cannot be filtered")
+        return self.metadata.rows(filters)
+
+    def scores(self, query_embedding: Sequence[float]) -> np.ndarray:
+        """Return the cosine similarity of the query against every document."""
+        query = self.prepare_query(query_embedding) if len(self) else None
+        if query is None:
+            return np.zeros(len(self), dtype=np.float32)
+        return np.clip(self.matrix @ query, -1.0, 1.0)
+
+    def prepare_queries(self, query_embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+        """Convert query embeddings to a unit-length float32 matrix (zero queries stay zero)."""
+        queries = np.array(query_embeddings, dtype=np.float32, ndmin=2)
+        if queries.shape[1] != self.dimension:
+            raise ValueError(
+                f"Query dimension {queries.shape[1]} does not match index dimension {self.dimension}"
+            )
+        return normalize_rows(queries)
+
+    def batch_top_k(self, queries: np.ndarray, k: int, chunk_size: int = 65536,
+                    rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (indices, scores) of the top k documents per normalized query, best first.
+
+        The corpus is scored in chunks of ``chunk_size`` rows so the score matrix
+        never exceeds ``len(queries) x chunk_size`` floats. When ``rows`` is given
+        only those rows are scored.
+        """
+        total = len(self) if rows is None else rows.shape[0]
+        k = min(k, total)
+        best_indices = np.empty((queries.shape[0], 0), dtype=np.int64)
+        best_scores = np.empty((queries.shape[0], 0), dtype=np.float32)
+        if k <= 0:
+            return best_indices, best_scores
+
+        for start in range(0, total, chunk_size):
+            if rows is None:
+                chunk = self.matrix[start:start + chunk_size]
+            else:
+                chunk = self.matrix[rows[start:start + chunk_size]]
+            with METRICS.span("score"):
+                scores = queries @ chunk.T
+            METRICS.incr("documents_scanned", chunk.shape[0])
+
+            with METRICS.span("sort"):
+                if scores.shape[1] > k:
+                    local = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                    scores = np.take_along_axis(scores, local, axis=1)
+                else:
+                    local = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+
+                chunk_indices = local + start if rows is None else rows[local + start]
+                best_indices, best_scores = merge_top_k(
+                    best_indices, best_scores, chunk_indices, scores, k
+                )
+
+        with METRICS.span("sort"):
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            best_indices = np.take_along_axis(best_indices, order, axis=1)
+            best_scores = np.clip(np.take_along_axis(best_scores, order, axis=1), -1.0, 1.0)
+        return best_indices, best_scores
+
+    def search_batch(self, query_embeddings: Sequence[Sequence[float]], threshold: float = 0.1,
+                     limit: int = 5, chunk_size: int = 65536,
+                     filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """Search for the most similar documents for many queries in one pass."""
+        if not len(query_embeddings):
+            return []
+        if not len(self):
+            return [[] for _ in query_embeddings]
+
+        queries = self.prepare_queries(query_embeddings)
+        indices, scores = self.batch_top_k(queries, limit, chunk_size, self.filter_rows(filters))
+
+        return [
+            [
+                format_result(self.ids[i], self.texts[i], float(score), threshold)
+                for i, score in zip(row_indices, row_scores)
+            ]
+            for row_indices, row_scores in zip(indices, scores)
+        ]
+
+    def search(self, query_embedding: Sequence[float], threshold: float = 0.1,
+               limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Search for the most similar documents using cosine similarity.
+
+        ``filters`` restricts the search to rows matching the metadata filter
+        before scoring, e.g. ``{"content_type": "project", "techs": ["React"]}``.
+        """
+        if not len(self) or not len(query_embedding):
+            return []
+
+        rows = self.filter_rows(filters)
+        if rows is None:
+            with METRICS.span("score"):
+                scores = self.scores(query_embedding)
+            METRICS.incr("documents_scanned", scores.size)
+            with METRICS.span("sort"):
+                top = top_k_indices(scores, limit)
+            return [
+                format_result(self.ids[i], self.texts[i], float(scores[i]), threshold)
+                for i in top
+            ]
+
+        query = self.prepare_query(query_embedding)
+        if query is None or not rows.size:
+            return []
+
+        with METRICS.span("score"):
+            scores = np.clip(self.matrix[rows] @ query, -1.0, 1.0)
+        METRICS.incr("documents_scanned", scores.size)
+        with METRICS.span("sort"):
+            top = top_k_indices(scores, limit)
+        return [
+            format_result(self.ids[rows[i]], self.texts[rows[i]], float(scores[i]), threshold)
+            for i in top
+        ]